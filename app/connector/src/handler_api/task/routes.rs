@@ -156,6 +156,7 @@ pub async fn ep_update_task(
         status: update_task_input.status,
         artifacts_updates: update_task_input.artifacts_updates,
         new_messages: update_task_input.new_messages,
+        metadata: update_task_input.metadata,
         push_notification: update_task_input.push_notification,
         caller_id: update_task_input.caller_id,
     };
@@ -1,3 +1,5 @@
+use std::collections::HashMap;
+
 use agent2agent::{
     Artifact, Message, PushNotificationConfig, Task as A2ATask, TaskPushNotificationConfig,
     TaskSendParams, TaskStatus,
@@ -60,6 +62,8 @@ pub struct UpdateTaskInput {
     pub status: Option<TaskStatus>,
     pub artifacts_updates: Option<Vec<Artifact>>,
     pub new_messages: Option<Vec<Message>>,
+    /// Replaces the metadata of the task.
+    pub metadata: Option<HashMap<String, serde_json::Value>>,
     pub push_notification: Option<PushNotificationConfig>,
     pub caller_id: Option<String>,
 }
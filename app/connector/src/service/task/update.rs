@@ -1,3 +1,5 @@
+use std::collections::HashMap;
+
 use agent2agent::{
     Artifact, Message, PushNotificationConfig, Task as A2ATask, TaskState as A2ATaskState,
     TaskStatus,
@@ -20,6 +22,7 @@ pub struct UpdateTaskParams {
     pub status: Option<TaskStatus>,
     pub artifacts_updates: Option<Vec<Artifact>>,
     pub new_messages: Option<Vec<Message>>,
+    pub metadata: Option<HashMap<String, serde_json::Value>>,
     pub push_notification: Option<PushNotificationConfig>,
     pub caller_id: Option<String>,
 }
@@ -102,6 +105,10 @@ pub fn update_a2a_task(a2a_task: &mut A2ATask, params: UpdateTaskParams) -> AppR
         }
     }
 
+    if let Some(metadata) = &params.metadata {
+        a2a_task.metadata = Some(metadata.clone());
+    }
+
     if let Some(artifacts) = &params.artifacts_updates {
         for artifact in artifacts {
             a2a_task.upsert_artifact(artifact.clone()).map_err(|e| {
@@ -0,0 +1,521 @@
+"""
+End-to-end benchmarks of the A2A stack.
+
+Each scenario starts an `A2AServer` in-process on a loopback port, with `TaskManagerWithModifier`
+or `TaskManagerWithStore` and the in-memory store and queue, and drives it with concurrent
+HTTP clients. The results (throughput and p50/p99 latency) are written as JSON, so that runs
+on different commits can be compared.
+
+Usage:
+    python benchmarks/a2a_benchmark.py
+    python benchmarks/a2a_benchmark.py --quick --scenario send --scenario stream
+    python benchmarks/a2a_benchmark.py --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterable, AsyncIterator, Awaitable, Callable
+
+import aiohttp
+import uvicorn
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    Message,
+    SendTaskStreamingResponse,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from elkar.server.server import A2AServer
+from elkar.store.base import TaskManagerStore, UpdateTaskParams
+from elkar.task_manager.task_manager_base import RequestContext, TaskManager
+from elkar.task_manager.task_manager_with_store import TaskManagerWithStore, TaskSendOutput
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+
+TASK_MANAGERS = ("modifier", "store")
+SCENARIOS = ("send", "stream", "resubscribe", "get")
+
+AGENT_CARD = AgentCard(
+    name="benchmark",
+    url="http://127.0.0.1",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+@dataclass
+class Result:
+    scenario: str
+    task_manager: str
+    params: dict[str, Any]
+    operations: int
+    seconds: float
+    throughput: float
+    """Operations (requests, or events for streams) per second."""
+    latency_p50_ms: float
+    latency_p99_ms: float
+    errors: int = 0
+    extra: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{name}={value}" for name, value in sorted(self.params.items()))
+        return f"{self.scenario}[{self.task_manager}]({params})"
+
+
+def _result(
+    scenario: str,
+    task_manager: str,
+    params: dict[str, Any],
+    latencies: list[float],
+    seconds: float,
+    operations: int | None = None,
+    errors: int = 0,
+    extra: dict[str, float] | None = None,
+) -> Result:
+    operations = len(latencies) if operations is None else operations
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p99 = quantiles[49], quantiles[98]
+    else:
+        p50 = p99 = latencies[0] if latencies else 0.0
+    return Result(
+        scenario=scenario,
+        task_manager=task_manager,
+        params=params,
+        operations=operations,
+        seconds=round(seconds, 4),
+        throughput=round(operations / seconds, 2) if seconds > 0 else 0.0,
+        latency_p50_ms=round(p50 * 1000, 3),
+        latency_p99_ms=round(p99 * 1000, 3),
+        errors=errors,
+        extra=extra or {},
+    )
+
+
+# Handlers. The task metadata sets the number of artifact chunks and the delay between them;
+# each chunk carries the time at which it was produced, to measure the delivery latency.
+
+
+def _chunk(index: int, last: bool) -> Artifact:
+    return Artifact(
+        index=0,
+        append=index > 0,
+        lastChunk=last,
+        parts=[TextPart(text=repr(time.perf_counter()))],
+    )
+
+
+async def _wait_for_subscribers(metadata: dict[str, Any]) -> None:
+    # Gives the resubscribing clients the time to connect before the first chunk.
+    await asyncio.sleep(metadata.get("start_delay", 0))
+
+
+async def modifier_handler(task_modifier: TaskModifierBase, request_context: RequestContext | None) -> None:
+    metadata = (await task_modifier.get_task()).metadata or {}
+    chunks = int(metadata.get("chunks", 0))
+    await _wait_for_subscribers(metadata)
+    for index in range(chunks):
+        await task_modifier.upsert_artifacts([_chunk(index, index == chunks - 1)])
+        if metadata.get("interval"):
+            await asyncio.sleep(metadata["interval"])
+    await task_modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+async def store_handler(
+    task: Task, request_context: RequestContext | None, store: TaskManagerStore | None
+) -> TaskSendOutput:
+    return TaskSendOutput(status=TaskStatus(state=TaskState.COMPLETED))
+
+
+async def store_streaming_handler(
+    task: Task, request_context: RequestContext | None, store: TaskManagerStore | None
+) -> AsyncIterable[SendTaskStreamingResponse]:
+    metadata = task.metadata or {}
+    chunks = int(metadata.get("chunks", 0))
+    await _wait_for_subscribers(metadata)
+    for index in range(chunks):
+        yield SendTaskStreamingResponse(
+            result=TaskArtifactUpdateEvent(id=task.id, artifact=_chunk(index, index == chunks - 1))
+        )
+        if metadata.get("interval"):
+            await asyncio.sleep(metadata["interval"])
+    yield SendTaskStreamingResponse(
+        result=TaskStatusUpdateEvent(id=task.id, status=TaskStatus(state=TaskState.COMPLETED), final=True)
+    )
+
+
+def create_task_manager(name: str) -> TaskManager:
+    if name == "modifier":
+        return TaskManagerWithModifier(AGENT_CARD, send_task_handler=modifier_handler)
+    return TaskManagerWithStore(
+        AGENT_CARD,
+        send_task_handler=store_handler,
+        send_task_streaming_handler=store_streaming_handler,
+    )
+
+
+# Server and clients.
+
+
+@dataclass
+class RunningServer:
+    url: str
+    task_manager: TaskManager
+    server: uvicorn.Server
+    task: asyncio.Task
+
+
+async def start_server(task_manager: TaskManager) -> RunningServer:
+    app = A2AServer(task_manager, metrics_path=None).app
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False, lifespan="off")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return RunningServer(url=f"http://127.0.0.1:{port}/", task_manager=task_manager, server=server, task=task)
+
+
+async def stop_server(running: RunningServer) -> None:
+    running.server.should_exit = True
+    await running.task
+    await running.task_manager.shutdown()
+
+
+def _request(method: str, params: dict[str, Any]) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": method, "params": params}
+
+
+def _send_params(task_id: str, metadata: dict[str, Any] | None = None) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "id": task_id,
+        "message": {"role": "user", "parts": [{"type": "text", "text": "benchmark"}]},
+    }
+    if metadata is not None:
+        params["metadata"] = metadata
+    return params
+
+
+async def _post(session: aiohttp.ClientSession, url: str, body: dict[str, Any]) -> dict[str, Any]:
+    async with session.post(url, json=body) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def _events(
+    session: aiohttp.ClientSession, url: str, body: dict[str, Any]
+) -> AsyncGenerator[dict[str, Any], None]:
+    async with session.post(url, json=body) as response:
+        response.raise_for_status()
+        async for line in response.content:
+            if line.startswith(b"data:"):
+                yield json.loads(line[5:])
+
+
+async def _run_concurrently(
+    count: int, concurrency: int, operation: Callable[[int], Awaitable[None]]
+) -> tuple[list[float], float, int]:
+    """Run `operation(index)` `count` times with `concurrency` workers. Return latencies, seconds and errors."""
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(count))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            start = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, errors
+
+
+# Scenarios.
+
+
+async def bench_send(
+    running: RunningServer, session: aiohttp.ClientSession, name: str, requests: int, concurrency: int
+) -> list[Result]:
+    run_id = uuid.uuid4().hex[:8]
+
+    async def send(index: int) -> None:
+        response = await _post(session, running.url, _request("tasks/send", _send_params(f"send-{run_id}-{index}")))
+        if response.get("error") is not None:
+            raise RuntimeError(response["error"])
+
+    latencies, seconds, errors = await _run_concurrently(requests, concurrency, send)
+    return [_result("send", name, {"concurrency": concurrency}, latencies, seconds, errors=errors)]
+
+
+async def _stream_task(
+    running: RunningServer,
+    session: aiohttp.ClientSession,
+    chunks: int,
+    interval: float,
+    subscribers: int,
+) -> tuple[list[float], int]:
+    """Stream a task to `subscribers` clients. Return the delivery latency of each chunk and the events received."""
+    task_id = f"stream-{uuid.uuid4().hex}"
+    start_delay = 0.05 if subscribers > 1 else 0
+    metadata = {"chunks": chunks, "interval": interval, "start_delay": start_delay}
+    latencies: list[float] = []
+    events = 0
+
+    async def consume(stream: AsyncIterator[dict[str, Any]]) -> None:
+        nonlocal events
+        async for event in stream:
+            received = time.perf_counter()
+            events += 1
+            result = event.get("result") or {}
+            artifact = result.get("artifact")
+            if artifact is not None:
+                latencies.append(received - float(artifact["parts"][0]["text"]))
+            elif result.get("final"):
+                return
+
+    send = _events(session, running.url, _request("tasks/sendSubscribe", _send_params(task_id, metadata)))
+    first = asyncio.create_task(consume(send))
+    # The task must exist before other clients can resubscribe to it.
+    while await running.task_manager.store.get_task(task_id) is None:  # type: ignore[attr-defined]
+        await asyncio.sleep(0.001)
+    others = [
+        consume(_events(session, running.url, _request("tasks/resubscribe", {"id": task_id})))
+        for _ in range(subscribers - 1)
+    ]
+    await asyncio.gather(first, *others)
+    return latencies, events
+
+
+async def bench_stream(
+    running: RunningServer,
+    session: aiohttp.ClientSession,
+    name: str,
+    streams: int,
+    chunk_settings: list[tuple[int, float]],
+    subscriber_counts: list[int],
+) -> list[Result]:
+    results = []
+    for chunks, interval in chunk_settings:
+        for subscribers in subscriber_counts:
+            latencies: list[float] = []
+            events = 0
+            start = time.perf_counter()
+            for stream_latencies, stream_events in await asyncio.gather(
+                *(_stream_task(running, session, chunks, interval, subscribers) for _ in range(streams))
+            ):
+                latencies.extend(stream_latencies)
+                events += stream_events
+            seconds = time.perf_counter() - start
+            expected = streams * subscribers * (chunks + 1)
+            results.append(
+                _result(
+                    "stream",
+                    name,
+                    {
+                        "streams": streams,
+                        "chunks": chunks,
+                        "interval_ms": interval * 1000,
+                        "subscribers": subscribers,
+                    },
+                    latencies,
+                    seconds,
+                    operations=events,
+                    errors=expected - events,
+                )
+            )
+    return results
+
+
+async def bench_resubscribe(
+    running: RunningServer, session: aiohttp.ClientSession, name: str, resubscribes: int, concurrency: int
+) -> list[Result]:
+    """Latency from a resubscribe request to its first event, with the streamed task producing chunks."""
+    task_id = f"resubscribe-{uuid.uuid4().hex}"
+    metadata = {"chunks": 1_000_000, "interval": 0.001}
+    producer = _events(session, running.url, _request("tasks/sendSubscribe", _send_params(task_id, metadata)))
+    first_event = await producer.__anext__()
+    if first_event.get("error") is not None:
+        raise RuntimeError(first_event["error"])
+
+    async def resubscribe(index: int) -> None:
+        stream = _events(session, running.url, _request("tasks/resubscribe", {"id": task_id}))
+        try:
+            event = await stream.__anext__()
+            if event.get("error") is not None:
+                raise RuntimeError(event["error"])
+        finally:
+            await stream.aclose()
+
+    latencies, seconds, errors = await _run_concurrently(resubscribes, concurrency, resubscribe)
+    await _post(session, running.url, _request("tasks/cancel", {"id": task_id}))
+    await producer.aclose()
+    return [_result("resubscribe", name, {"concurrency": concurrency}, latencies, seconds, errors=errors)]
+
+
+async def bench_get(
+    running: RunningServer,
+    session: aiohttp.ClientSession,
+    name: str,
+    requests: int,
+    concurrency: int,
+    history_sizes: list[int],
+) -> list[Result]:
+    results = []
+    store: TaskManagerStore = running.task_manager.store  # type: ignore[attr-defined]
+    for history_size in history_sizes:
+        task_id = f"get-{uuid.uuid4().hex}"
+        await store.upsert_task(TaskSendParams.model_validate(_send_params(task_id)))
+        messages = [
+            Message(role="agent" if index % 2 else "user", parts=[TextPart(text=f"message {index} " + "x" * 200)])
+            for index in range(history_size)
+        ]
+        await store.update_task(task_id, UpdateTaskParams(new_messages=messages))
+        response_size = 0
+
+        async def get(index: int) -> None:
+            nonlocal response_size
+            async with session.post(running.url, json=_request("tasks/get", {"id": task_id})) as response:
+                body = await response.read()
+            response_size = len(body)
+            if b'"error"' in body[:100]:
+                raise RuntimeError(body[:200])
+
+        latencies, seconds, errors = await _run_concurrently(requests, concurrency, get)
+        results.append(
+            _result(
+                "get",
+                name,
+                {"concurrency": concurrency, "history": history_size},
+                latencies,
+                seconds,
+                errors=errors,
+                extra={"response_bytes": response_size},
+            )
+        )
+    return results
+
+
+async def run(scenarios: list[str], task_managers: list[str], quick: bool) -> list[Result]:
+    scale = 0.1 if quick else 1.0
+    results: list[Result] = []
+    for name in task_managers:
+        running = await start_server(create_task_manager(name))
+        connector = aiohttp.TCPConnector(limit=0)
+        try:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                # Warm up the connections and the code paths.
+                await bench_send(running, session, name, 50, 10)
+                if "send" in scenarios:
+                    for concurrency in (1, 16, 64):
+                        results += await bench_send(running, session, name, int(2000 * scale) or 1, concurrency)
+                if "stream" in scenarios:
+                    results += await bench_stream(
+                        running,
+                        session,
+                        name,
+                        streams=int(20 * scale) or 1,
+                        chunk_settings=[(100, 0.0), (100, 0.001), (20, 0.01)],
+                        subscriber_counts=[1, 10],
+                    )
+                if "resubscribe" in scenarios:
+                    results += await bench_resubscribe(running, session, name, int(500 * scale) or 1, 16)
+                if "get" in scenarios:
+                    results += await bench_get(
+                        running, session, name, int(500 * scale) or 1, 16, history_sizes=[10, 1_000, 10_000]
+                    )
+        finally:
+            await stop_server(running)
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[Result], baseline_path: Path) -> None:
+    baseline = {
+        Result(**{**result, "extra": result.get("extra", {})}).key: result
+        for result in json.loads(baseline_path.read_text())["results"]
+    }
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous is None:
+            continue
+        throughput = result.throughput / previous["throughput"] - 1 if previous["throughput"] else 0.0
+        p99 = result.latency_p99_ms / previous["latency_p99_ms"] - 1 if previous["latency_p99_ms"] else 0.0
+        print(f"  {result.key}: throughput {throughput:+.1%}, p99 latency {p99:+.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenarios to run (default: all).")
+    parser.add_argument("--task-manager", action="append", choices=TASK_MANAGERS, help="Default: all.")
+    parser.add_argument("--quick", action="store_true", help="Run a tenth of the operations.")
+    parser.add_argument("--output", type=Path, help="Default: benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", type=Path, help="Results of a previous run to compare with.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.scenario or list(SCENARIOS), args.task_manager or list(TASK_MANAGERS), args.quick))
+    for result in results:
+        print(
+            f"{result.key}: {result.throughput:.0f}/s, p50 {result.latency_p50_ms:.2f} ms, "
+            f"p99 {result.latency_p99_ms:.2f} ms" + (f", {result.errors} errors" if result.errors else "")
+        )
+
+    commit = _commit()
+    output = args.output or Path(__file__).parent / "results" / f"{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "commit": commit,
+                "date": datetime.now(timezone.utc).isoformat(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "quick": args.quick,
+                "results": [asdict(result) for result in results],
+            },
+            indent=2,
+        )
+    )
+    print(f"\nResults written to {output}")
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Microbenchmarks of the A2A models on the event path: building, serializing and validating
+streamed events, in events per second (best of several runs).
+
+`streamed_event` measures a whole streamed status event, from `TaskModifier.set_status`
+through the in-memory store and queue to the serialized SSE payload, in µs and in bytes
+allocated at peak (tracemalloc) per event.
+
+Usage:
+    python benchmarks/a2a_types_benchmark.py [--number 20000] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    Message,
+    SendTaskStreamingResponse,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from elkar.api_client.models import EnqueueTaskEventInput, UnpaginatedOutput
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_with_store import TaskManagerWithStore
+from elkar.task_modifier.task_modifier import TaskModifier
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+
+def build_artifact_update() -> TaskArtifactUpdateEvent:
+    artifact = Artifact(index=0, append=True, parts=[TextPart(text="chunk of streamed text")])
+    return TaskArtifactUpdateEvent(id="task", artifact=artifact)
+
+
+def build_status_update() -> TaskStatusUpdateEvent:
+    status = TaskStatus(
+        state=TaskState.WORKING,
+        message=Message(role="agent", parts=[TextPart(text="working")]),
+        timestamp=datetime.now(),
+    )
+    return TaskStatusUpdateEvent(id="task", status=status)
+
+
+def build_artifact_event() -> SendTaskStreamingResponse:
+    return SendTaskStreamingResponse(id=1, result=build_artifact_update())
+
+
+def build_status_event() -> SendTaskStreamingResponse:
+    return SendTaskStreamingResponse(id=1, result=build_status_update())
+
+
+def _task(history: int) -> Task:
+    return Task(
+        id="task",
+        status=TaskStatus(state=TaskState.COMPLETED, timestamp=datetime.now()),
+        history=[Message(role="user", parts=[TextPart(text=f"message {index}")]) for index in range(history)],
+        artifacts=[Artifact(index=0, parts=[TextPart(text="result")])],
+    )
+
+
+def cases() -> dict[str, tuple[Callable[[], object], int]]:
+    """Name -> (function, events per call)."""
+    artifact_update = build_artifact_update()
+    status_update = build_status_update()
+    artifact_event = SendTaskStreamingResponse(id=1, result=artifact_update)
+    status_event = SendTaskStreamingResponse(id=1, result=status_update)
+    status_event_json = status_event.model_dump_json(exclude_none=True)
+    artifact_event_json = artifact_event.model_dump_json(exclude_none=True)
+    task = _task(100)
+    dequeue_output_json = json.dumps(
+        {
+            "records": [
+                {
+                    "id": "00000000-0000-0000-0000-000000000000",
+                    "task_id": "task",
+                    "event_data": event.model_dump(),
+                }
+                for event in (status_update, artifact_update)
+            ]
+        }
+    )
+    return {
+        "build_artifact_event": (build_artifact_event, 1),
+        "build_status_event": (build_status_event, 1),
+        "dump_json_artifact_event": (lambda: artifact_event.model_dump_json(exclude_none=True), 1),
+        "dump_json_status_event": (lambda: status_event.model_dump_json(exclude_none=True), 1),
+        "dump_status_event": (lambda: json.dumps(status_event.model_dump(exclude_none=True)), 1),
+        "validate_json_artifact_event": (
+            lambda: SendTaskStreamingResponse.model_validate_json(artifact_event_json),
+            1,
+        ),
+        "validate_json_status_event": (lambda: SendTaskStreamingResponse.model_validate_json(status_event_json), 1),
+        "loads_and_validate_status_event": (
+            lambda: SendTaskStreamingResponse(**json.loads(status_event_json)),
+            1,
+        ),
+        "build_and_dump_artifact_event": (
+            lambda: build_artifact_event().model_dump_json(exclude_none=True),
+            1,
+        ),
+        "dump_task_100_messages": (lambda: json.dumps(task.model_dump(exclude_none=True)), 1),
+        "encode_enqueue_input": (
+            lambda: EnqueueTaskEventInput(task_id="task", event=status_update).model_dump_json(exclude_none=True),
+            1,
+        ),
+        "decode_dequeue_output": (lambda: UnpaginatedOutput.model_validate_json(dequeue_output_json), 2),
+    }
+
+
+async def measure_streamed_events(number: int) -> dict[str, float]:
+    store = InMemoryTaskManagerStore()
+    queue = InMemoryTaskEventQueue()
+    message = Message(role="user", parts=[TextPart(text="hello")])
+    stored_task = await store.upsert_task(TaskSendParams(id="task", message=message))
+    await queue.add_subscriber("task", "subscriber")
+    modifier = TaskModifier(stored_task.task, store=store, queue=queue)
+    task_manager = TaskManagerWithStore(
+        AgentCard(name="benchmark", url="", version="1", capabilities=AgentCapabilities(), skills=[]),
+        store=store,
+        queue=queue,
+    )
+    events = aiter(task_manager.try_dequeue_task_events(1, "task", "subscriber"))
+
+    async def stream_event() -> None:
+        # Without a message, so that the history (copied on each update) does not grow.
+        await modifier.set_status(TaskStatus(state=TaskState.WORKING))
+        response = await anext(events)
+        response.model_dump_json(exclude_none=True)
+
+    for _ in range(number // 10):
+        await stream_event()
+    start = time.perf_counter()
+    for _ in range(number):
+        await stream_event()
+    seconds = time.perf_counter() - start
+
+    peak_bytes = 0
+    tracemalloc.start()
+    for _ in range(1000):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        await stream_event()
+        peak_bytes += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return {"us_per_event": seconds / number * 1e6, "peak_bytes_per_event": peak_bytes / 1000}
+
+
+def run(number: int, repeat: int) -> dict[str, float]:
+    results = {}
+    for name, (function, events) in cases().items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            best = min(best, time.perf_counter() - start)
+        results[name] = number * events / best
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20_000, help="Calls per run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the best is kept.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.number, args.repeat)
+    for name, events_per_second in results.items():
+        print(f"{name:32} {events_per_second:>12,.0f} events/s  {1e6 / events_per_second:8.2f} µs/event")
+    streamed = min(
+        (asyncio.run(measure_streamed_events(args.number)) for _ in range(args.repeat)),
+        key=lambda result: result["us_per_event"],
+    )
+    print(
+        f"{'streamed_event':32} {1e6 / streamed['us_per_event']:>12,.0f} events/s  "
+        f"{streamed['us_per_event']:8.2f} µs/event  {streamed['peak_bytes_per_event']:,.0f} B/event"
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps({**results, "streamed_event": streamed}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
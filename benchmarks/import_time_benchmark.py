@@ -0,0 +1,94 @@
+"""
+Import time of the `elkar` packages, each import in a fresh interpreter (best of several runs),
+with the heavy dependencies it loads. Exits with status 1 when an import goes over its budget
+or loads a dependency it must not, so it can run in CI.
+
+The time budgets are generous on purpose: they catch an eager import of the server or of a
+client library, not the noise of the machine. Pass `--scale` to adjust them on slow runners.
+
+Usage:
+    python benchmarks/import_time_benchmark.py [--repeat 5] [--scale 1.0] [--output results.json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+HEAVY_MODULES = ("httpx", "aiohttp", "mcp", "uvicorn", "starlette", "sse_starlette", "jwt", "orjson", "msgspec")
+
+
+@dataclass
+class ImportCase:
+    statement: str
+    budget_ms: float
+    forbidden: tuple[str, ...]
+
+
+CASES = [
+    ImportCase("import elkar", 20, HEAVY_MODULES),
+    ImportCase("import elkar.a2a_types", 400, HEAVY_MODULES),
+    ImportCase("from elkar.store import InMemoryTaskManagerStore", 500, HEAVY_MODULES),
+    ImportCase("from elkar.task_queue import InMemoryTaskEventQueue", 500, HEAVY_MODULES),
+    ImportCase("from elkar.task_modifier import TaskModifier", 500, HEAVY_MODULES),
+    ImportCase("from elkar.task_manager import TaskManagerWithModifier", 600, HEAVY_MODULES),
+    ImportCase("from elkar.client.a2a_client import A2AClient", 700, ("httpx", "mcp", "starlette", "uvicorn")),
+    ImportCase("from elkar.store import ElkarClientStore", 800, ("aiohttp", "mcp", "starlette", "uvicorn")),
+    ImportCase("from elkar import A2AServer", 1000, ("httpx", "aiohttp", "mcp")),
+]
+
+_MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"ms": seconds * 1e3, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(case: ImportCase, repeat: int) -> dict[str, Any]:
+    best = float("inf")
+    loaded: list[str] = []
+    for _ in range(repeat):
+        code = _MEASURE.format(statement=case.statement, heavy=HEAVY_MODULES)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout)
+        best = min(best, result["ms"])
+        loaded = result["loaded"]
+    return {"ms": best, "loaded": loaded}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per import; the best is kept.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor applied to every time budget.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    failures: list[str] = []
+    for case in CASES:
+        result = measure(case, args.repeat)
+        budget = case.budget_ms * args.scale
+        forbidden = [module for module in result["loaded"] if module in case.forbidden]
+        results[case.statement] = {**result, "budget_ms": budget}
+        status = "ok" if result["ms"] <= budget and not forbidden else "FAIL"
+        loaded = ", ".join(result["loaded"]) or "-"
+        print(f"{case.statement:55} {result['ms']:8.1f} ms / {budget:6.0f} ms  {status:4}  loads: {loaded}")
+        if result["ms"] > budget:
+            failures.append(f"{case.statement}: {result['ms']:.1f} ms over the budget of {budget:.0f} ms")
+        if forbidden:
+            failures.append(f"{case.statement}: imports {', '.join(forbidden)}")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
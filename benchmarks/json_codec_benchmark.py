@@ -0,0 +1,130 @@
+"""
+Encoding and decoding of `Task` payloads with large histories through `PydanticJSONCodec`, against
+the stdlib `json` path used before the codecs (`json.dumps(model_dump())` and
+`model_validate(json.loads())`), and against `orjson` and `msgspec` when installed. Best of several
+runs, in µs per payload and MB/s.
+
+`encode_model` and `decode_model` go through pydantic-core in one pass; the `orjson` and `msgspec`
+cases route the model through plain values instead (`dumps(model_dump(mode="json"))` and
+`model_validate(loads())`), which is what a codec built on those libraries would do.
+
+Usage:
+    python benchmarks/json_codec_benchmark.py [--histories 10 1000 10000] [--output results.json]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from elkar.a2a_types import Artifact, Message, Task, TaskState, TaskStatus, TextPart
+from elkar.json_codec import PydanticJSONCodec
+
+
+def build_task(history: int) -> Task:
+    return Task(
+        id="task",
+        sessionId="session",
+        status=TaskStatus(state=TaskState.COMPLETED, timestamp=datetime.now()),
+        history=[
+            Message(
+                role="user" if index % 2 == 0 else "agent",
+                parts=[TextPart(text=f"Message {index} of the conversation, with a few words of content.")],
+            )
+            for index in range(history)
+        ],
+        artifacts=[Artifact(index=0, parts=[TextPart(text="result")])],
+    )
+
+
+def native_libraries() -> dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any]]]:
+    """The `dumps` and `loads` of the JSON libraries installed."""
+    libraries: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {}
+    try:
+        import orjson  # type: ignore[import-not-found]
+
+        libraries["orjson"] = (orjson.dumps, orjson.loads)
+    except ImportError:
+        pass
+    try:
+        import msgspec  # type: ignore[import-not-found]
+
+        libraries["msgspec"] = (msgspec.json.encode, msgspec.json.decode)
+    except ImportError:
+        pass
+    return libraries
+
+
+def best_time(function: Callable[[], Any], number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def library_cases(
+    name: str, dumps: Callable[[Any], Any], loads: Callable[[Any], Any], task: Task, data: bytes, plain: dict[str, Any]
+) -> dict[str, Callable[[], Any]]:
+    return {
+        f"{name}.encode_model": lambda: dumps(task.model_dump(mode="json", exclude_none=True)),
+        f"{name}.decode_model": lambda: Task.model_validate(loads(data)),
+        f"{name}.encode": lambda: dumps(plain),
+        f"{name}.decode": lambda: loads(data),
+    }
+
+
+def run(histories: list[int], repeat: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    for history in histories:
+        task = build_task(history)
+        data = task.model_dump_json(exclude_none=True).encode()
+        plain = task.model_dump(mode="json", exclude_none=True)
+        number = max(3, 20_000 // max(history, 1))
+        cases: dict[str, Callable[[], Any]] = {
+            "stdlib.encode_model": lambda: json.dumps(task.model_dump(exclude_none=True)).encode(),
+            "stdlib.decode_model": lambda: Task.model_validate(json.loads(data)),
+            "stdlib.encode": lambda: json.dumps(plain).encode(),
+            "stdlib.decode": lambda: json.loads(data),
+        }
+        codec = PydanticJSONCodec()
+        cases.update(
+            {
+                "pydantic.encode_model": lambda: codec.encode_model(task),
+                "pydantic.decode_model": lambda: codec.decode_model(Task, data),
+                "pydantic.encode": lambda: codec.encode(plain),
+                "pydantic.decode": lambda: codec.decode(data),
+            }
+        )
+        for name, (dumps, loads) in native_libraries().items():
+            cases.update(library_cases(name, dumps, loads, task, data, plain))
+        for name, function in cases.items():
+            seconds = best_time(function, number, repeat)
+            results[f"history={history}/{name}"] = {
+                "us": seconds * 1e6,
+                "mb_per_second": len(data) / seconds / 1e6,
+                "bytes": len(data),
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--histories", type=int, nargs="+", default=[10, 1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the best is kept.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.histories, args.repeat)
+    for name, result in results.items():
+        print(f"{name:48} {result['us']:>12,.1f} µs  {result['mb_per_second']:8.1f} MB/s")
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Delivery of push notifications against a local stub receiver.
+
+A Starlette receiver is started in-process on a loopback port; it answers after `--receiver-delay`
+seconds and answers a `--failure-rate` share of the requests (at random) with a 503. The
+benchmark notifies `--updates` states for each of `--tasks` tasks through `PushNotificationSender`
+and waits until the final state of every task is delivered (or given up). It reports the deliveries per second,
+the p50/p99 latency from `notify` to delivery, and how many states were coalesced or retried.
+
+Usage:
+    python benchmarks/push_notification_benchmark.py [--tasks 200] [--updates 10] [--receiver-delay 0.005]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+
+from elkar.a2a_types import PushNotificationConfig, Task, TaskState, TaskStatus
+from elkar.common import TaskType
+from elkar.push_notification.sender import PushNotificationSender
+from elkar.store.base import StoredTask
+
+
+class StubReceiver:
+    def __init__(self, delay: float, failure_rate: float) -> None:
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.final: set[str] = set()
+        self._random = random.Random(0)
+
+    async def receive(self, request: Request) -> Response:
+        self.requests += 1
+        task = json.loads(await request.body())
+        await asyncio.sleep(self.delay)
+        if self._random.random() < self.failure_rate:
+            return Response(status_code=503)
+        if task["status"]["state"] == TaskState.COMPLETED.value:
+            self.final.add(task["id"])
+        return Response(status_code=200)
+
+
+async def start_receiver(receiver: StubReceiver) -> tuple[uvicorn.Server, asyncio.Task[None], str]:
+    app = Starlette()
+    app.add_route("/notify", receiver.receive, methods=["POST"])
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False, lifespan="off")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}/notify"
+
+
+def stored_task(task_id: str, state: TaskState, url: str) -> StoredTask:
+    return StoredTask(
+        id=task_id,
+        caller_id=None,
+        task_type=TaskType.INCOMING,
+        is_streaming=False,
+        task=Task(id=task_id, status=TaskStatus(state=state)),
+        push_notification=PushNotificationConfig(url=url),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    receiver = StubReceiver(args.receiver_delay, args.failure_rate)
+    server, server_task, url = await start_receiver(receiver)
+    sender = PushNotificationSender(
+        max_concurrency_per_destination=args.concurrency,
+        base_retry_delay=args.retry_delay,
+        retry_poll_interval=args.retry_delay / 2,
+    )
+    task_ids = [f"task-{index}" for index in range(args.tasks)]
+    start = time.perf_counter()
+    for update in range(args.updates):
+        state = TaskState.COMPLETED if update == args.updates - 1 else TaskState.WORKING
+        for task_id in task_ids:
+            sender.notify(stored_task(task_id, state, url))
+        await asyncio.sleep(args.update_interval)
+    # Deliveries given up (after `max_attempts`) never reach the receiver.
+    while len(receiver.final) + sender.stats.failed < len(task_ids):
+        await asyncio.sleep(0.001)
+    seconds = time.perf_counter() - start
+    await sender.close()
+    server.should_exit = True
+    await server_task
+
+    latencies = sorted(sender.stats.latencies)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) >= 2 else latencies * 99
+    return {
+        "notified": args.tasks * args.updates,
+        "requests": receiver.requests,
+        "delivered": sender.stats.delivered,
+        "coalesced": sender.stats.coalesced,
+        "retried": sender.stats.retried,
+        "failed": sender.stats.failed,
+        "seconds": round(seconds, 4),
+        "deliveries_per_second": round(sender.stats.delivered / seconds, 1),
+        "latency_p50_ms": round(quantiles[49] * 1000, 3),
+        "latency_p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=10, help="States notified per task, the last one final.")
+    parser.add_argument("--update-interval", type=float, default=0.001, help="Seconds between two rounds of states.")
+    parser.add_argument("--receiver-delay", type=float, default=0.005, help="Seconds the receiver takes to answer.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with a 503.")
+    parser.add_argument("--concurrency", type=int, default=8, help="max_concurrency_per_destination")
+    parser.add_argument("--retry-delay", type=float, default=0.05, help="base_retry_delay")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    # Failed deliveries are expected with --failure-rate.
+    logging.getLogger("elkar.push_notification.sender").setLevel(logging.ERROR)
+    results = asyncio.run(run(args))
+    for name, value in results.items():
+        print(f"{name:24} {value}")
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Cost of appending to a task of the in-memory store as it grows: a streamed artifact receiving
+one part per update, and a history receiving one message per update, measured at several
+sizes (µs per append, best of several runs). An append must not get slower as the task grows;
+the benchmark exits with status 1 when the cost at the largest size is more than `--max-growth`
+times the cost at the smallest one, so it can run in CI.
+
+Usage:
+    python benchmarks/store_benchmark.py [--sizes 100 1000 10000] [--max-growth 3] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from elkar.a2a_types import Artifact, Message, TaskSendParams, TextPart
+from elkar.store.base import UpdateTaskParams
+from elkar.store.in_memory import InMemoryTaskManagerStore
+
+
+def artifact_update(index: int) -> UpdateTaskParams:
+    return UpdateTaskParams(artifacts_updates=[Artifact(index=0, parts=[TextPart(text=f"chunk {index}")], append=True)])
+
+
+def message_update(index: int) -> UpdateTaskParams:
+    return UpdateTaskParams(new_messages=[Message(role="agent", parts=[TextPart(text=f"message {index}")])])
+
+
+UPDATES = {"artifact": artifact_update, "message": message_update}
+
+
+async def append_cost(case: str, size: int, repeat: int) -> float:
+    """Best µs per append over the last tenth of `size` appends to one task."""
+    build = UPDATES[case]
+    updates = [build(index) for index in range(size)]
+    window = max(1, size // 10)
+    best = float("inf")
+    for _ in range(repeat):
+        store = InMemoryTaskManagerStore()
+        await store.upsert_task(TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="go")])))
+        for params in updates[:-window]:
+            await store.update_task("task", params)
+        start = time.perf_counter()
+        for params in updates[-window:]:
+            await store.update_task("task", params)
+        best = min(best, (time.perf_counter() - start) / window)
+    return best * 1e6
+
+
+async def run(sizes: list[int], repeat: int) -> dict[str, dict[int, float]]:
+    results: dict[str, dict[int, float]] = {}
+    for case in UPDATES:
+        results[case] = {size: await append_cost(case, size, repeat) for size in sizes}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Appends per task.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is kept.")
+    parser.add_argument("--max-growth", type=float, default=3.0, help="Allowed cost ratio of the largest size.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    results = asyncio.run(run(sizes, args.repeat))
+    failures: list[str] = []
+    for case, costs in results.items():
+        for size, cost in costs.items():
+            print(f"{case:10} {size:8} appends  {cost:8.2f} µs per append")
+        growth = costs[sizes[-1]] / costs[sizes[0]]
+        print(f"{case:10} growth x{growth:.2f}")
+        if growth > args.max_growth:
+            failures.append(f"{case}: an append costs x{growth:.2f} more at {sizes[-1]} than at {sizes[0]}")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
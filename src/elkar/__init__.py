@@ -1,7 +1,14 @@
+from typing import TYPE_CHECKING
+
+from ._lazy import lazy_exports
+
 __version__ = "0.1.23"
 
-# from . import a2a_errors, a2a_types, json_rpc, server, store, task_manager, task_modifier, task_queue
-from .server import A2AServer
+if TYPE_CHECKING:
+    from .server import A2AServer
+
+# The server (and starlette) is only imported when `A2AServer` is first used.
+__getattr__, __dir__ = lazy_exports(__name__, {"A2AServer": ".server"})
 
 __all__ = [
     "A2AServer",
@@ -0,0 +1,35 @@
+"""
+Lazy re-exports for the package `__init__` modules.
+
+A package lists its public names with the submodule defining each of them; the submodule is only
+imported when one of its names is first accessed, so that importing a package (or `elkar` itself)
+does not import the server, its dependencies and every other submodule.
+"""
+
+import importlib
+from typing import Any, Callable
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Return the module `__getattr__` and `__dir__` of `package`, for `exports` mapping each name
+    to the submodule defining it (relative to the package, e.g. `".server"`).
+
+    Usage:
+        __getattr__, __dir__ = lazy_exports(__name__, {"A2AServer": ".server"})
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        # Later accesses find the name in the package namespace and skip `__getattr__`.
+        namespace[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*namespace, *exports})
+
+    return __getattr__, __dir__
@@ -8,14 +8,17 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PlainSerializer,
     TypeAdapter,
-    field_serializer,
     model_validator,
 )
 from typing_extensions import Self
 
 from elkar.json_rpc import JSONRPCError, JSONRPCRequest, JSONRPCResponse
 
+Timestamp = Annotated[datetime, PlainSerializer(datetime.isoformat, return_type=str)]
+"""A datetime dumped as an ISO 8601 string, in Python mode as well as in JSON mode."""
+
 
 class TaskState(str, Enum):
     SUBMITTED = "submitted"
@@ -72,11 +75,7 @@ class Message(BaseModel):
 class TaskStatus(BaseModel):
     state: TaskState
     message: Message | None = None
-    timestamp: datetime = Field(default_factory=datetime.now)
-
-    @field_serializer("timestamp")
-    def serialize_dt(self, dt: datetime, _info):
-        return dt.isoformat()
+    timestamp: Timestamp = Field(default_factory=datetime.now)
 
 
 class Artifact(BaseModel):
@@ -99,6 +98,8 @@ class Task(BaseModel):
 
 
 class TaskStatusUpdateEvent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     status: TaskStatus
     final: bool = False
@@ -106,13 +107,21 @@ class TaskStatusUpdateEvent(BaseModel):
 
 
 class TaskArtifactUpdateEvent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     artifact: Artifact
 
     metadata: dict[str, Any] | None = None
 
 
-TaskEvent = TaskStatusUpdateEvent | TaskArtifactUpdateEvent | JSONRPCError
+# Events built by the server are passed along as model instances, which pydantic does not
+# validate again. Events read from JSON (e.g. from the Elkar API) are validated against the
+# members in order, instead of against all of them to pick the best match.
+TaskEvent = Annotated[
+    TaskStatusUpdateEvent | TaskArtifactUpdateEvent | JSONRPCError,
+    Field(union_mode="left_to_right"),
+]
 
 
 class AuthenticationInfo(BaseModel):
@@ -170,7 +179,10 @@ class SendTaskStreamingRequest(JSONRPCRequest):
 
 
 class SendTaskStreamingResponse(JSONRPCResponse):
-    result: TaskStatusUpdateEvent | TaskArtifactUpdateEvent | None = None
+    result: Annotated[
+        TaskStatusUpdateEvent | TaskArtifactUpdateEvent | None,
+        Field(union_mode="left_to_right"),
+    ] = None
 
 
 class GetTaskRequest(JSONRPCRequest):
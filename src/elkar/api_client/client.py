@@ -1,6 +1,8 @@
+from __future__ import annotations
+
 import os
+from typing import TYPE_CHECKING
 
-import httpx
 from pydantic import BaseModel
 
 from elkar.api_client.models import (
@@ -14,14 +16,20 @@ from elkar.api_client.models import (
     UpdateTaskInput,
     UpsertTaskA2AInput,
 )
+from elkar.json_codec import JSONCodec, PydanticJSONCodec
+from elkar.tracing import inject_trace_headers, span
+
+if TYPE_CHECKING:
+    import httpx
 
 
 class ElkarClient:
-    def __init__(self, base_url: str, api_key: str | None = None) -> None:
+    def __init__(self, base_url: str, api_key: str | None = None, json_codec: JSONCodec | None = None) -> None:
         self.base_url = base_url
         self.api_key = api_key or os.getenv("ELKAR_API_KEY")
         if not self.api_key:
             raise ValueError("API key is not set")
+        self.json_codec = json_codec or PydanticJSONCodec()
 
     async def make_request(
         self,
@@ -35,16 +43,20 @@ class ElkarClient:
             "Content-Type": "application/json",
             "x-api-key": f"{self.api_key}",
         }
-        param_dict = params.model_dump(exclude_none=True) if params else None
+        content = self.json_codec.encode_model(params) if params else None
         query_param_dict = query_params.model_dump(exclude_none=True) if query_params else None
 
-        async with httpx.AsyncClient() as client:
-            response = await client.request(method, url, headers=headers, json=param_dict, params=query_param_dict)
+        import httpx
+
+        with span("elkar.api.request", {"http.request.method": method, "url.path": path}):
+            inject_trace_headers(headers)
+            async with httpx.AsyncClient() as client:
+                response = await client.request(method, url, headers=headers, content=content, params=query_param_dict)
         return response
 
     async def upsert_task(self, params: CreateTaskInput) -> TaskResponse:
         output = await self.make_request("/tasks", "POST", params)
-        return TaskResponse.model_validate(output.json())
+        return self.json_codec.decode_model(TaskResponse, output.content)
 
     async def get_task(self, task_id: str, query_params: GetTaskQueryParams) -> None | TaskResponse:
         output = await self.make_request(
@@ -57,7 +69,7 @@ class ElkarClient:
         if output.status_code != 200:
             raise Exception(f"Error getting task: {output.status_code} {output.text}")
 
-        return TaskResponse.model_validate(output.json())
+        return self.json_codec.decode_model(TaskResponse, output.content)
 
     async def update_task(self, task_id: str, params: UpdateTaskInput) -> TaskResponse:
         output = await self.make_request(
@@ -65,7 +77,7 @@ class ElkarClient:
             "PUT",
             params,
         )
-        return TaskResponse.model_validate(output.json())
+        return self.json_codec.decode_model(TaskResponse, output.content)
 
     async def enqueue_task_event(self, params: EnqueueTaskEventInput) -> None:
         output = await self.make_request("/task-events/enqueue", "POST", params)
@@ -78,7 +90,7 @@ class ElkarClient:
         if output.status_code != 200:
             raise Exception(f"Error dequeuing task event: {output.status_code} {output.text}")
 
-        return UnpaginatedOutput.model_validate(output.json())
+        return self.json_codec.decode_model(UnpaginatedOutput, output.content)
 
     async def create_task_subscriber(self, params: CreateTaskSubscriberRequest) -> None:
         output = await self.make_request("/task-events/subscribers", "POST", params)
@@ -86,8 +98,8 @@ class ElkarClient:
 
     async def upsert_task_client_side(self, params: UpsertTaskA2AInput) -> TaskResponse:
         output = await self.make_request("/client-side/tasks", "POST", params)
-        return TaskResponse.model_validate(output.json())
+        return self.json_codec.decode_model(TaskResponse, output.content)
 
     async def get_task_client_side(self, task_id: str) -> TaskResponse:
         output = await self.make_request(f"/client-side/tasks/{task_id}", "GET")
-        return TaskResponse.model_validate(output.json())
+        return self.json_codec.decode_model(TaskResponse, output.content)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -47,6 +47,7 @@ class UpdateTaskInput(BaseModel):
     status: Optional[TaskStatus] = None
     artifacts_updates: Optional[list[Artifact]] = None
     new_messages: Optional[list[Message]] = None
+    metadata: Optional[dict[str, Any]] = None
     push_notification: Optional[PushNotificationConfig] = None
     caller_id: Optional[str] = None
 
@@ -0,0 +1,30 @@
+from typing import TYPE_CHECKING
+
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import BlobStore, externalize_artifact, externalize_message, externalize_parts, load_file_content
+    from .file_system import FileSystemBlobStore, MemoryMappedBlobStore
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "BlobStore": ".base",
+        "externalize_artifact": ".base",
+        "externalize_message": ".base",
+        "externalize_parts": ".base",
+        "load_file_content": ".base",
+        "FileSystemBlobStore": ".file_system",
+        "MemoryMappedBlobStore": ".file_system",
+    },
+)
+
+__all__ = [
+    "BlobStore",
+    "FileSystemBlobStore",
+    "MemoryMappedBlobStore",
+    "externalize_parts",
+    "externalize_message",
+    "externalize_artifact",
+    "load_file_content",
+]
@@ -0,0 +1,98 @@
+import base64
+import re
+from abc import abstractmethod
+from typing import Protocol
+
+from elkar.a2a_types import Artifact, FileContent, FilePart, Message, Part
+
+_BLOB_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobStore(Protocol):
+    """
+    Content-addressed storage for binary content, so that large files are stored once and
+    referenced by uri in tasks instead of being copied around as base64 strings.
+    A blob id is the SHA-256 of the content, as 64 hexadecimal characters.
+
+    Blobs belong to the caller that stored them: a blob put with a `caller_id` only exists for
+    reads with the same `caller_id`, as if other callers had never stored it.
+    """
+
+    @abstractmethod
+    async def put(self, content: bytes, caller_id: str | None = None) -> str:
+        """Store the content, if not already stored for the caller, and return its blob id."""
+        ...
+
+    @abstractmethod
+    async def size(self, blob_id: str, caller_id: str | None = None) -> int | None:
+        """Return the size of a blob of the caller, or None if it does not exist."""
+        ...
+
+    @abstractmethod
+    async def read(
+        self, blob_id: str, start: int = 0, end: int | None = None, caller_id: str | None = None
+    ) -> bytes | memoryview:
+        """Return the bytes from `start` to `end` (excluded) of a blob of the caller."""
+        ...
+
+    @abstractmethod
+    def uri(self, blob_id: str) -> str:
+        """Return the uri at which the blob is served (see `A2AServer(blob_store=...)`)."""
+        ...
+
+
+async def externalize_parts(
+    parts: list[Part], blob_store: BlobStore, min_size: int, caller_id: str | None = None
+) -> list[Part]:
+    """
+    Return the parts with the file parts whose base64 `bytes` are at least `min_size` characters
+    long replaced by a reference to a blob of the caller. The given list is left unchanged.
+    """
+    externalized: list[Part] | None = None
+    for index, part in enumerate(parts):
+        if not isinstance(part, FilePart) or part.file.bytes is None or len(part.file.bytes) < min_size:
+            continue
+        blob_id = await blob_store.put(base64.b64decode(part.file.bytes), caller_id)
+        if externalized is None:
+            externalized = list(parts)
+        externalized[index] = part.model_copy(
+            update={"file": FileContent(name=part.file.name, mimeType=part.file.mimeType, uri=blob_store.uri(blob_id))}
+        )
+    return externalized if externalized is not None else parts
+
+
+async def externalize_message(
+    message: Message, blob_store: BlobStore, min_size: int, caller_id: str | None = None
+) -> Message:
+    """Return the message with its large file parts moved to the blob store (see `externalize_parts`)."""
+    parts = await externalize_parts(message.parts, blob_store, min_size, caller_id)
+    return message if parts is message.parts else message.model_copy(update={"parts": parts})
+
+
+async def externalize_artifact(
+    artifact: Artifact, blob_store: BlobStore, min_size: int, caller_id: str | None = None
+) -> Artifact:
+    """Return the artifact with its large file parts moved to the blob store (see `externalize_parts`)."""
+    parts = await externalize_parts(artifact.parts, blob_store, min_size, caller_id)
+    return artifact if parts is artifact.parts else artifact.model_copy(update={"parts": parts})
+
+
+async def load_file_content(
+    file: FileContent, blob_store: BlobStore | None = None, caller_id: str | None = None
+) -> bytes | memoryview:
+    """
+    Return the content of a file part: the decoded `bytes`, or the blob of the caller its uri
+    refers to in `blob_store` (e.g. a file part spilled by `A2AServer(spill_file_parts_over=...)`).
+    Other uris are rejected.
+    """
+    if file.bytes is not None:
+        return base64.b64decode(file.bytes)
+    if file.uri is not None and blob_store is not None:
+        blob_id = file.uri.rsplit("/", 1)[-1]
+        if (
+            _BLOB_ID_PATTERN.fullmatch(blob_id)
+            and blob_store.uri(blob_id) == file.uri
+            and await blob_store.size(blob_id, caller_id) is not None
+        ):
+            return await blob_store.read(blob_id, caller_id=caller_id)
+    raise ValueError(f"File content is not available locally: {file.uri}")
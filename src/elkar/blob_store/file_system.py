@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from elkar.blob_store.base import BlobStore
+
+_BLOB_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class FileSystemBlobStore(BlobStore):
+    """
+    Stores each blob in a file of `directory`, named after its content hash, under a directory
+    per caller. Storing the same content twice for a caller writes it once.
+
+    `base_url` is the url at which `A2AServer` serves the blobs, e.g. `https://agent.example.com/blobs/`.
+    """
+
+    def __init__(self, directory: str | Path, base_url: str = "/blobs/") -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+
+    def path(self, blob_id: str, caller_id: str | None = None) -> Path:
+        if not _BLOB_ID_PATTERN.fullmatch(blob_id):
+            raise ValueError(f"Invalid blob id: {blob_id}")
+        # Caller ids are hashed: they are not safe path components.
+        caller = "anonymous" if caller_id is None else hashlib.sha256(caller_id.encode()).hexdigest()
+        return self.directory / caller / blob_id[:2] / blob_id
+
+    async def put(self, content: bytes, caller_id: str | None = None) -> str:
+        return await asyncio.to_thread(self._put, content, caller_id)
+
+    async def size(self, blob_id: str, caller_id: str | None = None) -> int | None:
+        try:
+            return os.stat(self.path(blob_id, caller_id)).st_size
+        except (ValueError, FileNotFoundError):
+            return None
+
+    async def read(
+        self, blob_id: str, start: int = 0, end: int | None = None, caller_id: str | None = None
+    ) -> bytes | memoryview:
+        return await asyncio.to_thread(self._read, self.path(blob_id, caller_id), start, end)
+
+    def uri(self, blob_id: str) -> str:
+        return f"{self.base_url}{blob_id}"
+
+    def _put(self, content: bytes, caller_id: str | None) -> str:
+        blob_id = hashlib.sha256(content).hexdigest()
+        path = self.path(blob_id, caller_id)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Written to a temporary file first, so that a blob is never read half-written.
+            descriptor, temporary_path = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(content)
+            os.replace(temporary_path, path)
+        return blob_id
+
+    def _read(self, path: Path, start: int, end: int | None) -> bytes:
+        with open(path, "rb") as file:
+            file.seek(start)
+            return file.read(-1 if end is None else end - start)
+
+
+class MemoryMappedBlobStore(FileSystemBlobStore):
+    """
+    Same storage as `FileSystemBlobStore`, but reads are slices of a memory map of the blob:
+    they do not copy the content and share the page cache with other processes. The maps of
+    the `max_open_maps` most recently read blobs are kept open.
+    """
+
+    def __init__(self, directory: str | Path, base_url: str = "/blobs/", max_open_maps: int = 128) -> None:
+        super().__init__(directory, base_url)
+        self.max_open_maps = max_open_maps
+        self._maps: OrderedDict[Path, mmap.mmap] = OrderedDict()
+
+    async def read(
+        self, blob_id: str, start: int = 0, end: int | None = None, caller_id: str | None = None
+    ) -> bytes | memoryview:
+        path = self.path(blob_id, caller_id)
+        blob_map = self._maps.get(path)
+        if blob_map is None:
+            if await self.size(blob_id, caller_id) == 0:
+                return b""
+            blob_map = await asyncio.to_thread(self._open_map, path)
+            self._maps[path] = blob_map
+            if len(self._maps) > self.max_open_maps:
+                # Not closed explicitly: slices returned earlier may still use it.
+                self._maps.popitem(last=False)
+        else:
+            self._maps.move_to_end(path)
+        return memoryview(blob_map)[start:end]
+
+    def _open_map(self, path: Path) -> mmap.mmap:
+        with open(path, "rb") as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
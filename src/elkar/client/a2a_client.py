@@ -1,8 +1,8 @@
-import json
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Any, AsyncIterable, Dict, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterable, Dict, Optional
 
-import aiohttp
 from pydantic import BaseModel
 
 from elkar.a2a_types import (
@@ -26,6 +26,11 @@ from elkar.a2a_types import (
     TaskSendParams,
 )
 from elkar.client.base import A2AClientBase
+from elkar.json_codec import JSONCodec, PydanticJSONCodec
+from elkar.tracing import inject_trace_headers
+
+if TYPE_CHECKING:
+    import aiohttp
 
 
 @dataclass
@@ -40,11 +45,14 @@ class A2AClientConfig:
 class A2AClient(A2AClientBase):
     """Client for interacting with A2A protocol servers."""
 
-    def __init__(self, config: A2AClientConfig):
+    def __init__(self, config: A2AClientConfig, json_codec: JSONCodec | None = None):
         self.config = config
+        self.json_codec = json_codec or PydanticJSONCodec()
         self._session: Optional[aiohttp.ClientSession] = None
 
     async def __aenter__(self):
+        import aiohttp
+
         self._session = aiohttp.ClientSession(
             headers=self.config.headers,
             timeout=aiohttp.ClientTimeout(total=self.config.timeout),
@@ -60,12 +68,13 @@ class A2AClient(A2AClientBase):
         """Get the URL of the server."""
         return self.config.base_url
 
-    async def _make_request(
+    async def _make_request[M: BaseModel](
         self,
         method: str,
+        response_type: type[M],
         endpoint: Optional[str] = None,
         data: BaseModel | None = None,
-    ) -> Dict[str, Any]:
+    ) -> M:
         """Make an HTTP request to the A2A server."""
         if not self._session:
             raise RuntimeError("Client session not initialized. Use 'async with' context manager.")
@@ -73,75 +82,91 @@ class A2AClient(A2AClientBase):
         url = f"{self.config.base_url.rstrip('/')}"
         if endpoint:
             url = f"{url}/{endpoint.lstrip('/')}"
-        serialized_data = data.model_dump() if data else None
-        async with self._session.request(method, url, json=serialized_data) as response:
+        body = self.json_codec.encode_model(data) if data else None
+        headers = self._headers()
+        async with self._session.request(method, url, data=body, headers=headers) as response:
             response.raise_for_status()
-            return await response.json()
+            return self.json_codec.decode_model(response_type, await response.read())
+
+    def _headers(self) -> dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        inject_trace_headers(headers)
+        return headers
 
     async def get_agent_card(self) -> AgentCard:
         """Get the agent card from the server."""
-        response = await self._make_request("GET", "/.well-known/agent.json")
-        return AgentCard(**response)
+        return await self._make_request("GET", AgentCard, "/.well-known/agent.json")
 
     async def get_task(self, task_params: TaskQueryParams) -> GetTaskResponse:
         """Get task details by ID."""
         request = GetTaskRequest(params=task_params)
-        response = await self._make_request("POST", data=request)
-        return GetTaskResponse(**response)
+        return await self._make_request("POST", GetTaskResponse, data=request)
 
     async def send_task(self, task_params: TaskSendParams) -> SendTaskResponse:
         """Send a new task to the server."""
         request = SendTaskRequest(
             params=task_params,
         )
-        response = await self._make_request("POST", data=request)
-        return SendTaskResponse(**response)
+        return await self._make_request("POST", SendTaskResponse, data=request)
 
     async def _stream_response(self, response: aiohttp.ClientResponse) -> AsyncIterable[SendTaskStreamingResponse]:
-        async for line in response.content:
-            if line:
-                event_data = json.loads(line.decode("utf-8"))
-                yield SendTaskStreamingResponse(**event_data)
-
-    async def send_task_streaming(self, task_params: TaskSendParams) -> AsyncIterable[SendTaskStreamingResponse]:
-        """Send a task with streaming response."""
-        request = SendTaskStreamingRequest(params=task_params)
-
+        # The response is released once the stream is over, or closed by the caller.
+        try:
+            async for data in _sse_data(response.content):
+                yield self.json_codec.decode_model(SendTaskStreamingResponse, data)
+        finally:
+            response.release()
+
+    async def _post_stream(self, request: BaseModel) -> AsyncIterable[SendTaskStreamingResponse]:
         if not self._session:
             raise RuntimeError("Client session not initialized. Use 'async with' context manager.")
 
-        async with self._session.post(self.config.base_url, json=request) as response:
+        body = self.json_codec.encode_model(request)
+        response = await self._session.post(self.config.base_url, data=body, headers=self._headers())
+        try:
             response.raise_for_status()
-            return self._stream_response(response)
+        except BaseException:
+            response.release()
+            raise
+        return self._stream_response(response)
+
+    async def send_task_streaming(self, task_params: TaskSendParams) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Send a task with streaming response."""
+        return await self._post_stream(SendTaskStreamingRequest(params=task_params))
 
     async def cancel_task(self, task_params: TaskIdParams) -> CancelTaskResponse:
         """Cancel a running task."""
         request = CancelTaskRequest(params=task_params)
-        response = await self._make_request("POST", data=request)
-        return CancelTaskResponse(**response)
+        return await self._make_request("POST", CancelTaskResponse, data=request)
 
     async def set_task_push_notification(
         self, task_params: TaskPushNotificationConfig
     ) -> SetTaskPushNotificationResponse:
         """Set push notification configuration for a task."""
         request = SetTaskPushNotificationRequest(params=task_params)
-        response = await self._make_request("POST", data=request)
-        return SetTaskPushNotificationResponse(**response)
+        return await self._make_request("POST", SetTaskPushNotificationResponse, data=request)
 
     async def get_task_push_notification(self, task_params: TaskIdParams) -> GetTaskPushNotificationResponse:
         """Get push notification configuration for a task."""
         request = GetTaskPushNotificationRequest(params=task_params)
-        response = await self._make_request("POST", data=request)
-        return GetTaskPushNotificationResponse(**response)
+        return await self._make_request("POST", GetTaskPushNotificationResponse, data=request)
 
     async def resubscribe_to_task(self, task_params: TaskIdParams) -> AsyncIterable[SendTaskStreamingResponse]:
         """Resubscribe to task events."""
-        request = TaskResubscriptionRequest(params=task_params)
-
-        if not self._session:
-            raise RuntimeError("Client session not initialized. Use 'async with' context manager.")
-
-        async with self._session.post(self.config.base_url, json=request) as response:
-            response.raise_for_status()
-
-            return self._stream_response(response)
+        return await self._post_stream(TaskResubscriptionRequest(params=task_params))
+
+
+async def _sse_data(lines: AsyncIterable[bytes]) -> AsyncIterable[bytes]:
+    """The data of the events of a server-sent event stream, read line by line."""
+    data: list[bytes] = []
+    async for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            # A blank line ends the event.
+            if data:
+                yield b"\n".join(data)
+                data = []
+        elif line.startswith(b"data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(b" ") else value)
+        # Comments (e.g. keep-alive pings) and the other fields are ignored.
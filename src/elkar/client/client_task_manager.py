@@ -22,6 +22,7 @@ from elkar.a2a_types import (
     TaskStatusUpdateEvent,
 )
 from elkar.client.a2a_client import A2AClient, A2AClientConfig
+from elkar.store.background_writer import BackgroundTaskWriter
 from elkar.store.base import ClientSideTaskManagerStore, UpdateTaskParams
 from elkar.store.in_memory import (
     InMemoryClientSideTaskManagerStore,
@@ -29,6 +30,8 @@ from elkar.store.in_memory import (
 
 logger = logging.getLogger(__name__)
 
+_TERMINAL_STATES = (TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELED)
+
 
 @dataclass
 class TaskManagerConfig:
@@ -61,9 +64,8 @@ class ClientSideTaskManager:
         task = await self._store.get_task_for_client(task_id=request.params.id, caller_id=self._caller_id)
         if task is not None and task.task.status.state == TaskState.COMPLETED:
             raise ValueError(f"Task {request.params.id} already completed")
-        response = await self._client.send_task(request.params)
-
-        # Send task to server
+        # The store keeps the full history: it is requested in full and sliced locally.
+        response = await self._client.send_task(request.params.model_copy(update={"historyLength": None}))
 
         if response.result:
             agent_url = await self._client.get_url()
@@ -72,20 +74,35 @@ class ClientSideTaskManager:
         return SendTaskResponse(
             jsonrpc="2.0",
             id=request.id,
-            result=response.result,
+            result=_slice_history(response.result, request.params.historyLength),
             error=response.error,
         )
 
     async def get_task(self, request: GetTaskRequest) -> GetTaskResponse:
-        """Get a task from the server."""
-        # If not found locally, request from server
-        response = await self._client.get_task(request.params)
-        if response.result:
+        """Get a task, serving it from the local store when possible.
+
+        Tasks in a terminal state can no longer change on the server, so they are
+        returned from the local store without a round-trip. Other tasks are fetched
+        from the server and only written back to the store when they changed. They are
+        fetched with their full history, which is sliced to `historyLength` locally, so
+        that the store never keeps a truncated history.
+        """
+        stored_task = await self._store.get_task_for_client(task_id=request.params.id, caller_id=self._caller_id)
+        if stored_task is not None and stored_task.task.status.state in _TERMINAL_STATES:
+            return GetTaskResponse(
+                jsonrpc="2.0",
+                id=request.id,
+                result=_slice_history(stored_task.task, request.params.historyLength),
+                error=None,
+            )
+
+        response = await self._client.get_task(request.params.model_copy(update={"historyLength": None}))
+        if response.result and (stored_task is None or _has_changed(stored_task.task, response.result)):
             await self._store.upsert_task_for_client(response.result, await self._client.get_url(), self._caller_id)
         return GetTaskResponse(
             jsonrpc="2.0",
             id=request.id,
-            result=response.result,
+            result=_slice_history(response.result, request.params.historyLength),
             error=response.error,
         )
 
@@ -107,27 +124,27 @@ class ClientSideTaskManager:
             ),
         )
         await self._store.upsert_task_for_client(task, await self._client.get_url(), self._caller_id)
-        async for response in stream:
-            if response.result:
-                # Update local task with server response
-                if isinstance(response.result, TaskStatusUpdateEvent):
-                    await self._store.update_task(
-                        task.id,
-                        UpdateTaskParams(
-                            status=response.result.status,
-                            caller_id=self._caller_id,
-                        ),
-                    )
 
+        # Store updates are applied by a background writer so that events reach the caller
+        # without waiting for the store.
+        writer = BackgroundTaskWriter(self._store, task.id)
+        try:
+            async for response in stream:
+                if isinstance(response.result, TaskStatusUpdateEvent):
+                    writer.submit(UpdateTaskParams(status=response.result.status, caller_id=self._caller_id))
                 elif isinstance(response.result, TaskArtifactUpdateEvent):
-                    await self._store.update_task(
-                        task.id,
-                        UpdateTaskParams(
-                            artifacts_updates=[response.result.artifact],
-                        ),
+                    writer.submit(
+                        UpdateTaskParams(artifacts_updates=[response.result.artifact], caller_id=self._caller_id)
                     )
 
-            yield response
+                yield response
+
+                if isinstance(response.result, TaskStatusUpdateEvent) and (
+                    response.result.final or response.result.status.state in _TERMINAL_STATES
+                ):
+                    await writer.flush()
+        finally:
+            await writer.close()
 
     async def set_task_push_notification(self, params: TaskPushNotificationConfig) -> SetTaskPushNotificationResponse:
         raise NotImplementedError()
@@ -142,11 +159,7 @@ class ClientSideTaskManager:
         if not stored_task:
             raise ValueError(f"Task {request.id} not found")
 
-        if stored_task.task.status.state in [
-            TaskState.COMPLETED,
-            TaskState.FAILED,
-            TaskState.CANCELED,
-        ]:
+        if stored_task.task.status.state in _TERMINAL_STATES:
             raise ValueError(f"Task {request.id} is already in a terminal state")
 
         params = TaskIdParams(id=request.id)
@@ -158,3 +171,31 @@ class ClientSideTaskManager:
                 self._caller_id,
             )
         return cancel_task_response
+
+
+def _slice_history(task: Task | None, history_length: int | None) -> Task | None:
+    if task is None or history_length is None or task.history is None:
+        return task
+    history = task.history[-history_length:] if history_length > 0 else []
+    return task.model_copy(update={"history": history})
+
+
+def _has_changed(local: Task, remote: Task) -> bool:
+    """Cheap change detection between the stored task and a freshly fetched one.
+
+    A task only moves forward: its status is replaced, messages are appended to the
+    history and artifacts are appended to. Comparing the status and the sizes is
+    therefore enough to know whether the store needs to be written.
+    """
+    if local.status.state != remote.status.state or local.status.timestamp != remote.status.timestamp:
+        return True
+    if len(local.history or []) != len(remote.history or []):
+        return True
+    local_artifacts = local.artifacts or []
+    remote_artifacts = remote.artifacts or []
+    if len(local_artifacts) != len(remote_artifacts):
+        return True
+    return any(
+        len(local_artifact.parts) != len(remote_artifact.parts) or local_artifact.lastChunk != remote_artifact.lastChunk
+        for local_artifact, remote_artifact in zip(local_artifacts, remote_artifacts)
+    )
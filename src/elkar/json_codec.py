@@ -0,0 +1,46 @@
+"""
+Pluggable JSON encoding of the wire format.
+
+`A2AServer`, `A2AClient` and `ElkarClient` encode and decode JSON through a `JSONCodec`. Models,
+i.e. every request, response and event, go through the serializer and validator of pydantic-core
+by default: they parse and dump in one pass, which is faster than handing plain dicts to another
+JSON library (see `benchmarks/json_codec_benchmark.py`).
+"""
+
+from abc import abstractmethod
+from typing import Any, Protocol
+
+import pydantic_core
+from pydantic import BaseModel
+
+
+class JSONCodec(Protocol):
+    """Encodes values to compact UTF-8 JSON bytes, and decodes them back."""
+
+    name: str
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: bytes | str) -> Any: ...
+
+    def encode_model(self, model: BaseModel) -> bytes:
+        """Encode a model, without its `None` fields, with pydantic-core in one pass."""
+        return model.__pydantic_serializer__.to_json(model, exclude_none=True)
+
+    def decode_model[M: BaseModel](self, model_type: type[M], data: bytes | str) -> M:
+        """Decode and validate a model in one pass."""
+        return model_type.model_validate_json(data)
+
+
+class PydanticJSONCodec(JSONCodec):
+    """The default codec, with the JSON parser and serializer of pydantic-core."""
+
+    name = "pydantic"
+
+    def encode(self, value: Any) -> bytes:
+        return pydantic_core.to_json(value)
+
+    def decode(self, data: bytes | str) -> Any:
+        return pydantic_core.from_json(data)
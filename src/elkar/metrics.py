@@ -0,0 +1,269 @@
+"""
+Metrics in the Prometheus text format, served by `A2AServer` on its `metrics_path` when one is set.
+
+Updating a metric only adds to a number or a list slot: there are no locks on the hot path.
+Metrics are updated from the event loop; values written concurrently from other threads may
+occasionally lose an increment, which is acceptable for monitoring.
+"""
+
+import functools
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Coroutine, Iterable, Iterator
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    labels = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric[C]:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: dict[LabelValues, C] = {}
+
+    def labels(self, *label_values: str) -> C:
+        """Return the metric for the given label values. Keep it to update it without a lookup."""
+        child = self._children.get(label_values)
+        if child is None:
+            if len(label_values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            child = self._children[label_values] = self._new_child()
+        return child
+
+    def _new_child(self) -> C:
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric[CounterValue]):
+    type_name = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for label_values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(child.value)}"
+
+
+class GaugeValue(CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count the block as in progress while it runs."""
+        self.value += 1
+        try:
+            yield
+        finally:
+            self.value -= 1
+
+
+class Gauge(_Metric[GaugeValue]):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._sources: list[Callable[[], Iterable[tuple[LabelValues, float]]] | weakref.WeakMethod] = []
+
+    def _new_child(self) -> GaugeValue:
+        return GaugeValue()
+
+    def add_source(self, source: Callable[[], Iterable[tuple[LabelValues, float]]]) -> None:
+        """
+        Add a function returning `(label values, value)` pairs, called when the metrics are
+        collected. Bound methods are held weakly, so registering an object does not keep it alive.
+        The values of the same label values, from several sources or pairs, are added up.
+        """
+        if hasattr(source, "__self__"):
+            self._sources.append(weakref.WeakMethod(source))  # type: ignore[arg-type]
+        else:
+            self._sources.append(source)
+
+    def samples(self) -> Iterator[str]:
+        values = {label_values: child.value for label_values, child in list(self._children.items())}
+        for source in list(self._sources):
+            function = source() if isinstance(source, weakref.WeakMethod) else source
+            if function is None:
+                self._sources.remove(source)
+                continue
+            for label_values, value in function():
+                values[label_values] = values.get(label_values, 0.0) + value
+        for label_values, value in values.items():
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"
+
+
+class HistogramValue:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+def timed[**P, R](
+    histogram: HistogramValue,
+) -> Callable[[Callable[P, Coroutine[Any, Any, R]]], Callable[P, Coroutine[Any, Any, R]]]:
+    """Observe the duration of each call of an async function, in seconds."""
+
+    def decorator(function: Callable[P, Coroutine[Any, Any, R]]) -> Callable[P, Coroutine[Any, Any, R]]:
+        @functools.wraps(function)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class Histogram(_Metric[HistogramValue]):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def samples(self) -> Iterator[str]:
+        for label_values, child in list(self._children.items()):
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, float("inf")), list(child.counts)):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, f'le="{_format_value(upper_bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Return all the metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register[M: _Metric](self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter("a2a_requests_total", "JSON-RPC requests handled.", ["method"])
+REQUEST_SECONDS = REGISTRY.histogram(
+    "a2a_request_duration_seconds",
+    "Time to answer a JSON-RPC request (for streams, until the stream starts).",
+    ["method"],
+)
+ACTIVE_STREAMS = REGISTRY.gauge("a2a_active_streams", "SSE streams currently open.")
+STREAM_EVENTS = REGISTRY.counter("a2a_stream_events_total", "Events sent on SSE streams.")
+HANDLERS_IN_FLIGHT = REGISTRY.gauge("a2a_handlers_in_flight", "Task handlers currently running.")
+# Queues are measured in aggregate: a series per task or subscriber would expose task ids and
+# grow without bound.
+QUEUE_DEPTH = REGISTRY.gauge(
+    "a2a_queue_depth",
+    "Events waiting to be sent to the subscribers of the in-memory task queues.",
+)
+QUEUE_SUBSCRIBERS = REGISTRY.gauge(
+    "a2a_queue_subscribers",
+    "Subscribers of the in-memory task queues.",
+)
+STORE_OPERATION_SECONDS = REGISTRY.histogram(
+    "a2a_store_operation_duration_seconds",
+    "Duration of task store operations.",
+    ["backend", "operation"],
+)
@@ -0,0 +1,207 @@
+"""
+Opt-in profiling of live requests.
+
+`RequestProfiler` profiles a fraction of the requests of `A2AServer`: the time spent in each
+stage (`read`, `parse`, `dispatch`, `store`, `handler`, `serialize`) is recorded, and requests
+slower than a threshold are kept in a bounded ring served on the debug route. Outside of a
+profiled request, `stage` returns a shared no-op context manager.
+
+`StackSampler` is a sampling profiler of the event loop thread, which the debug route starts on
+demand.
+"""
+
+import contextlib
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, Callable, ContextManager, Iterator, Protocol
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+@dataclass
+class RequestProfile:
+    started_at: float
+    """Unix time at which the request started."""
+    method: str | None = None
+    duration: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+    """Seconds spent in each stage. Stages nest: `dispatch` includes `store` and `handler`."""
+    finished: bool = False
+
+    def add(self, stage: str, seconds: float) -> None:
+        # Streamed tasks keep running after the response has started: their stages are not counted.
+        if not self.finished:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "method": self.method,
+            "duration_ms": round(self.duration * 1000, 3),
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+        }
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("elkar_request_profile", default=None)
+
+
+def current_profile() -> RequestProfile | None:
+    """The profile of the current request, if it is profiled."""
+    return _current_profile.get()
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: RequestProfile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args: Any) -> None:
+        self.profile.add(self.name, time.perf_counter() - self.start)
+
+
+def stage(name: str) -> ContextManager[Any]:
+    """Add the time spent in the block to a stage of the current request, if it is profiled."""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NO_STAGE
+    return _Stage(profile, name)
+
+
+class Profiler(Protocol):
+    """A profiler that the debug route starts and stops on demand, e.g. wrapping pyinstrument."""
+
+    def start(self) -> None: ...
+
+    def stop(self) -> str:
+        """Stop profiling and return the report."""
+        ...
+
+
+class RequestProfiler:
+    """
+    Usage:
+        server = A2AServer(
+            task_manager,
+            request_profiler=RequestProfiler(sample_rate=0.01, slow_threshold=0.5),
+        )
+
+    Requests are sampled with probability `sample_rate`. Sampled requests taking at least
+    `slow_threshold` seconds are kept, with their stages, in a ring of the last
+    `max_slow_requests`. `profiler_factory` creates the profiler started by the debug route,
+    a `StackSampler` of the current thread by default.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        slow_threshold: float = 0.5,
+        max_slow_requests: int = 100,
+        profiler_factory: Callable[[], Profiler] | None = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.slow_requests: deque[RequestProfile] = deque(maxlen=max_slow_requests)
+        self.profiler_factory = profiler_factory or StackSampler
+        self.sampled_requests = 0
+        self.stage_totals: dict[str, float] = {}
+        self._profiling = False
+
+    @contextlib.contextmanager
+    def profile_request(self) -> Iterator[RequestProfile | None]:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield None
+            return
+        profile = RequestProfile(started_at=time.time())
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.duration = time.perf_counter() - start
+            profile.finished = True
+            _current_profile.reset(token)
+            self.sampled_requests += 1
+            for name, seconds in profile.stages.items():
+                self.stage_totals[name] = self.stage_totals.get(name, 0.0) + seconds
+            if profile.duration >= self.slow_threshold:
+                self.slow_requests.append(profile)
+
+    def report(self) -> dict[str, Any]:
+        """The mean time of each stage over the sampled requests, and the slow requests."""
+        sampled = self.sampled_requests
+        return {
+            "sample_rate": self.sample_rate,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "sampled_requests": sampled,
+            "mean_stages_ms": {name: round(seconds * 1000 / sampled, 3) for name, seconds in self.stage_totals.items()},
+            "slow_requests": [profile.to_dict() for profile in reversed(self.slow_requests)],
+        }
+
+    def begin_profiling(self) -> Profiler | None:
+        """Start a profiler, unless one is already running."""
+        if self._profiling:
+            return None
+        profiler = self.profiler_factory()
+        profiler.start()
+        self._profiling = True
+        return profiler
+
+    def end_profiling(self, profiler: Profiler) -> str:
+        try:
+            return profiler.stop()
+        finally:
+            self._profiling = False
+
+
+class StackSampler:
+    """
+    Sampling profiler of one thread (the current one by default, i.e. the event loop thread when
+    created by the debug route). A background thread records the stack of the profiled thread
+    every `interval` seconds; `stop` returns the stacks in the collapsed format of flame graph
+    tools (`frame;frame;frame count` per line), the most frequent first.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None) -> None:
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="elkar-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
@@ -0,0 +1,35 @@
+from typing import TYPE_CHECKING
+
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .keys import KeySetUnavailableError, PushNotificationSigningKeys, RemoteJWKS
+    from .retry_queue import FileRetryQueue, InMemoryRetryQueue, PendingNotification, PushNotificationRetryQueue
+    from .sender import PushNotificationSender, PushNotificationStats
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "KeySetUnavailableError": ".keys",
+        "PushNotificationSigningKeys": ".keys",
+        "RemoteJWKS": ".keys",
+        "FileRetryQueue": ".retry_queue",
+        "InMemoryRetryQueue": ".retry_queue",
+        "PendingNotification": ".retry_queue",
+        "PushNotificationRetryQueue": ".retry_queue",
+        "PushNotificationSender": ".sender",
+        "PushNotificationStats": ".sender",
+    },
+)
+
+__all__ = [
+    "PushNotificationSender",
+    "PushNotificationStats",
+    "PushNotificationSigningKeys",
+    "RemoteJWKS",
+    "KeySetUnavailableError",
+    "PushNotificationRetryQueue",
+    "PendingNotification",
+    "InMemoryRetryQueue",
+    "FileRetryQueue",
+]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+import jwt
+from jwt.algorithms import get_default_algorithms, has_crypto  # type: ignore[attr-defined]
+from jwt.utils import base64url_encode
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class KeySetUnavailableError(Exception):
+    """Raised when the keys of a key set cannot be fetched and none are cached."""
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True).encode()
+
+
+def _destination(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass(frozen=True)
+class _TokenTemplate:
+    header_segment: bytes
+    """Encoded JWT header followed by the `.` separator."""
+    static_claims: str
+    """Claims that do not change between notifications, as a JSON fragment starting with a comma."""
+
+
+class PushNotificationSigningKeys:
+    """
+    Signs push notifications and publishes the matching JSON Web Key Set.
+
+    The signing key is parsed once, and the encoded JWT header and static claims are computed
+    once per destination, so signing a notification only hashes the payload and signs it.
+    Tokens carry the `iat` and `request_body_sha256` claims, plus `iss` when an issuer is given
+    and `aud` (the destination, e.g. `https://agent.example.com`) when `audience_per_destination`.
+
+    The JWKS document contains the public key of the signing key and `previous_public_keys`,
+    which keep being published while receivers may still verify tokens signed with them after
+    a key rotation. Symmetric (HS*) keys are never published. Asymmetric algorithms require the
+    `cryptography` package (`pip install "pyjwt[crypto]"`).
+    """
+
+    def __init__(
+        self,
+        signing_key: Any,
+        algorithm: str = "RS256",
+        key_id: str | None = None,
+        issuer: str | None = None,
+        audience_per_destination: bool = False,
+        previous_public_keys: dict[str, Any] | None = None,
+        jwks_max_age: int = 3600,
+    ) -> None:
+        self.algorithm = algorithm
+        self.key_id = key_id
+        self.issuer = issuer
+        self.audience_per_destination = audience_per_destination
+        self.jwks_max_age = jwks_max_age
+        algorithms = get_default_algorithms()
+        if algorithm not in algorithms and not has_crypto:
+            raise ImportError(f"The {algorithm} algorithm requires the cryptography package")
+        self._algorithm = algorithms[algorithm]
+        self._signing_key = self._algorithm.prepare_key(signing_key)
+        self._templates: dict[str, _TokenTemplate] = {}
+
+        public_keys = dict(previous_public_keys or {})
+        if not algorithm.startswith("HS") and hasattr(self._signing_key, "public_key"):
+            public_keys[key_id or ""] = self._signing_key.public_key()
+        self.jwks = {"keys": [self._public_jwk(kid, key) for kid, key in public_keys.items()]}
+        self.jwks_json = _json_bytes(self.jwks)
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_json).hexdigest()[:32]}"'
+
+    def sign(self, payload: str, url: str) -> str:
+        """Return the JWT for a notification sent to `url` with the given body."""
+        destination = _destination(url)
+        template = self._templates.get(destination)
+        if template is None:
+            template = self._templates[destination] = self._template(destination)
+        claims = (
+            f'{{"iat":{int(time.time())},'
+            f'"request_body_sha256":"{hashlib.sha256(payload.encode()).hexdigest()}"'
+            f"{template.static_claims}}}"
+        )
+        signing_input = template.header_segment + base64url_encode(claims.encode())
+        signature = self._algorithm.sign(signing_input, self._signing_key)
+        return (signing_input + b"." + base64url_encode(signature)).decode()
+
+    def _template(self, destination: str) -> _TokenTemplate:
+        header: dict[str, str] = {"alg": self.algorithm, "typ": "JWT"}
+        if self.key_id is not None:
+            header["kid"] = self.key_id
+        static_claims: dict[str, str] = {}
+        if self.issuer is not None:
+            static_claims["iss"] = self.issuer
+        if self.audience_per_destination:
+            static_claims["aud"] = destination
+        fragment = "".join(f",{json.dumps(name)}:{json.dumps(value)}" for name, value in static_claims.items())
+        return _TokenTemplate(header_segment=base64url_encode(_json_bytes(header)) + b".", static_claims=fragment)
+
+    def _public_jwk(self, key_id: str, public_key: Any) -> dict[str, Any]:
+        jwk: dict[str, Any] = json.loads(self._algorithm.to_jwk(public_key))
+        jwk.update({"use": "sig", "alg": self.algorithm})
+        if key_id:
+            jwk["kid"] = key_id
+        return jwk
+
+
+class RemoteJWKS:
+    """
+    Keys of a remote JSON Web Key Set, used to verify the push notifications it signed.
+
+    The key set is fetched on first use and kept for the `max-age` of its `Cache-Control`
+    header (`default_max_age` without one). A token signed with an unknown key id triggers a
+    refresh, at most once every `min_refresh_interval` seconds, to pick up rotated keys.
+
+    When a refresh fails (the endpoint is down, times out or returns an invalid key set), the
+    cached keys are kept and the refresh is retried after `min_refresh_interval` seconds. Without
+    cached keys, `get_key` raises `KeySetUnavailableError`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        http_client: httpx.AsyncClient | None = None,
+        default_max_age: float = 300.0,
+        min_refresh_interval: float = 30.0,
+    ) -> None:
+        self.url = url
+        self.default_max_age = default_max_age
+        self.min_refresh_interval = min_refresh_interval
+        self._http_client = http_client
+        self._keys: dict[str | None, tuple[str, Any]] = {}
+        """Algorithm and parsed key, by key id."""
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, key_id: str | None) -> tuple[str, Any]:
+        """Return the algorithm and key with the given id, refreshing the key set if needed."""
+        now = time.monotonic()
+        if now >= self._expires_at or key_id not in self._keys:
+            await self._refresh(force=key_id not in self._keys)
+        key = self._keys.get(key_id)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {key_id}")
+        return key
+
+    async def verify(self, token: str, body: bytes, max_token_age: float = 300.0, **options: Any) -> dict[str, Any]:
+        """
+        Verify a push notification token and that it was issued for `body`.
+        Extra keyword arguments (e.g. `audience`, `issuer`) are passed to `jwt.decode`.
+        """
+        header = jwt.get_unverified_header(token)
+        algorithm, key = await self.get_key(header.get("kid"))
+        claims: dict[str, Any] = jwt.decode(token, key, algorithms=[algorithm], options={"require": ["iat"]}, **options)
+        if time.time() - claims["iat"] > max_token_age:
+            raise jwt.InvalidIssuedAtError("Token is too old")
+        if claims.get("request_body_sha256") != hashlib.sha256(body).hexdigest():
+            raise jwt.InvalidTokenError("Token was not issued for this request body")
+        return claims
+
+    async def _refresh(self, force: bool) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if now < self._expires_at and (not force or now - self._fetched_at < self.min_refresh_interval):
+                return
+            import httpx
+
+            if self._http_client is None:
+                self._http_client = httpx.AsyncClient()
+            try:
+                response = await self._http_client.get(self.url)
+                response.raise_for_status()
+                algorithms = get_default_algorithms()
+                keys = {
+                    jwk.get("kid"): (jwk["alg"], algorithms[jwk["alg"]].from_jwk(jwk))
+                    for jwk in response.json().get("keys", [])
+                    if jwk.get("alg") in algorithms and jwk.get("use", "sig") == "sig"
+                }
+            except (httpx.HTTPError, TimeoutError, ValueError, KeyError, AttributeError, jwt.PyJWTError) as e:
+                if not self._keys:
+                    raise KeySetUnavailableError(f"Cannot fetch the key set {self.url}: {e}") from e
+                logger.warning(f"Cannot refresh the key set {self.url}, keeping the cached keys: {e}")
+                self._fetched_at = now
+                self._expires_at = now + self.min_refresh_interval
+                return
+            self._keys = keys
+            self._fetched_at = now
+            match = _MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+            self._expires_at = now + (float(match.group(1)) if match else self.default_max_age)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+from abc import abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Protocol
+
+
+@dataclass
+class PendingNotification:
+    task_id: str
+    caller_id: str | None
+    url: str
+    token: str | None
+    payload: str
+    sequence: int
+    is_final: bool = False
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+
+
+class PushNotificationRetryQueue(Protocol):
+    """Keeps the notifications whose delivery failed until they are due for another attempt."""
+
+    @abstractmethod
+    async def put(self, notification: PendingNotification) -> None: ...
+
+    @abstractmethod
+    async def pop_due(self, now: float) -> list[PendingNotification]:
+        """Remove and return the notifications whose next attempt is due at `now`."""
+        ...
+
+    @abstractmethod
+    async def discard(self, task_id: str, caller_id: str | None) -> None:
+        """Drop the pending retry of a task, if any."""
+        ...
+
+    @abstractmethod
+    async def size(self) -> int: ...
+
+
+class InMemoryRetryQueue(PushNotificationRetryQueue):
+    def __init__(self) -> None:
+        self.notifications: dict[tuple[str, str | None], PendingNotification] = {}
+
+    async def put(self, notification: PendingNotification) -> None:
+        # Only the latest state of a task is worth retrying.
+        self.notifications[(notification.task_id, notification.caller_id)] = notification
+
+    async def pop_due(self, now: float) -> list[PendingNotification]:
+        due = [key for key, notification in self.notifications.items() if notification.next_attempt_at <= now]
+        return [self.notifications.pop(key) for key in due]
+
+    async def discard(self, task_id: str, caller_id: str | None) -> None:
+        self.notifications.pop((task_id, caller_id), None)
+
+    async def size(self) -> int:
+        return len(self.notifications)
+
+
+class FileRetryQueue(InMemoryRetryQueue):
+    """
+    Retry queue persisted to a JSON file, so that pending retries survive a restart.
+    The file is rewritten atomically on every change, in a worker thread so that the event
+    loop is not blocked; writes are serialized and each one writes the latest state.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._save_lock = asyncio.Lock()
+        if os.path.exists(path):
+            with open(path) as file:
+                for item in json.load(file):
+                    notification = PendingNotification(**item)
+                    self.notifications[(notification.task_id, notification.caller_id)] = notification
+
+    async def put(self, notification: PendingNotification) -> None:
+        await super().put(notification)
+        await self._save()
+
+    async def pop_due(self, now: float) -> list[PendingNotification]:
+        due = await super().pop_due(now)
+        if due:
+            await self._save()
+        return due
+
+    async def discard(self, task_id: str, caller_id: str | None) -> None:
+        if (task_id, caller_id) in self.notifications:
+            await super().discard(task_id, caller_id)
+            await self._save()
+
+    async def _save(self) -> None:
+        async with self._save_lock:
+            # Taken once the previous write is done, so that the last write has the latest state.
+            items = [asdict(notification) for notification in self.notifications.values()]
+            await asyncio.to_thread(self._write, items)
+
+    def _write(self, items: list[dict[str, Any]]) -> None:
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(items, file)
+        os.replace(temporary_path, self.path)
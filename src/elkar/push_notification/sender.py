@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, AsyncIterator
+from urllib.parse import urlsplit
+
+from elkar.a2a_types import TaskState
+from elkar.push_notification.retry_queue import (
+    InMemoryRetryQueue,
+    PendingNotification,
+    PushNotificationRetryQueue,
+)
+from elkar.store.base import StoredTask
+
+if TYPE_CHECKING:
+    import httpx
+
+    from elkar.push_notification.keys import PushNotificationSigningKeys
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL_STATES = (TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELED)
+
+
+@dataclass
+class PushNotificationStats:
+    delivered: int = 0
+    failed: int = 0
+    retried: int = 0
+    coalesced: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    """Seconds between `notify` and a successful delivery, for the latest deliveries."""
+
+
+class PushNotificationSender:
+    """
+    Delivers push notifications when the status of a task changes.
+
+    - Notifications are sent with a single pooled HTTP client.
+    - Deliveries to the same destination (scheme and host) are limited to
+      `max_concurrency_per_destination` at a time. Only destinations with deliveries in
+      progress are tracked.
+    - Only the latest state of a task is delivered: a notification still waiting to be sent
+      is replaced by a newer one instead of being sent as well.
+    - Failed deliveries are retried with exponential backoff from a retry queue, which can be
+      persisted (see `FileRetryQueue`). A retry is dropped if a newer state was notified since;
+      the latest notified state of a task is only tracked until it is delivered or given up.
+    - With `signing_keys`, every request carries a JWT (`Authorization: Bearer ...`) whose
+      `request_body_sha256` claim binds it to the payload (see `PushNotificationSigningKeys`).
+    """
+
+    def __init__(
+        self,
+        retry_queue: PushNotificationRetryQueue | None = None,
+        max_concurrency_per_destination: int = 8,
+        max_attempts: int = 5,
+        base_retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+        retry_poll_interval: float = 0.5,
+        timeout: float = 10.0,
+        signing_keys: PushNotificationSigningKeys | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.retry_queue = retry_queue or InMemoryRetryQueue()
+        self.max_concurrency_per_destination = max_concurrency_per_destination
+        self.max_attempts = max_attempts
+        self.base_retry_delay = base_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.retry_poll_interval = retry_poll_interval
+        self.timeout = timeout
+        self.signing_keys = signing_keys
+        self.stats = PushNotificationStats()
+        self._http_client = http_client
+        self._sequence = 0
+        self._latest: dict[tuple[str, str | None], PendingNotification] = {}
+        self._last_sequence: dict[tuple[str, str | None], int] = {}
+        self._notified_at: dict[int, float] = {}
+        self._scheduled: set[tuple[str, str | None]] = set()
+        self._destinations: dict[str, tuple[asyncio.Semaphore, int]] = {}
+        self._background: set[asyncio.Task[None]] = set()
+        self._retry_loop: asyncio.Task[None] | None = None
+
+    def notify(self, stored_task: StoredTask) -> None:
+        """Schedule the delivery of the current state of a task. Does nothing if the task has no push notification."""
+        config = stored_task.push_notification
+        if config is None:
+            return
+        key = (stored_task.id, stored_task.caller_id)
+        sequence = self._next_sequence()
+        if key in self._latest:
+            self.stats.coalesced += 1
+            self._notified_at.pop(self._latest[key].sequence, None)
+        self._latest[key] = PendingNotification(
+            task_id=stored_task.id,
+            caller_id=stored_task.caller_id,
+            url=config.url,
+            token=config.token,
+            payload=stored_task.task.model_dump_json(exclude_none=True),
+            sequence=sequence,
+            is_final=stored_task.task.status.state in _TERMINAL_STATES,
+        )
+        self._last_sequence[key] = sequence
+        self._notified_at[sequence] = time.monotonic()
+        self._schedule(key)
+        self.start()
+
+    def start(self) -> None:
+        """Start retrying the notifications of the retry queue. Called by `notify` if needed."""
+        if self._retry_loop is None:
+            self._retry_loop = asyncio.create_task(self._run_retries())
+
+    async def close(self) -> None:
+        """Wait for the deliveries in progress, then release the HTTP client."""
+        if self._retry_loop is not None:
+            self._retry_loop.cancel()
+            self._retry_loop = None
+        # Finished deliveries may still be in `_background` until their callback runs, and a
+        # finishing delivery may schedule the next one.
+        while pending := [delivery for delivery in self._background if not delivery.done()]:
+            await asyncio.wait(pending)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _next_sequence(self) -> int:
+        # Time based, so that notifications made after a restart are newer than persisted retries.
+        self._sequence = max(self._sequence + 1, time.time_ns())
+        return self._sequence
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            import httpx
+
+            self._http_client = httpx.AsyncClient(timeout=self.timeout)
+        return self._http_client
+
+    def _schedule(self, key: tuple[str, str | None]) -> None:
+        if key in self._scheduled:
+            return
+        self._scheduled.add(key)
+        delivery = asyncio.create_task(self._deliver(key))
+        self._background.add(delivery)
+        delivery.add_done_callback(self._background.discard)
+
+    @asynccontextmanager
+    async def _destination_slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the delivery slots of the destination of `url`."""
+        parts = urlsplit(url)
+        destination = f"{parts.scheme}://{parts.netloc}"
+        semaphore, users = self._destinations.get(destination) or (
+            asyncio.Semaphore(self.max_concurrency_per_destination),
+            0,
+        )
+        self._destinations[destination] = (semaphore, users + 1)
+        try:
+            async with semaphore:
+                yield
+        finally:
+            semaphore, users = self._destinations[destination]
+            if users == 1:
+                del self._destinations[destination]
+            else:
+                self._destinations[destination] = (semaphore, users - 1)
+
+    async def _deliver(self, key: tuple[str, str | None]) -> None:
+        try:
+            notification = self._latest[key]
+            async with self._destination_slot(notification.url):
+                # Take the latest state only once a slot is available, to coalesce the
+                # updates that arrived while waiting.
+                notification = self._latest.pop(key)
+                await self._send(notification)
+        finally:
+            self._scheduled.discard(key)
+            if key in self._latest:
+                self._schedule(key)
+
+    async def _send(self, notification: PendingNotification) -> None:
+        notification.attempts += 1
+        try:
+            response = await self._client().post(
+                notification.url,
+                content=notification.payload,
+                headers=self._headers(notification),
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(
+                f"Push notification for task {notification.task_id} failed (attempt {notification.attempts}): {e}"
+            )
+            await self._retry_later(notification)
+            return
+        self.stats.delivered += 1
+        await self.retry_queue.discard(notification.task_id, notification.caller_id)
+        self._forget(notification)
+        notified_at = self._notified_at.pop(notification.sequence, None)
+        if notified_at is not None:
+            self.stats.latencies.append(time.monotonic() - notified_at)
+
+    def _headers(self, notification: PendingNotification) -> dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if notification.token is not None:
+            headers["X-A2A-Notification-Token"] = notification.token
+        if self.signing_keys is not None:
+            headers["Authorization"] = f"Bearer {self.signing_keys.sign(notification.payload, notification.url)}"
+        return headers
+
+    async def _retry_later(self, notification: PendingNotification) -> None:
+        if notification.attempts >= self.max_attempts:
+            logger.error(f"Giving up push notification for task {notification.task_id}")
+            self.stats.failed += 1
+            self._notified_at.pop(notification.sequence, None)
+            self._forget(notification)
+            return
+        delay = min(self.base_retry_delay * 2 ** (notification.attempts - 1), self.max_retry_delay)
+        notification.next_attempt_at = time.time() + delay
+        await self.retry_queue.put(notification)
+
+    def _forget(self, notification: PendingNotification) -> None:
+        # Once the latest state of a task is delivered or given up, no older retry of the task is
+        # left (deliveries of a task are sequential), so the task does not need tracking anymore.
+        key = (notification.task_id, notification.caller_id)
+        if self._last_sequence.get(key) == notification.sequence:
+            del self._last_sequence[key]
+
+    def _is_superseded(self, notification: PendingNotification) -> bool:
+        key = (notification.task_id, notification.caller_id)
+        if key in self._latest:
+            return True
+        last_sequence = self._last_sequence.get(key)
+        return last_sequence is not None and last_sequence > notification.sequence
+
+    async def _run_retries(self) -> None:
+        while True:
+            await asyncio.sleep(self.retry_poll_interval)
+            for notification in await self.retry_queue.pop_due(time.time()):
+                if self._is_superseded(notification):
+                    self._notified_at.pop(notification.sequence, None)
+                    continue
+                key = (notification.task_id, notification.caller_id)
+                self.stats.retried += 1
+                self._latest[key] = notification
+                self._schedule(key)
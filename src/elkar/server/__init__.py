@@ -1,3 +1,35 @@
-from .server import A2AServer
+from typing import TYPE_CHECKING
 
-__all__ = ["A2AServer"]
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .authentication import AuthenticationError, BearerTokenAuthenticator, KeySet, StaticKeySet
+    from .rate_limit import InMemoryRateLimitBackend, RateLimit, RateLimitBackend, RateLimiter
+    from .server import A2AServer
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "A2AServer": ".server",
+        "AuthenticationError": ".authentication",
+        "BearerTokenAuthenticator": ".authentication",
+        "KeySet": ".authentication",
+        "StaticKeySet": ".authentication",
+        "InMemoryRateLimitBackend": ".rate_limit",
+        "RateLimit": ".rate_limit",
+        "RateLimitBackend": ".rate_limit",
+        "RateLimiter": ".rate_limit",
+    },
+)
+
+__all__ = [
+    "A2AServer",
+    "AuthenticationError",
+    "BearerTokenAuthenticator",
+    "KeySet",
+    "StaticKeySet",
+    "RateLimit",
+    "RateLimiter",
+    "RateLimitBackend",
+    "InMemoryRateLimitBackend",
+]
@@ -0,0 +1,143 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import jwt
+from starlette.requests import Request
+
+from elkar.a2a_errors import AuthenticationRequiredError, ResourceUnavailableError
+from elkar.json_rpc import JSONRPCError
+from elkar.push_notification.keys import KeySetUnavailableError
+from elkar.task_manager.task_manager_base import RequestContext
+
+
+class AuthenticationError(Exception):
+    """
+    Raised by a context extractor to reject a request. The server answers with `status_code`
+    (a 401 by default, with a `WWW-Authenticate` header) and `error`.
+    """
+
+    def __init__(self, error: JSONRPCError | None = None, status_code: int = 401) -> None:
+        self.error = error or AuthenticationRequiredError()
+        self.status_code = status_code
+        super().__init__(self.error.message)
+
+
+class KeySet(Protocol):
+    """Keys verifying the bearer tokens. `RemoteJWKS` fetches them from a JWKS endpoint."""
+
+    async def get_key(self, key_id: str | None) -> tuple[str, Any]:
+        """
+        Return the algorithm and key for the `kid` of a token. Raise `KeySetUnavailableError`
+        when the keys cannot be loaded.
+        """
+        ...
+
+
+class StaticKeySet:
+    """A single verification key, e.g. a public key loaded from a file or an HMAC secret."""
+
+    def __init__(self, key: Any, algorithm: str = "RS256") -> None:
+        self.key = key
+        self.algorithm = algorithm
+
+    async def get_key(self, key_id: str | None) -> tuple[str, Any]:
+        return self.algorithm, self.key
+
+
+@dataclass
+class _VerifiedToken:
+    caller_id: str
+    claims: dict[str, Any]
+    expires_at: float
+
+
+class BearerTokenAuthenticator:
+    """
+    Async context extractor resolving the caller from a JWT bearer token:
+
+        server = A2AServer(task_manager, context_extractor=BearerTokenAuthenticator(RemoteJWKS(jwks_url)))
+
+    The caller id is the `caller_id_claim` claim of the token, and the claims are available in
+    the request context metadata under `claims`.
+
+    Verified tokens are kept in an LRU cache of `cache_size` entries, keyed by the SHA-256 of the
+    token, so a caller sending the same token again is not verified again. An entry is kept until
+    the token `exp` or for `max_cache_ttl` seconds, whichever comes first.
+
+    When the key set is unavailable (e.g. its JWKS endpoint is down and no keys are cached), the
+    request is rejected with a 503 rather than a 401, since the token may well be valid.
+    """
+
+    def __init__(
+        self,
+        key_set: KeySet,
+        caller_id_claim: str = "sub",
+        audience: str | None = None,
+        issuer: str | None = None,
+        leeway: float = 0.0,
+        cache_size: int = 1024,
+        max_cache_ttl: float = 300.0,
+        allow_anonymous: bool = False,
+    ) -> None:
+        self.key_set = key_set
+        self.caller_id_claim = caller_id_claim
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        self.cache_size = cache_size
+        self.max_cache_ttl = max_cache_ttl
+        self.allow_anonymous = allow_anonymous
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: OrderedDict[bytes, _VerifiedToken] = OrderedDict()
+
+    async def __call__(self, request: Request) -> RequestContext:
+        authorization = request.headers.get("authorization")
+        if authorization is None or authorization[:7].lower() != "bearer ":
+            if self.allow_anonymous:
+                return RequestContext(caller_id=None, metadata={})
+            raise AuthenticationError()
+        return await self.authenticate(authorization[7:].strip())
+
+    async def authenticate(self, token: str) -> RequestContext:
+        cache_key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        verified = self._cache.get(cache_key)
+        if verified is not None and verified.expires_at > now:
+            self._cache.move_to_end(cache_key)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            verified = await self._verify(token, now)
+            self._cache[cache_key] = verified
+            self._cache.move_to_end(cache_key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return RequestContext(caller_id=verified.caller_id, metadata={"claims": verified.claims})
+
+    async def _verify(self, token: str, now: float) -> _VerifiedToken:
+        try:
+            header = jwt.get_unverified_header(token)
+            algorithm, key = await self.key_set.get_key(header.get("kid"))
+            claims: dict[str, Any] = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.leeway,
+            )
+        except jwt.InvalidTokenError as e:
+            raise AuthenticationError(AuthenticationRequiredError(message=f"Invalid token: {e}"))
+        except KeySetUnavailableError:
+            raise AuthenticationError(ResourceUnavailableError(message="Token verification keys are unavailable"), 503)
+        caller_id = claims.get(self.caller_id_claim)
+        if caller_id is None:
+            raise AuthenticationError(AuthenticationRequiredError(message=f"Token has no {self.caller_id_claim} claim"))
+        expires_at = now + self.max_cache_ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]) + self.leeway)
+        return _VerifiedToken(caller_id=str(caller_id), claims=claims, expires_at=expires_at)
@@ -0,0 +1,72 @@
+"""
+Encoding of streamed events into SSE frames.
+
+Every subscriber of a task receives the same event instances from the queue, wrapped in a
+`SendTaskStreamingResponse` carrying its own request id. The JSON of each event is encoded
+once, on its first write, and kept as long as the event is alive; the frame of each subscriber
+is then assembled around it with its request id, so fanning an event out to more subscribers
+costs bytes written rather than serialization.
+"""
+
+import weakref
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from elkar.a2a_types import SendTaskStreamingResponse, TaskArtifactUpdateEvent, TaskStatusUpdateEvent
+
+_SEPARATOR = b"\r\n"
+
+
+class EncodedEventCache:
+    """
+    The JSON of events (with `exclude_none`), keyed by event identity. Entries are dropped when
+    their event is garbage collected; events are frozen, so their JSON does not change.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[weakref.ref[BaseModel], bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def encode(self, event: TaskStatusUpdateEvent | TaskArtifactUpdateEvent) -> bytes:
+        key = id(event)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is event:
+            return entry[1]
+        encoded = event.__pydantic_serializer__.to_json(event, exclude_none=True)
+
+        def discard(_: weakref.ref[BaseModel]) -> None:
+            self._entries.pop(key, None)
+
+        self._entries[key] = (weakref.ref(event, discard), encoded)
+        return encoded
+
+
+ENCODED_EVENTS = EncodedEventCache()
+
+
+def encode_sse_frame(item: BaseModel, cache: EncodedEventCache = ENCODED_EVENTS) -> bytes:
+    """
+    The SSE frame of a streamed item, identical to the one of `item.model_dump_json(exclude_none=True)`.
+    The event of a `SendTaskStreamingResponse` is encoded through the cache.
+    """
+    if (
+        type(item) is SendTaskStreamingResponse
+        and item.error is None
+        and isinstance(item.result, (TaskStatusUpdateEvent, TaskArtifactUpdateEvent))
+    ):
+        request_id = b"" if item.id is None else b'"id":' + to_json(item.id) + b","
+        return b"".join(
+            (
+                b'data: {"jsonrpc":"2.0",',
+                request_id,
+                b'"result":',
+                cache.encode(item.result),
+                b"}",
+                _SEPARATOR,
+                _SEPARATOR,
+            )
+        )
+    return b"".join((b"data: ", item.__pydantic_serializer__.to_json(item, exclude_none=True), _SEPARATOR, _SEPARATOR))
@@ -0,0 +1,133 @@
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket: `rate` requests per second on average, with bursts of up to `burst` requests."""
+
+    rate: float
+    burst: int
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0:
+            raise ValueError(f"rate must be positive, got {self.rate}")
+        if self.burst < 1:
+            raise ValueError(f"burst must be at least 1, got {self.burst}")
+
+
+class RateLimitBackend(Protocol):
+    """
+    State of the rate limits. The in-memory backend limits each server process separately;
+    a backend storing the state in a shared database applies the limits across processes.
+    """
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """
+        Take a token from the bucket `key`.
+        Return 0 if it was taken, otherwise the number of seconds until a token is available.
+        """
+        ...
+
+    async def open_stream(self, key: str, max_streams: int) -> bool:
+        """Count a new stream for `key`. Return False, without counting it, if `max_streams` are open."""
+        ...
+
+    async def close_stream(self, key: str) -> None: ...
+
+
+class InMemoryRateLimitBackend:
+    def __init__(self, prune_every: int = 10_000) -> None:
+        self.prune_every = prune_every
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        """Tokens left, time of the last update and time at which the bucket is full again, by key."""
+        self._streams: dict[str, int] = {}
+        self._takes = 0
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        self._takes += 1
+        if self._takes % self.prune_every == 0:
+            self._prune(now)
+        bucket = self._buckets.get(key)
+        tokens = float(limit.burst) if bucket is None else min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+        return 0.0 if allowed else (1 - tokens) / limit.rate
+
+    async def open_stream(self, key: str, max_streams: int) -> bool:
+        open_streams = self._streams.get(key, 0)
+        if open_streams >= max_streams:
+            return False
+        self._streams[key] = open_streams + 1
+        return True
+
+    async def close_stream(self, key: str) -> None:
+        open_streams = self._streams.get(key, 0) - 1
+        if open_streams > 0:
+            self._streams[key] = open_streams
+        else:
+            self._streams.pop(key, None)
+
+    def _prune(self, now: float) -> None:
+        # A full bucket is the same as no bucket, so callers that went quiet do not use memory.
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+
+
+class RateLimiter:
+    """
+    Rate limits applied by `A2AServer` to each caller (the caller id, or the client address
+    for anonymous requests):
+
+    - `per_caller` limits all the requests of a caller;
+    - `per_method` limits the requests of a caller to a JSON-RPC method (e.g. `tasks/send`);
+    - `max_streams_per_caller` caps the SSE streams (`tasks/sendSubscribe`, `tasks/resubscribe`)
+      a caller has open at the same time.
+
+    Usage:
+        server = A2AServer(
+            task_manager,
+            rate_limiter=RateLimiter(
+                per_caller=RateLimit(rate=20, burst=40),
+                per_method={"tasks/send": RateLimit(rate=2, burst=5)},
+                max_streams_per_caller=10,
+            ),
+        )
+    """
+
+    def __init__(
+        self,
+        per_caller: RateLimit | None = None,
+        per_method: dict[str, RateLimit] | None = None,
+        max_streams_per_caller: int | None = None,
+        backend: RateLimitBackend | None = None,
+    ) -> None:
+        self.per_caller = per_caller
+        self.per_method = per_method or {}
+        self.max_streams_per_caller = max_streams_per_caller
+        self.backend = backend or InMemoryRateLimitBackend()
+
+    async def check_caller(self, caller_key: str) -> float:
+        """Return 0 if the caller may send a request, otherwise the seconds to wait."""
+        if self.per_caller is None:
+            return 0.0
+        return await self.backend.take(f"caller:{caller_key}", self.per_caller)
+
+    async def check_method(self, caller_key: str, method: str) -> float:
+        """Return 0 if the caller may call `method`, otherwise the seconds to wait."""
+        limit = self.per_method.get(method)
+        if limit is None:
+            return 0.0
+        return await self.backend.take(f"method:{method}:{caller_key}", limit)
+
+    async def open_stream(self, caller_key: str) -> bool:
+        if self.max_streams_per_caller is None:
+            return True
+        return await self.backend.open_stream(f"streams:{caller_key}", self.max_streams_per_caller)
+
+    async def close_stream(self, caller_key: str) -> None:
+        if self.max_streams_per_caller is not None:
+            await self.backend.close_stream(f"streams:{caller_key}")
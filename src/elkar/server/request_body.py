@@ -0,0 +1,27 @@
+from starlette.requests import Request
+
+
+class RequestBodyTooLarge(Exception):
+    pass
+
+
+def check_content_length(request: Request, max_size: int) -> None:
+    """Reject a request whose declared length is over `max_size` before reading its body."""
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_size:
+        raise RequestBodyTooLarge()
+
+
+async def read_body(request: Request, max_size: int | None) -> bytes:
+    """Read the request body, stopping as soon as it is over `max_size` bytes."""
+    if max_size is None:
+        return await request.body()
+    check_content_length(request, max_size)
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_size:
+            raise RequestBodyTooLarge()
+        chunks.append(chunk)
+    return b"".join(chunks)
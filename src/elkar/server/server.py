@@ -1,22 +1,48 @@
+import asyncio
+import contextlib
+import inspect
 import json
 import logging
-from typing import Any, AsyncIterable, Callable
+import math
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, ContextManager, Iterator
 
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from sse_starlette.sse import EventSourceResponse
 from starlette.applications import Starlette
+from starlette.background import BackgroundTask, BackgroundTasks
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response, StreamingResponse
 
-from elkar.a2a_errors import InternalError, InvalidRequestError, JSONParseError
+from elkar.a2a_errors import InternalError, InvalidRequestError, JSONParseError, RateLimitExceededError
 from elkar.a2a_types import *
+from elkar.blob_store.base import BlobStore, externalize_message
+from elkar.json_codec import JSONCodec, PydanticJSONCodec
 from elkar.json_rpc import JSONRPCError
+from elkar.metrics import ACTIVE_STREAMS, REGISTRY, REQUEST_SECONDS, REQUESTS, STREAM_EVENTS
+from elkar.profiling import RequestProfiler, current_profile, stage
+from elkar.push_notification.keys import PushNotificationSigningKeys
+from elkar.server.authentication import AuthenticationError
+from elkar.server.event_stream import encode_sse_frame
+from elkar.server.rate_limit import RateLimiter
+from elkar.server.request_body import RequestBodyTooLarge, check_content_length, read_body
 from elkar.task_manager.task_manager_base import RequestContext, TaskManager
+from elkar.tracing import extract_trace_headers, inject_trace_headers, span
 
 logger = logging.getLogger(__name__)
 
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+_BLOB_CHUNK_SIZE = 1024 * 1024
+_MAX_PROFILE_SECONDS = 60.0
+_NOT_PROFILED = contextlib.nullcontext()
+
+
+def _authentication_headers(error: AuthenticationError) -> dict[str, str]:
+    return {"WWW-Authenticate": "Bearer"} if error.status_code == 401 else {}
+
 
 class A2AServer[T: TaskManager]:
     def __init__(
@@ -26,7 +52,18 @@ class A2AServer[T: TaskManager]:
         port: int = 5000,
         endpoint: str = "/",
         cors_allow_origins: list[str] = ["*"],
-        context_extractor: Callable[[Request], RequestContext] | None = None,
+        context_extractor: Callable[[Request], RequestContext | Awaitable[RequestContext]] | None = None,
+        push_notification_keys: PushNotificationSigningKeys | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_body_size: int | None = 64 * 1024 * 1024,
+        spill_file_parts_over: int | None = None,
+        blob_store: BlobStore | None = None,
+        metrics_path: str | None = None,
+        request_profiler: RequestProfiler | None = None,
+        debug_path: str | None = None,
+        debug_authorizer: Callable[[Request], bool | Awaitable[bool]] | None = None,
+        json_codec: JSONCodec | None = None,
+        shutdown_timeout: float | None = 30.0,
     ) -> None:
         self.host = host
         self.port = port
@@ -34,18 +71,29 @@ class A2AServer[T: TaskManager]:
         self.task_manager = task_manager
         self.cors_allow_origins = cors_allow_origins
         self.context_extractor = context_extractor
+        self.push_notification_keys = push_notification_keys
+        self.rate_limiter = rate_limiter
+        self.max_body_size = max_body_size
+        self.spill_file_parts_over = spill_file_parts_over
+        self.blob_store = blob_store
+        self.metrics_path = metrics_path
+        self.request_profiler = request_profiler
+        self.debug_path = debug_path
+        self.debug_authorizer = debug_authorizer
+        self.json_codec = json_codec or PydanticJSONCodec()
+        self.shutdown_timeout = shutdown_timeout
 
         middleware = [
             Middleware(
                 CORSMiddleware,
                 allow_origins=self.cors_allow_origins,
                 allow_methods=["GET", "POST", "OPTIONS"],
-                allow_headers=["Content-Type", "Authorization"],
+                allow_headers=["Content-Type", "Authorization", "traceparent", "tracestate"],
                 allow_credentials=True,
             )
         ]
 
-        self.app = Starlette(middleware=middleware)
+        self.app = Starlette(middleware=middleware, lifespan=self._lifespan)
 
         self.app.add_route(self.endpoint, self._process_request, methods=["POST", "OPTIONS"])
         self.app.add_route(
@@ -53,6 +101,23 @@ class A2AServer[T: TaskManager]:
             self._get_agent_card,
             methods=["GET", "OPTIONS"],
         )
+        if self.push_notification_keys is not None:
+            self.app.add_route(
+                "/.well-known/jwks.json",
+                self._get_jwks,
+                methods=["GET", "OPTIONS"],
+            )
+        if self.blob_store is not None:
+            self.app.add_route("/blobs/{blob_id}", self._get_blob, methods=["GET", "HEAD", "OPTIONS"])
+        if self.metrics_path is not None:
+            self.app.add_route(self.metrics_path, self._get_metrics, methods=["GET"])
+        if self.spill_file_parts_over is not None and self.blob_store is None:
+            raise ValueError("spill_file_parts_over requires a blob_store")
+        if self.debug_path is not None and self.request_profiler is not None:
+            if self.debug_authorizer is None:
+                raise ValueError("debug_path requires a debug_authorizer")
+            self.app.add_route(f"{self.debug_path}/requests", self._get_request_profiles, methods=["GET"])
+            self.app.add_route(f"{self.debug_path}/profile", self._run_profiler, methods=["GET"])
 
     def start(self, reload_server: bool = False) -> None:
         if self.task_manager is None:
@@ -67,15 +132,25 @@ class A2AServer[T: TaskManager]:
             reload=reload_server,
         )
 
+    @asynccontextmanager
+    async def _lifespan(self, app: Starlette) -> AsyncIterator[None]:
+        yield
+        # Handlers still running after `shutdown_timeout` seconds are canceled.
+        await self.task_manager.shutdown(self.shutdown_timeout)
+
     async def extract_request_context(self, request: Request) -> RequestContext:
         """Extracts the context from the request.
         The context is used to identify the caller and the session. Authentication is handled here.
 
         This method can be overridden by subclasses or replaced by providing a custom
-        context_extractor function during initialization.
+        context_extractor function during initialization. The function may be async
+        (see `BearerTokenAuthenticator`) and may raise `AuthenticationError` to reject the request.
         """
         if self.context_extractor:
-            return self.context_extractor(request)
+            request_context = self.context_extractor(request)
+            if inspect.isawaitable(request_context):
+                return await request_context
+            return request_context
 
         return RequestContext(
             caller_id=None,
@@ -87,66 +162,330 @@ class A2AServer[T: TaskManager]:
             return Response(status_code=200)
 
         agent_card = await self.task_manager.get_agent_card()
-        return JSONResponse(agent_card.model_dump(exclude_none=True))
+        return self._json_response(agent_card)
 
-    async def _process_request(self, request: Request) -> Response | JSONResponse | EventSourceResponse:
-        request_context = await self.extract_request_context(request)
-        if request.method == "OPTIONS":
+    async def _get_jwks(self, request: Request) -> Response:
+        """Serve the keys that verify the push notifications, with caching headers."""
+        if request.method == "OPTIONS" or self.push_notification_keys is None:
             return Response(status_code=200)
 
+        keys = self.push_notification_keys
+        headers = {
+            "Cache-Control": f"public, max-age={keys.jwks_max_age}",
+            "ETag": keys.jwks_etag,
+        }
+        if request.headers.get("if-none-match") == keys.jwks_etag:
+            return Response(status_code=304, headers=headers)
+        return Response(keys.jwks_json, media_type="application/json", headers=headers)
+
+    async def _get_metrics(self, request: Request) -> Response:
+        return Response(
+            REGISTRY.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    async def _get_request_profiles(self, request: Request) -> Response:
+        """Mean stage timings of the sampled requests and the last slow requests."""
+        if self.request_profiler is None:
+            return Response(status_code=404)
+        denied = await self._authorize_debug_request(request)
+        if denied is not None:
+            return denied
+        return Response(self.json_codec.encode(self.request_profiler.report()), media_type="application/json")
+
+    async def _run_profiler(self, request: Request) -> Response:
+        """Profile the server for `?seconds=` (10 by default) and return the profiler report."""
+        if self.request_profiler is None:
+            return Response(status_code=404)
+        denied = await self._authorize_debug_request(request)
+        if denied is not None:
+            return denied
+        try:
+            seconds = float(request.query_params.get("seconds", "10"))
+        except ValueError:
+            seconds = math.nan
+        if not 0 < seconds <= _MAX_PROFILE_SECONDS:
+            return Response(f"seconds must be a number in (0, {_MAX_PROFILE_SECONDS:g}]", status_code=400)
+        profiler = self.request_profiler.begin_profiling()
+        if profiler is None:
+            return Response("A profiler is already running", status_code=409)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            report = self.request_profiler.end_profiling(profiler)
+        return Response(report, media_type="text/plain")
+
+    async def _authorize_debug_request(self, request: Request) -> Response | None:
+        # Debug routes expose every caller's requests: the context extractor, which only
+        # identifies a caller, is not enough, they need the separate admin check.
+        if self.debug_authorizer is None:
+            return Response(status_code=403)
+        try:
+            allowed = self.debug_authorizer(request)
+            if inspect.isawaitable(allowed):
+                allowed = await allowed
+        except AuthenticationError as e:
+            return Response(status_code=e.status_code, headers=_authentication_headers(e))
+        return None if allowed else Response(status_code=403)
+
+    def _profile_request(self) -> ContextManager[Any]:
+        if self.request_profiler is None:
+            return _NOT_PROFILED
+        return self.request_profiler.profile_request()
+
+    async def _get_blob(self, request: Request) -> Response:
+        """
+        Serve a blob of the blob store to the caller that stored it; the blobs of other callers
+        are not found. Single range requests are supported.
+        """
+        if request.method == "OPTIONS" or self.blob_store is None:
+            return Response(status_code=200)
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-            result: AsyncIterable[Any] | JSONRPCResponse
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.get_task(json_rpc_request, request_context)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.send_task(json_rpc_request, request_context)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.send_task_streaming(json_rpc_request, request_context)
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.cancel_task(json_rpc_request, request_context)
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.set_task_push_notification(json_rpc_request, request_context)
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.get_task_push_notification(json_rpc_request, request_context)
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.resubscribe_to_task(json_rpc_request, request_context)
+            request_context = await self.extract_request_context(request)
+        except AuthenticationError as e:
+            return Response(status_code=e.status_code, headers=_authentication_headers(e))
+        caller_id = request_context.caller_id
+
+        blob_id = request.path_params["blob_id"]
+        size = await self.blob_store.size(blob_id, caller_id)
+        if size is None:
+            return Response(status_code=404)
+        # Blobs are named after their content, so they never change; but they belong to a caller.
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": f'"{blob_id}"',
+            "Cache-Control": "private, max-age=31536000, immutable",
+        }
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+
+        start, end, status_code = 0, size, 200
+        range_match = _RANGE_PATTERN.fullmatch(request.headers.get("range", "").strip())
+        if range_match is not None and (range_match.group(1) or range_match.group(2)):
+            first, last = range_match.groups()
+            if not first:
+                start = max(0, size - int(last))
             else:
-                logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
-                raise ValueError(f"Unexpected request type: {type(request)}")
+                start = int(first)
+                end = min(size, int(last) + 1) if last else size
+            if start >= end:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        headers["Content-Length"] = str(end - start)
+        if request.method == "HEAD":
+            return Response(status_code=status_code, headers=headers)
+        return StreamingResponse(
+            self._blob_chunks(self.blob_store, blob_id, caller_id, start, end),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/octet-stream",
+        )
+
+    @staticmethod
+    async def _blob_chunks(
+        blob_store: BlobStore, blob_id: str, caller_id: str | None, start: int, end: int
+    ) -> AsyncIterator[bytes | memoryview]:
+        # Chunks are sent as read: the memoryview slices of a memory-mapped store are not copied.
+        for offset in range(start, end, _BLOB_CHUNK_SIZE):
+            yield await blob_store.read(blob_id, offset, min(end, offset + _BLOB_CHUNK_SIZE), caller_id)
+
+    async def _process_request(self, request: Request) -> Response | EventSourceResponse:
+        if request.method == "OPTIONS":
+            return Response(status_code=200)
+        with span("a2a.request", trace_headers=extract_trace_headers(request.headers)), self._profile_request():
+            return await self._handle_request(request)
+
+    async def _handle_request(self, request: Request) -> Response | EventSourceResponse:
+        try:
+            if self.max_body_size is not None:
+                check_content_length(request, self.max_body_size)
+        except RequestBodyTooLarge:
+            return self._body_too_large()
+        try:
+            request_context = await self.extract_request_context(request)
+        except AuthenticationError as e:
+            return self._json_response(
+                JSONRPCResponse(id=None, error=e.error),
+                status_code=e.status_code,
+                headers=_authentication_headers(e),
+            )
+        # Handlers can continue the trace of the request, even from another process.
+        inject_trace_headers(request_context.trace_headers)
 
-            return self._create_response(result)
+        # The limit of the caller is checked before reading the request, the one of its method once parsed.
+        caller_key = self._caller_key(request, request_context)
+        if self.rate_limiter is not None:
+            retry_after = await self.rate_limiter.check_caller(caller_key)
+            if retry_after > 0:
+                return self._rate_limited(retry_after)
+        try:
+            with stage("read"):
+                raw_body = await read_body(request, self.max_body_size)
+        except RequestBodyTooLarge:
+            return self._body_too_large()
+
+        try:
+            with span("a2a.parse"), stage("parse"):
+                json_rpc_request = A2ARequest.validate_json(raw_body)
+                # Do not keep the raw body alive while the request is handled.
+                del raw_body
+            if self.rate_limiter is not None and self.rate_limiter.per_method:
+                retry_after = await self.rate_limiter.check_method(caller_key, json_rpc_request.method)
+                if retry_after > 0:
+                    return self._rate_limited(retry_after, json_rpc_request.id)
+            if (
+                self.spill_file_parts_over is not None
+                and self.blob_store is not None
+                and isinstance(json_rpc_request, (SendTaskRequest, SendTaskStreamingRequest))
+            ):
+                # Stored in the blob store, so that the stored task keeps a uri that still resolves.
+                with stage("parse"):
+                    json_rpc_request.params.message = await externalize_message(
+                        json_rpc_request.params.message,
+                        self.blob_store,
+                        self.spill_file_parts_over,
+                        request_context.caller_id,
+                    )
+            method = json_rpc_request.method
+            REQUESTS.labels(method).inc()
+            profile = current_profile()
+            if profile is not None:
+                profile.method = method
+            with REQUEST_SECONDS.labels(method).time():
+                if isinstance(json_rpc_request, (SendTaskStreamingRequest, TaskResubscriptionRequest)):
+                    return await self._process_stream_request(json_rpc_request, request_context, caller_key)
+                result: AsyncIterable[Any] | JSONRPCResponse
+                with stage("dispatch"):
+                    if isinstance(json_rpc_request, GetTaskRequest):
+                        result = await self.task_manager.get_task(json_rpc_request, request_context)
+                    elif isinstance(json_rpc_request, SendTaskRequest):
+                        result = await self.task_manager.send_task(json_rpc_request, request_context)
+                    elif isinstance(json_rpc_request, CancelTaskRequest):
+                        result = await self.task_manager.cancel_task(json_rpc_request, request_context)
+                    elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
+                        result = await self.task_manager.set_task_push_notification(json_rpc_request, request_context)
+                    elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
+                        result = await self.task_manager.get_task_push_notification(json_rpc_request, request_context)
+                    else:
+                        logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
+                        raise ValueError(f"Unexpected request type: {type(request)}")
+
+                return self._create_response(result, request_context.trace_headers)
 
         except Exception as e:
             raise e
             # return self._handle_exception(e)
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
+    async def _process_stream_request(
+        self,
+        json_rpc_request: SendTaskStreamingRequest | TaskResubscriptionRequest,
+        request_context: RequestContext,
+        caller_key: str,
+    ) -> Response | EventSourceResponse:
+        if self.rate_limiter is not None and not await self.rate_limiter.open_stream(caller_key):
+            return self._rate_limited(None, json_rpc_request.id)
+        close_stream = self._stream_closer(caller_key)
+        result: AsyncIterable[Any] | JSONRPCResponse
+        try:
+            with stage("dispatch"):
+                if isinstance(json_rpc_request, SendTaskStreamingRequest):
+                    result = await self.task_manager.send_task_streaming(json_rpc_request, request_context)
+                else:
+                    result = await self.task_manager.resubscribe_to_task(json_rpc_request, request_context)
+        except BaseException:
+            await close_stream()
+            raise
+        if not isinstance(result, AsyncIterable):
+            await close_stream()
+            return self._create_response(result, request_context.trace_headers)
+        if self.rate_limiter is not None:
+            result = self._closing_stream(result, close_stream)
+        # Once the response is over, whether the stream ended, the client left or the stream was never
+        # iterated, the stream is closed.
+        return self._create_response(result, request_context.trace_headers, BackgroundTask(close_stream))
+
+    async def _closing_stream(
+        self, result: AsyncIterable[Any], close_stream: Callable[[], Awaitable[None]]
+    ) -> AsyncIterable[Any]:
+        try:
+            async for item in result:
+                yield item
+        finally:
+            await close_stream()
+
+    def _stream_closer(self, caller_key: str) -> Callable[[], Awaitable[None]]:
+        """Return a function closing the stream of `caller_key` in the rate limiter, once."""
+        closed = False
+
+        async def close_stream() -> None:
+            nonlocal closed
+            if closed or self.rate_limiter is None:
+                return
+            closed = True
+            await self.rate_limiter.close_stream(caller_key)
+
+        return close_stream
+
+    @staticmethod
+    def _caller_key(request: Request, request_context: RequestContext) -> str:
+        if request_context.caller_id is not None:
+            return request_context.caller_id
+        return f"address:{request.client.host if request.client is not None else 'unknown'}"
+
+    def _json_response(
+        self, model: BaseModel, status_code: int = 200, headers: dict[str, str] | None = None
+    ) -> Response:
+        return Response(
+            self.json_codec.encode_model(model),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
+
+    def _body_too_large(self) -> Response:
+        error = InvalidRequestError(message=f"Request body is larger than {self.max_body_size} bytes")
+        return self._json_response(JSONRPCResponse(id=None, error=error), status_code=413)
+
+    def _rate_limited(self, retry_after: float | None, request_id: int | str | None = None) -> Response:
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after is not None else None
+        response = JSONRPCResponse(id=request_id, error=RateLimitExceededError())
+        return self._json_response(response, status_code=429, headers=headers)
+
+    def _handle_exception(self, e: Exception) -> Response:
         json_rpc_error: JSONRPCError
         if isinstance(e, json.decoder.JSONDecodeError):
             json_rpc_error = JSONParseError()
         elif isinstance(e, ValidationError):
-            json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
+            json_rpc_error = InvalidRequestError(data=self.json_codec.decode(e.json()))
         else:
             logger.error(f"Unhandled exception: {e}")
             json_rpc_error = InternalError()
 
-        response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
+        return self._json_response(JSONRPCResponse(id=None, error=json_rpc_error), status_code=400)
 
-    def _create_response(self, result: Any) -> JSONResponse | EventSourceResponse:
+    def _create_response(
+        self,
+        result: Any,
+        trace_headers: dict[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(
                 result: AsyncIterable[Any],
-            ) -> AsyncIterable[dict[str, str]]:
-                async for item in result:
-                    yield {"data": item.model_dump_json(exclude_none=True)}
+            ) -> AsyncIterable[bytes]:
+                with ACTIVE_STREAMS.labels().track():
+                    async for item in result:
+                        STREAM_EVENTS.inc()
+                        # The span includes the time the event takes to be written.
+                        with span("a2a.sse.event", trace_headers=trace_headers):
+                            yield encode_sse_frame(item)
 
-            return EventSourceResponse(event_generator(result))
+            return EventSourceResponse(event_generator(result), background=background)
         elif isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            with stage("serialize"):
+                return self._json_response(result)
         else:
             logger.error(f"Unexpected result type: {type(result)}")
             raise ValueError(f"Unexpected result type: {type(result)}")
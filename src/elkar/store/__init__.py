@@ -1,11 +1,27 @@
-from .base import StoredTask, TaskManagerStore
-from .elkar_client_store import ElkarClientStore, ElkarClientStoreClientSide
-from .in_memory import InMemoryClientSideTaskManagerStore, InMemoryTaskManagerStore
+from typing import TYPE_CHECKING
+
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import StoredTask, TaskManagerStore
+    from .elkar_client_store import ElkarClientStore, ElkarClientStoreClientSide
+    from .in_memory import InMemoryClientSideTaskManagerStore, InMemoryTaskManagerStore
+
+# `ElkarClientStore` (and httpx) is only imported when first used.
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "StoredTask": ".base",
+        "TaskManagerStore": ".base",
+        "ElkarClientStore": ".elkar_client_store",
+        "ElkarClientStoreClientSide": ".elkar_client_store",
+        "InMemoryClientSideTaskManagerStore": ".in_memory",
+        "InMemoryTaskManagerStore": ".in_memory",
+    },
+)
 
 __all__ = [
     "TaskManagerStore",
-    "ListTasksOrder",
-    "ListTasksParams",
     "StoredTask",
     "InMemoryTaskManagerStore",
     "InMemoryClientSideTaskManagerStore",
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Protocol
+
+from elkar.store.base import StoredTask, UpdateTaskParams
+
+logger = logging.getLogger(__name__)
+
+
+class _TaskUpdater(Protocol):
+    async def update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask: ...
+
+
+def coalesce_updates(updates: list[UpdateTaskParams]) -> list[UpdateTaskParams]:
+    """
+    Merge consecutive updates of a task into as few updates as possible, without changing the resulting task.
+    Rules:
+    - artifact updates and new messages are concatenated in order
+    - a later status replaces an earlier one, unless the earlier status carries a message
+      (the store appends it to the history, so dropping it would lose a message)
+    - metadata and push notification are replaced by the latest value
+    - updates with a different caller_id are never merged
+    """
+    merged: list[UpdateTaskParams] = []
+    for update in updates:
+        current = merged[-1] if merged else None
+        if current is None or not _can_merge(current, update):
+            merged.append(
+                UpdateTaskParams(
+                    status=update.status,
+                    artifacts_updates=list(update.artifacts_updates) if update.artifacts_updates is not None else None,
+                    new_messages=list(update.new_messages) if update.new_messages is not None else None,
+                    metadata=update.metadata,
+                    push_notification=update.push_notification,
+                    caller_id=update.caller_id,
+                )
+            )
+            continue
+        if update.status is not None:
+            current.status = update.status
+        if update.artifacts_updates is not None:
+            current.artifacts_updates = (current.artifacts_updates or []) + update.artifacts_updates
+        if update.new_messages is not None:
+            current.new_messages = (current.new_messages or []) + update.new_messages
+        if update.metadata is not None:
+            current.metadata = update.metadata
+        if update.push_notification is not None:
+            current.push_notification = update.push_notification
+    return merged
+
+
+def _can_merge(current: UpdateTaskParams, update: UpdateTaskParams) -> bool:
+    if current.caller_id != update.caller_id:
+        return False
+    if update.status is not None and current.status is not None and current.status.message is not None:
+        return False
+    # The store applies the status message before the new messages, so a status message
+    # coming after already buffered messages must not be merged.
+    if update.status is not None and update.status.message is not None and current.new_messages:
+        return False
+    return True
+
+
+class BackgroundTaskWriter:
+    """
+    Applies task updates to a store from a background worker, in submission order.
+
+    Submitting an update never waits for the store: updates are queued and the worker
+    applies everything that accumulated since its last write as one coalesced batch.
+    Call `flush` to wait until every submitted update has been written, and `close`
+    once no more updates will be submitted.
+    """
+
+    def __init__(self, store: _TaskUpdater, task_id: str) -> None:
+        self._store = store
+        self._task_id = task_id
+        self._pending: asyncio.Queue[UpdateTaskParams] = asyncio.Queue()
+        self._worker: asyncio.Task[None] | None = None
+
+    def submit(self, params: UpdateTaskParams) -> None:
+        self._pending.put_nowait(params)
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def flush(self) -> None:
+        await self._pending.join()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._pending.get()]
+            while not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            try:
+                for params in coalesce_updates(batch):
+                    await self._store.update_task(self._task_id, params)
+            except Exception as e:
+                logger.error(f"Error while writing updates of task {self._task_id}: {e}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
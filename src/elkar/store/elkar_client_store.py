@@ -8,6 +8,7 @@ from elkar.api_client.models import (
     UpsertTaskA2AInput,
 )
 from elkar.common import PaginatedResponse, TaskType
+from elkar.metrics import STORE_OPERATION_SECONDS, timed
 from elkar.store.base import (
     ClientSideTaskManagerStore,
     StoredTask,
@@ -36,6 +37,7 @@ class ElkarClientStore(TaskManagerStore):
     def __init__(self, base_url: str, api_key: str | None = None) -> None:
         self.client = ElkarClient(base_url=base_url, api_key=api_key)
 
+    @timed(STORE_OPERATION_SECONDS.labels("elkar", "upsert_task"))
     async def upsert_task(
         self,
         task: TaskSendParams,
@@ -63,6 +65,7 @@ class ElkarClientStore(TaskManagerStore):
             agent_url=None,
         )
 
+    @timed(STORE_OPERATION_SECONDS.labels("elkar", "get_task"))
     async def get_task(
         self,
         task_id: str,
@@ -81,11 +84,13 @@ class ElkarClientStore(TaskManagerStore):
 
         return convert_task(task_response)
 
+    @timed(STORE_OPERATION_SECONDS.labels("elkar", "update_task"))
     async def update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
         task_input = UpdateTaskInput(
             status=params.status,
             artifacts_updates=params.artifacts_updates,
             new_messages=params.new_messages,
+            metadata=params.metadata,
             push_notification=params.push_notification,
             caller_id=params.caller_id,
         )
@@ -103,6 +108,7 @@ class ElkarClientStoreClientSide(ClientSideTaskManagerStore):
         # )
         self.client = ElkarClient(base_url=base_url, api_key=api_key)
 
+    @timed(STORE_OPERATION_SECONDS.labels("elkar_client_side", "upsert_task"))
     async def upsert_task(self, task: Task, server_agent_url: str, caller_id: str | None = None) -> StoredTask:
         task_input = UpsertTaskA2AInput(
             task=task,
@@ -112,6 +118,7 @@ class ElkarClientStoreClientSide(ClientSideTaskManagerStore):
         task_response = await self.client.upsert_task_client_side(task_input)
         return convert_task(task_response)
 
+    @timed(STORE_OPERATION_SECONDS.labels("elkar_client_side", "get_task"))
     async def get_task(self, task_id: str) -> StoredTask | None:
         task_response = await self.client.get_task_client_side(task_id)
         if task_response is None:
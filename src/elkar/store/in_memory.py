@@ -1,33 +1,46 @@
 import asyncio
 import logging
+from dataclasses import replace
 from datetime import datetime
 
 from elkar.a2a_types import (
-    Artifact,
     Task,
     TaskSendParams,
     TaskState,
     TaskStatus,
 )
 from elkar.common import TaskType
+from elkar.metrics import STORE_OPERATION_SECONDS, timed
 from elkar.store.base import (
     ClientSideTaskManagerStore,
     StoredTask,
     TaskManagerStore,
     UpdateTaskParams,
 )
+from elkar.store.task_version import StoredTaskVersion
 
 logger = logging.getLogger(__name__)
 
 
 class InMemoryTaskManagerStore(TaskManagerStore):
+    """
+    Keeps the tasks in memory.
+
+    Stored tasks are immutable versions: an update never modifies a `StoredTask`, it publishes
+    a new version sharing the history and artifact parts of the previous one, and appending a
+    message or a part costs O(1) (see `elkar.store.task_version`). Reading a task is an O(1)
+    lookup returning a snapshot that stays consistent while handlers keep updating the task,
+    and readers never wait for writers.
+    """
+
     def __init__(self) -> None:
-        self.tasks: dict[str | None, dict[str, StoredTask]] = {}
+        self.tasks: dict[str | None, dict[str, StoredTaskVersion]] = {}
         self.lock = asyncio.Lock()
 
-    def caller_tasks(self, caller_id: str | None) -> dict[str, StoredTask] | None:
+    def caller_tasks(self, caller_id: str | None) -> dict[str, StoredTaskVersion] | None:
         return self.tasks.get(caller_id)
 
+    @timed(STORE_OPERATION_SECONDS.labels("in_memory", "upsert_task"))
     async def upsert_task(
         self,
         params: TaskSendParams,
@@ -35,21 +48,17 @@ class InMemoryTaskManagerStore(TaskManagerStore):
         caller_id: str | None = None,
     ) -> StoredTask:
         async with self.lock:
-            caller_tasks = self.tasks.get(caller_id)
-            if caller_tasks is None:
-                self.tasks[caller_id] = {}
+            caller_tasks = self.tasks.setdefault(caller_id, {})
 
-            task = self.tasks[caller_id].get(params.id)
+            task = caller_tasks.get(params.id)
             if task is not None:
                 if task.caller_id != caller_id:
                     raise ValueError(f"Task {params.id} is already owned by caller {task.caller_id}")
-                if task.task.history is None:
-                    task.task.history = []
-
-                task.task.history.append(params.message)
-                task.updated_at = datetime.now()
-                return task
-            self.tasks[caller_id][params.id] = StoredTask(
+                caller_tasks[params.id] = task.updated(
+                    task.version.apply(UpdateTaskParams(new_messages=[params.message]))
+                )
+                return caller_tasks[params.id]
+            caller_tasks[params.id] = StoredTaskVersion(
                 id=params.id,
                 caller_id=caller_id,
                 task_type=TaskType.INCOMING,
@@ -69,87 +78,58 @@ class InMemoryTaskManagerStore(TaskManagerStore):
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
             )
-            print(self.tasks)
-            return self.tasks[caller_id][params.id]
+            return caller_tasks[params.id]
 
+    @timed(STORE_OPERATION_SECONDS.labels("in_memory", "get_task"))
     async def get_task(
         self,
         task_id: str,
         history_length: int | None = None,
         caller_id: str | None = None,
     ) -> StoredTask | None:
-        async with self.lock:
-            caller_tasks = self.caller_tasks(caller_id=caller_id)
-            if caller_tasks is None:
-                return None
-            return caller_tasks.get(task_id)
+        caller_tasks = self.caller_tasks(caller_id=caller_id)
+        if caller_tasks is None:
+            return None
+        stored_task = caller_tasks.get(task_id)
+        if stored_task is None or history_length is None:
+            return stored_task
+        return replace(stored_task, task=stored_task.version.with_history_length(history_length))
 
+    @timed(STORE_OPERATION_SECONDS.labels("in_memory", "update_task"))
     async def update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
         return await _update_task(self.lock, self.tasks, task_id, params)
 
 
 async def _update_task(
     lock: asyncio.Lock,
-    tasks: dict[str | None, dict[str, StoredTask]],
+    tasks: dict[str | None, dict[str, StoredTaskVersion]],
     task_id: str,
     params: UpdateTaskParams,
 ) -> StoredTask:
     async with lock:
         if params.caller_id not in tasks:
             raise ValueError("caller id was not found")
-        mutable_task = tasks[params.caller_id][task_id].task
-        if task_id not in tasks[params.caller_id]:
+        caller_tasks = tasks[params.caller_id]
+        if task_id not in caller_tasks:
             raise ValueError(f"Task {task_id} does not exist")
-
-        if params.status is not None:
-            mutable_task.status = params.status
-            if mutable_task.history is None:
-                mutable_task.history = []
-            if params.status.message is not None:
-                mutable_task.history.append(params.status.message)
-        if params.new_messages is not None:
-            if mutable_task.history is None:
-                mutable_task.history = []
-            mutable_task.history.extend(params.new_messages)
-        if params.metadata is not None:
-            mutable_task.metadata = params.metadata
-        if params.artifacts_updates is not None:
-            for artifact in params.artifacts_updates:
-                await upsert_artifact(mutable_task, artifact)
-
-        if params.push_notification is not None:
-            tasks[params.caller_id][task_id].push_notification = params.push_notification
-        tasks[params.caller_id][task_id].updated_at = datetime.now()
-        return tasks[params.caller_id][task_id]
-
-
-async def upsert_artifact(task: Task, artifact: Artifact) -> None:
-    if task.artifacts is None:
-        task.artifacts = []
-    for existing_artifact in task.artifacts:
-        if existing_artifact.index == artifact.index:
-            if existing_artifact.lastChunk == True:
-                raise ValueError(f"Artifact {existing_artifact.index} is already a last chunk")
-            existing_artifact.parts.extend(artifact.parts)
-            existing_artifact.lastChunk = artifact.lastChunk
-            return
-    task.artifacts.append(artifact)
+        stored_task = caller_tasks[task_id]
+        caller_tasks[task_id] = stored_task.updated(stored_task.version.apply(params), params.push_notification)
+        return caller_tasks[task_id]
 
 
 class InMemoryClientSideTaskManagerStore(ClientSideTaskManagerStore):
     def __init__(self) -> None:
-        self.tasks: dict[str | None, dict[str, StoredTask]] = {}
+        self.tasks: dict[str | None, dict[str, StoredTaskVersion]] = {}
         self.lock = asyncio.Lock()
 
+    @timed(STORE_OPERATION_SECONDS.labels("in_memory_client_side", "upsert_task_for_client"))
     async def upsert_task_for_client(self, task: Task, agent_url: str, caller_id: str | None = None) -> StoredTask:
         async with self.lock:
             task_id = task.id
-            caller_tasks = self.tasks.get(caller_id)
-            if caller_tasks is None:
-                caller_tasks = {}
+            caller_tasks = self.tasks.setdefault(caller_id, {})
             curr_task = caller_tasks.get(task_id)
             if curr_task is None:
-                caller_tasks[task_id] = StoredTask(
+                caller_tasks[task_id] = StoredTaskVersion(
                     id=task_id,
                     task=task,
                     task_type=TaskType.OUTGOING,
@@ -165,20 +145,19 @@ class InMemoryClientSideTaskManagerStore(ClientSideTaskManagerStore):
                 raise ValueError(f"Task {task_id} is already owned by caller {curr_task.caller_id}")
             elif caller_id is None and curr_task.caller_id is not None:
                 raise ValueError(f"Task {task_id} is already owned")
-            curr_task.task = task
-            curr_task.updated_at = datetime.now()
-            curr_task.agent_url = agent_url
-            return curr_task
+            caller_tasks[task_id] = replace(curr_task, task=task, updated_at=datetime.now(), agent_url=agent_url)
+            return caller_tasks[task_id]
 
+    @timed(STORE_OPERATION_SECONDS.labels("in_memory_client_side", "get_task_for_client"))
     async def get_task_for_client(self, task_id: str, caller_id: str | None) -> StoredTask | None:
-        async with self.lock:
-            caller_tasks = self.tasks.get(caller_id)
-            if caller_tasks is None:
-                return None
-            task = caller_tasks.get(task_id)
-            if task is not None and task.caller_id == caller_id:
-                return task
+        caller_tasks = self.tasks.get(caller_id)
+        if caller_tasks is None:
             return None
+        task = caller_tasks.get(task_id)
+        if task is not None and task.caller_id == caller_id:
+            return task
+        return None
 
+    @timed(STORE_OPERATION_SECONDS.labels("in_memory_client_side", "update_task"))
     async def update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
         return await _update_task(self.lock, self.tasks, task_id, params)
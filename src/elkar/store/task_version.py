@@ -0,0 +1,212 @@
+"""
+Versions of a task sharing their history and artifact parts.
+
+The history and the parts of each artifact are append-only lists shared by all the versions of
+a task; a version only records how many of their items it sees. An update appends to the lists
+of the latest version and returns a new version with longer bounds, in O(1) per message or part
+(plus O(1) per artifact of the task), and never changes an existing version. The `Task` of a
+version is built from the lists the first time it is read, then kept; each reader gets a shallow
+copy of it, with its own lists and metadata.
+"""
+
+from datetime import datetime
+
+from elkar.a2a_types import Artifact, Message, Part, PushNotificationConfig, Task
+from elkar.common import TaskType
+from elkar.store.base import StoredTask, UpdateTaskParams
+
+
+class _ArtifactVersion:
+    __slots__ = ("artifact", "parts", "parts_length", "last_chunk")
+
+    def __init__(self, artifact: Artifact, parts: list[Part], parts_length: int, last_chunk: bool | None) -> None:
+        self.artifact = artifact
+        """The first chunk of the artifact, for its name, description and metadata."""
+        self.parts = parts
+        self.parts_length = parts_length
+        self.last_chunk = last_chunk
+
+    def append(self, artifact: Artifact) -> "_ArtifactVersion":
+        if self.last_chunk == True:
+            raise ValueError(f"Artifact {self.artifact.index} is already a last chunk")
+        parts = self.parts if self.parts_length == len(self.parts) else self.parts[: self.parts_length]
+        parts.extend(artifact.parts)
+        return _ArtifactVersion(self.artifact, parts, len(parts), artifact.lastChunk)
+
+    def build(self) -> Artifact:
+        return self.artifact.model_copy(update={"parts": self.parts[: self.parts_length], "lastChunk": self.last_chunk})
+
+
+class TaskVersion:
+    """An immutable version of a task. See the module documentation."""
+
+    __slots__ = ("_head", "_history", "_history_length", "_artifacts", "_task")
+
+    def __init__(
+        self,
+        head: Task,
+        history: list[Message] | None,
+        history_length: int,
+        artifacts: tuple[_ArtifactVersion, ...] | None,
+    ) -> None:
+        self._head = head
+        """The task without its history and artifacts."""
+        self._history = history
+        self._history_length = history_length
+        self._artifacts = artifacts
+        self._task: Task | None = None
+
+    @classmethod
+    def of(cls, task: Task) -> "TaskVersion":
+        """The first version of a task. Its lists are copied, so later changes to `task` are not seen."""
+        artifacts = None
+        if task.artifacts is not None:
+            artifacts = tuple(
+                _ArtifactVersion(artifact, list(artifact.parts), len(artifact.parts), artifact.lastChunk)
+                for artifact in task.artifacts
+            )
+        history = list(task.history) if task.history is not None else None
+        return cls(
+            task.model_copy(update={"history": None, "artifacts": None}),
+            history,
+            len(history or []),
+            artifacts,
+        )
+
+    @property
+    def task(self) -> Task:
+        """
+        A copy of the task of this version: its fields, lists and metadata can be changed without
+        changing the version. Its messages and parts are shared with the version and must not be changed.
+        """
+        task = self._build()
+        return _copy(task, task.history)
+
+    def with_history_length(self, history_length: int) -> Task:
+        """The task of this version with only its last `history_length` messages."""
+        task = self._build()
+        if self._history is None:
+            return _copy(task, None)
+        start = max(0, self._history_length - history_length) if history_length > 0 else self._history_length
+        return _copy(task, self._history[start : self._history_length])
+
+    def _build(self) -> Task:
+        if self._task is None:
+            self._task = self._head.model_copy(
+                update={
+                    "history": self._history[: self._history_length] if self._history is not None else None,
+                    "artifacts": [artifact.build() for artifact in self._artifacts]
+                    if self._artifacts is not None
+                    else None,
+                }
+            )
+        return self._task
+
+    def apply(self, params: UpdateTaskParams) -> "TaskVersion":
+        """Return the version with the status, messages, metadata and artifacts of the update applied."""
+        head_changes: dict[str, object] = {}
+        new_messages: list[Message] = []
+        if params.status is not None:
+            head_changes["status"] = params.status
+            if params.status.message is not None:
+                new_messages.append(params.status.message)
+        if params.new_messages is not None:
+            new_messages.extend(params.new_messages)
+        if params.metadata is not None:
+            head_changes["metadata"] = params.metadata
+
+        history, history_length = self._history, self._history_length
+        if new_messages or (history is None and (params.status is not None or params.new_messages is not None)):
+            # Append to the shared list, unless a later version already did: then this version forks.
+            if history is None or history_length != len(history):
+                history = list(history[:history_length]) if history is not None else []
+            history.extend(new_messages)
+            history_length = len(history)
+
+        artifacts = self._artifacts
+        if params.artifacts_updates is not None:
+            updated = list(artifacts or ())
+            for artifact in params.artifacts_updates:
+                for position, existing in enumerate(updated):
+                    if existing.artifact.index == artifact.index:
+                        updated[position] = existing.append(artifact)
+                        break
+                else:
+                    updated.append(
+                        _ArtifactVersion(artifact, list(artifact.parts), len(artifact.parts), artifact.lastChunk)
+                    )
+            artifacts = tuple(updated)
+
+        head = self._head.model_copy(update=head_changes) if head_changes else self._head
+        return TaskVersion(head, history, history_length, artifacts)
+
+
+def _copy(task: Task, history: list[Message] | None) -> Task:
+    return task.model_copy(
+        update={
+            "status": task.status.model_copy(),
+            "history": list(history) if history is not None else None,
+            "artifacts": [
+                artifact.model_copy(
+                    update={
+                        "parts": list(artifact.parts),
+                        "metadata": dict(artifact.metadata) if artifact.metadata is not None else None,
+                    }
+                )
+                for artifact in task.artifacts
+            ]
+            if task.artifacts is not None
+            else None,
+            "metadata": dict(task.metadata) if task.metadata is not None else None,
+        }
+    )
+
+
+class StoredTaskVersion(StoredTask):
+    """A `StoredTask` whose `task` is built from a `TaskVersion` when it is first read."""
+
+    def __init__(
+        self,
+        id: str,
+        caller_id: str | None,
+        task_type: TaskType,
+        is_streaming: bool,
+        task: Task | TaskVersion,
+        push_notification: PushNotificationConfig | None,
+        created_at: datetime,
+        updated_at: datetime,
+        agent_url: str | None = None,
+    ) -> None:
+        self.id = id
+        self.caller_id = caller_id
+        self.task_type = task_type
+        self.is_streaming = is_streaming
+        self.version = task if isinstance(task, TaskVersion) else TaskVersion.of(task)
+        self.push_notification = push_notification
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.agent_url = agent_url
+
+    @property  # type: ignore[override]
+    def task(self) -> Task:
+        return self.version.task
+
+    @task.setter
+    def task(self, task: Task) -> None:
+        self.version = TaskVersion.of(task)
+
+    def updated(
+        self, version: TaskVersion, push_notification: PushNotificationConfig | None = None
+    ) -> "StoredTaskVersion":
+        """The next version of the stored task."""
+        return StoredTaskVersion(
+            id=self.id,
+            caller_id=self.caller_id,
+            task_type=self.task_type,
+            is_streaming=self.is_streaming,
+            task=version,
+            push_notification=push_notification if push_notification is not None else self.push_notification,
+            created_at=self.created_at,
+            updated_at=datetime.now(),
+            agent_url=self.agent_url,
+        )
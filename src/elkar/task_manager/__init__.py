@@ -1,4 +1,19 @@
-from .task_manager_base import TaskManager
-from .task_manager_with_task_modifier import TaskManagerWithModifier
+from typing import TYPE_CHECKING
 
-__all__ = ["TaskManager", "TaskManagerWithModifier"]
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .scheduler import TaskScheduler
+    from .task_manager_base import TaskManager
+    from .task_manager_with_task_modifier import TaskManagerWithModifier
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "TaskScheduler": ".scheduler",
+        "TaskManager": ".task_manager_base",
+        "TaskManagerWithModifier": ".task_manager_with_task_modifier",
+    },
+)
+
+__all__ = ["TaskManager", "TaskManagerWithModifier", "TaskScheduler"]
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Coroutine
+
+logger = logging.getLogger(__name__)
+
+
+class HandlerRegistry:
+    """
+    Keeps track of the task handlers running in the background.
+
+    Holding a reference to every running handler prevents it from being garbage-collected
+    mid-flight, lets `cancel_task` stop the handler of a task, and lets the server wait for
+    running handlers when it shuts down. Streaming handlers are spawned in the background;
+    non-streaming ones are `run` in the registry while the request waits for them.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[tuple[str, str | None], set[asyncio.Task[Any]]] = {}
+        self._streaming: set[asyncio.Task[Any]] = set()
+        self.started = 0
+        self.canceled = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of handlers currently running."""
+        return sum(len(handlers) for handlers in self._handlers.values())
+
+    def is_running(self, task_id: str, caller_id: str | None = None) -> bool:
+        return (task_id, caller_id) in self._handlers
+
+    def is_streaming(self, task_id: str, caller_id: str | None = None) -> bool:
+        """Whether a streaming handler of the task is running, i.e. subscribers wait for its events."""
+        return any(handler in self._streaming for handler in self._handlers.get((task_id, caller_id), ()))
+
+    def spawn(
+        self, task_id: str, caller_id: str | None, coroutine: Coroutine[Any, Any, Any], streaming: bool = True
+    ) -> asyncio.Task[Any]:
+        key = (task_id, caller_id)
+        handler = asyncio.create_task(coroutine, name=f"task-handler-{task_id}")
+        self._handlers.setdefault(key, set()).add(handler)
+        if streaming:
+            self._streaming.add(handler)
+        self.started += 1
+        handler.add_done_callback(lambda done: self._on_done(key, done))
+        return handler
+
+    async def run[T](self, task_id: str, caller_id: str | None, coroutine: Coroutine[Any, Any, T]) -> T | None:
+        """
+        Spawn a handler and wait for its result. Returns None when the handler was canceled by
+        `cancel` or `shutdown`; canceling the waiting request cancels the handler too.
+        """
+        handler = self.spawn(task_id, caller_id, coroutine, streaming=False)
+        try:
+            return await handler
+        except asyncio.CancelledError:
+            current_task = asyncio.current_task()
+            if not handler.cancelled() or (current_task is not None and current_task.cancelling()):
+                raise
+            return None
+
+    def cancel(self, task_id: str, caller_id: str | None = None) -> bool:
+        """Request cancellation of the handlers of a task. Returns True if a handler was running."""
+        handlers = self._handlers.get((task_id, caller_id))
+        if not handlers:
+            return False
+        for handler in handlers:
+            handler.cancel()
+        self.canceled += len(handlers)
+        return True
+
+    async def shutdown(self, timeout: float | None = None) -> None:
+        """Wait for the running handlers to finish, canceling the ones still running after `timeout`."""
+        handlers = [handler for handlers in self._handlers.values() for handler in handlers]
+        if not handlers:
+            return
+        _, pending = await asyncio.wait(handlers, timeout=timeout)
+        for handler in pending:
+            handler.cancel()
+        if pending:
+            logger.warning(f"Canceled {len(pending)} task handlers still running at shutdown")
+            await asyncio.wait(pending)
+
+    def _on_done(self, key: tuple[str, str | None], handler: asyncio.Task[Any]) -> None:
+        self._streaming.discard(handler)
+        handlers = self._handlers.get(key)
+        if handlers is not None:
+            handlers.discard(handler)
+            if not handlers:
+                del self._handlers[key]
+        if handler.cancelled():
+            return
+        exception = handler.exception()
+        if exception is not None:
+            logger.error(f"Task handler for task {key[0]} failed: {exception}")
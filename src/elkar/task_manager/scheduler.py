@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from types import TracebackType
+
+from elkar.task_manager.task_manager_base import RequestContext
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CLASSES: dict[str, int] = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY_CLASS = "normal"
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    sequence: int
+    caller_id: str | None = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class TaskScheduler:
+    """
+    Admission control for task handlers.
+
+    Limits how many handlers run at the same time, globally and per caller. Requests that
+    cannot run immediately wait in a bounded queue, ordered by priority class then arrival.
+    When the queue is full, the request is rejected right away instead of piling up.
+
+    The priority class is read from `RequestContext.metadata[priority_key]` and must be one
+    of `PRIORITY_CLASSES` ("high", "normal", "low"); anything else is treated as "normal".
+
+    Usage:
+        reservation = scheduler.reserve(request_context)
+        if reservation is None:
+            ...  # saturated, reject the request
+        async with reservation:
+            ...  # run the handler
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_concurrency_per_caller: int | None = None,
+        max_queue_size: int = 0,
+        priority_key: str = "priority",
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_caller = max_concurrency_per_caller
+        self.max_queue_size = max_queue_size
+        self.priority_key = priority_key
+        self._running = 0
+        self._running_per_caller: dict[str | None, int] = {}
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def reserve(self, request_context: RequestContext | None) -> "Reservation | None":
+        """Reserve a slot for a handler. Returns None if the scheduler is saturated."""
+        caller_id = request_context.caller_id if request_context is not None else None
+        if self._has_capacity(caller_id):
+            self._acquire(caller_id)
+            return Reservation(self, caller_id, None)
+        if len(self._waiters) >= self.max_queue_size:
+            logger.warning(f"Task scheduler saturated, rejecting request from caller {caller_id}")
+            return None
+        waiter = _Waiter(
+            rank=self._priority_rank(request_context),
+            sequence=next(self._sequence),
+            caller_id=caller_id,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        return Reservation(self, caller_id, waiter)
+
+    def _priority_rank(self, request_context: RequestContext | None) -> int:
+        if request_context is None:
+            return PRIORITY_CLASSES[DEFAULT_PRIORITY_CLASS]
+        priority = request_context.metadata.get(self.priority_key, DEFAULT_PRIORITY_CLASS)
+        return PRIORITY_CLASSES.get(priority, PRIORITY_CLASSES[DEFAULT_PRIORITY_CLASS])
+
+    def _has_capacity(self, caller_id: str | None) -> bool:
+        if self.max_concurrency is not None and self._running >= self.max_concurrency:
+            return False
+        if (
+            self.max_concurrency_per_caller is not None
+            and self._running_per_caller.get(caller_id, 0) >= self.max_concurrency_per_caller
+        ):
+            return False
+        return True
+
+    def _acquire(self, caller_id: str | None) -> None:
+        self._running += 1
+        self._running_per_caller[caller_id] = self._running_per_caller.get(caller_id, 0) + 1
+
+    def _release(self, caller_id: str | None) -> None:
+        self._running -= 1
+        remaining = self._running_per_caller[caller_id] - 1
+        if remaining == 0:
+            del self._running_per_caller[caller_id]
+        else:
+            self._running_per_caller[caller_id] = remaining
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        for waiter in sorted(self._waiters):
+            if self.max_concurrency is not None and self._running >= self.max_concurrency:
+                return
+            if waiter.future.done():
+                self._waiters.remove(waiter)
+                continue
+            if not self._has_capacity(waiter.caller_id):
+                continue
+            self._waiters.remove(waiter)
+            self._acquire(waiter.caller_id)
+            waiter.future.set_result(None)
+
+    def _discard_waiter(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+
+class Reservation:
+    """A slot reserved in a `TaskScheduler`, held while the handler runs."""
+
+    def __init__(self, scheduler: TaskScheduler, caller_id: str | None, waiter: _Waiter | None) -> None:
+        self._scheduler = scheduler
+        self._caller_id = caller_id
+        self._waiter = waiter
+        self._released = False
+
+    async def __aenter__(self) -> None:
+        if self._waiter is None:
+            return
+        try:
+            await self._waiter.future
+        except asyncio.CancelledError:
+            self.discard()
+            raise
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.discard()
+
+    def discard(self) -> None:
+        """Give the reservation back, whether or not the slot was granted yet."""
+        if self._released:
+            return
+        self._released = True
+        if self._waiter is not None and (not self._waiter.future.done() or self._waiter.future.cancelled()):
+            self._waiter.future.cancel()
+            self._scheduler._discard_waiter(self._waiter)
+            return
+        self._scheduler._release(self._caller_id)
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, AsyncIterable, Protocol
 
 from elkar.a2a_types import (
@@ -25,6 +25,8 @@ from elkar.a2a_types import (
 class RequestContext:
     caller_id: str | None
     metadata: dict[str, Any]
+    trace_headers: dict[str, str] = field(default_factory=dict)
+    """Trace context of the request (e.g. `traceparent`), when tracing is enabled."""
 
 
 class TaskManager(Protocol):
@@ -73,3 +75,7 @@ class TaskManager(Protocol):
         request: TaskResubscriptionRequest,
         request_context: RequestContext | None = None,
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse: ...
+
+    async def shutdown(self, timeout: float | None = None) -> None:
+        """Called when the server stops. Task managers running background work should drain it here."""
+        return None
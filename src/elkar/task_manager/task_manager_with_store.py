@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import uuid
 from dataclasses import dataclass
@@ -13,6 +12,7 @@ from typing import (
 from elkar.a2a_errors import (
     InternalError,
     PushNotificationNotSupportedError,
+    ResourceUnavailableError,
     TaskNotFoundError,
 )
 from elkar.a2a_types import (
@@ -43,15 +43,21 @@ from elkar.a2a_types import (
 )
 from elkar.common import ListTasksRequest, PaginatedResponse
 from elkar.json_rpc import JSONRPCError
+from elkar.metrics import HANDLERS_IN_FLIGHT
+from elkar.profiling import stage
+from elkar.push_notification.sender import PushNotificationSender
 from elkar.store.base import (
     StoredTask,
     TaskManagerStore,
     UpdateTaskParams,
 )
 from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.handler_registry import HandlerRegistry
+from elkar.task_manager.scheduler import Reservation, TaskScheduler
 from elkar.task_manager.task_manager_base import RequestContext, TaskManager
 from elkar.task_queue.base import TaskEvent, TaskEventManager
 from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+from elkar.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -84,18 +90,27 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
             ]
             | None
         ) = None,
+        scheduler: TaskScheduler | None = None,
+        push_notification_sender: PushNotificationSender | None = None,
     ):
         self.store = store or InMemoryTaskManagerStore()
         self.queue = queue or InMemoryTaskEventQueue()
         self.agent_card = agent_card
         self._send_task_handler = send_task_handler
         self._send_task_streaming_handler = send_task_streaming_handler
+        self.scheduler = scheduler or TaskScheduler()
+        self.handlers = HandlerRegistry()
+        self.push_notification_sender = push_notification_sender
 
     async def get_agent_card(self) -> AgentCard:
         return self.agent_card
 
     async def get_task(self, request: GetTaskRequest, request_context: RequestContext | None = None) -> GetTaskResponse:
-        stored_task = await self.store.get_task(request.params.id)
+        with stage("store"):
+            stored_task = await self.store.get_task(
+                request.params.id,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
         if stored_task is None:
             return GetTaskResponse(
                 result=None,
@@ -111,7 +126,11 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
     async def cancel_task(
         self, request: CancelTaskRequest, request_context: RequestContext | None = None
     ) -> CancelTaskResponse:
-        stored_task = await self.store.get_task(request.params.id)
+        with stage("store"):
+            stored_task = await self.store.get_task(
+                request.params.id,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
         if stored_task is None:
             return CancelTaskResponse(
                 result=None,
@@ -124,17 +143,26 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                 error=error,
             )
         caller_id = request_context.caller_id if request_context is not None else None
-        await self.store.update_task(
+        status = TaskStatus(
+            state=TaskState.CANCELED,
+            message=None,
+            timestamp=datetime.now(),
+        )
+        await self._update_task(
             request.params.id,
             UpdateTaskParams(
-                status=TaskStatus(
-                    state=TaskState.CANCELED,
-                    message=None,
-                    timestamp=datetime.now(),
-                ),
+                status=status,
                 caller_id=caller_id,
             ),
         )
+        # Only the subscribers of a streaming handler wait for the final event.
+        streaming = self.handlers.is_streaming(request.params.id, caller_id)
+        if self.handlers.cancel(request.params.id, caller_id) and streaming:
+            await self._enqueue(
+                task_id=request.params.id,
+                event=TaskStatusUpdateEvent(id=request.params.id, status=status, final=True),
+                caller_id=caller_id,
+            )
         return CancelTaskResponse()
 
     async def send_task(
@@ -143,27 +171,42 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
         if self._send_task_handler is None:
             raise ValueError("send_task_handler is not set")
         params = request.params
+        reservation = self.scheduler.reserve(request_context)
+        if reservation is None:
+            return SendTaskResponse(id=request.id, result=None, error=ResourceUnavailableError())
 
-        stored_task = await self.store.upsert_task(
-            params,
-            caller_id=(request_context.caller_id if request_context is not None else None),
-            is_streaming=False,
-        )
         try:
-            task_response = await self._send_task_handler(stored_task.task, request_context, self.store)
-
-            updated_task = await self.store.update_task(
-                stored_task.id,
-                UpdateTaskParams(
-                    status=task_response.status,
-                    artifacts_updates=task_response.new_artifacts,
-                    new_messages=task_response.new_history_messages,
-                    metadata=task_response.metadata,
+            with span("a2a.store.upsert_task"), stage("store"):
+                stored_task = await self.store.upsert_task(
+                    params,
                     caller_id=(request_context.caller_id if request_context is not None else None),
-                ),
+                    is_streaming=False,
+                )
+        except BaseException:
+            reservation.discard()
+            raise
+        caller_id = request_context.caller_id if request_context is not None else None
+        try:
+            task_response = await self.handlers.run(
+                params.id, caller_id, self._send_task(stored_task.task, reservation, request_context)
             )
+            if task_response is None:
+                # Canceled by cancel_task or at shutdown: the task is returned as it is stored.
+                canceled_task = await self.store.get_task(stored_task.id, caller_id=caller_id)
+                updated_task = canceled_task if canceled_task is not None else stored_task
+            else:
+                updated_task = await self._update_task(
+                    stored_task.id,
+                    UpdateTaskParams(
+                        status=task_response.status,
+                        artifacts_updates=task_response.new_artifacts,
+                        new_messages=task_response.new_history_messages,
+                        metadata=task_response.metadata,
+                        caller_id=caller_id,
+                    ),
+                )
         except Exception as e:
-            await self.store.update_task(
+            await self._update_task(
                 stored_task.id,
                 UpdateTaskParams(
                     status=TaskStatus(
@@ -171,9 +214,13 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                         message=Message(role="agent", parts=[TextPart(text="Internal error")]),
                         timestamp=datetime.now(),
                     ),
+                    caller_id=(request_context.caller_id if request_context is not None else None),
                 ),
             )
             raise e
+        finally:
+            # A handler canceled before it starts never enters the reservation.
+            reservation.discard()
         return SendTaskResponse(
             jsonrpc="2.0",
             id=None,
@@ -181,79 +228,104 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
             error=None,
         )
 
+    async def _send_task(
+        self, task: Task, reservation: Reservation, request_context: RequestContext | None
+    ) -> TaskSendOutput:
+        if self._send_task_handler is None:
+            raise ValueError("send_task_handler is not set")
+        async with reservation:
+            with span("a2a.handler"), HANDLERS_IN_FLIGHT.labels().track(), stage("handler"):
+                return await self._send_task_handler(task, request_context, self.store)
+
     async def _send_task_streaming(
         self,
         request: SendTaskStreamingRequest,
+        reservation: Reservation,
         request_context: RequestContext | None = None,
     ) -> None:
+        async with reservation:
+            await self._run_send_task_streaming(request, request_context)
+
+    async def _run_send_task_streaming(
+        self,
+        request: SendTaskStreamingRequest,
+        request_context: RequestContext | None = None,
+    ) -> None:
+        caller_id = request_context.caller_id if request_context is not None else None
+        stored_task: StoredTask | None = None
         try:
             """
             The protocol defines this method to return an AsyncIterable.
             We implement it as an async iterator function that yields responses.
             """
-            caller_id = request_context.caller_id if request_context is not None else None
-
             if self._send_task_streaming_handler is None:
                 raise ValueError("send_task_streaming_handler is not set")
 
             # Convert the awaitable AsyncIterable to an actual AsyncIterable
-            stored_task = await self.store.upsert_task(request.params, is_streaming=True)
+            with span("a2a.store.upsert_task"), stage("store"):
+                stored_task = await self.store.upsert_task(request.params, is_streaming=True, caller_id=caller_id)
 
             current_task = stored_task.task
-            async for response in self._send_task_streaming_handler(current_task, request_context, self.store):
-                if isinstance(response.result, TaskStatusUpdateEvent):
-                    message = response.result.status.message
-                    await self.store.update_task(
-                        stored_task.id,
-                        UpdateTaskParams(
-                            status=response.result.status,
-                            artifacts_updates=None,
-                            new_messages=[message] if message is not None else None,
+            # The span of the handler includes the store updates and enqueues, recorded as child spans.
+            with span("a2a.handler"), HANDLERS_IN_FLIGHT.labels().track(), stage("handler"):
+                async for response in self._send_task_streaming_handler(current_task, request_context, self.store):
+                    if isinstance(response.result, TaskStatusUpdateEvent):
+                        message = response.result.status.message
+                        await self._update_task(
+                            stored_task.id,
+                            UpdateTaskParams(
+                                status=response.result.status,
+                                artifacts_updates=None,
+                                new_messages=[message] if message is not None else None,
+                                caller_id=caller_id,
+                            ),
+                        )
+                        await self._enqueue(
+                            task_id=stored_task.id,
+                            event=response.result,
                             caller_id=caller_id,
-                        ),
-                    )
-                    await self.queue.enqueue(
-                        task_id=stored_task.id,
-                        event=response.result,
-                    )
-                    if response.result.final:
-                        break
-                elif isinstance(response.result, TaskArtifactUpdateEvent):
-                    await self.store.update_task(
-                        stored_task.id,
-                        UpdateTaskParams(
-                            status=None,
-                            artifacts_updates=[response.result.artifact],
+                        )
+                        if response.result.final:
+                            break
+                    elif isinstance(response.result, TaskArtifactUpdateEvent):
+                        await self._update_task(
+                            stored_task.id,
+                            UpdateTaskParams(
+                                status=None,
+                                artifacts_updates=[response.result.artifact],
+                                caller_id=caller_id,
+                            ),
+                        )
+                        await self._enqueue(
+                            task_id=stored_task.id,
+                            event=response.result,
                             caller_id=caller_id,
-                        ),
-                    )
-                    await self.queue.enqueue(
-                        task_id=stored_task.id,
-                        event=response.result,
-                    )
+                        )
 
-                if response.error is not None:
-                    logger.error(f"Task {stored_task.id} failed: {response.error.message}")
-                    await self.store.update_task(
-                        stored_task.id,
-                        UpdateTaskParams(
-                            status=TaskStatus(
-                                state=TaskState.FAILED,
-                                message=Message(
-                                    role="agent",
-                                    parts=[TextPart(text="Internal error")],
+                    if response.error is not None:
+                        logger.error(f"Task {stored_task.id} failed: {response.error.message}")
+                        await self._update_task(
+                            stored_task.id,
+                            UpdateTaskParams(
+                                status=TaskStatus(
+                                    state=TaskState.FAILED,
+                                    message=Message(
+                                        role="agent",
+                                        parts=[TextPart(text="Internal error")],
+                                    ),
+                                    timestamp=datetime.now(),
                                 ),
-                                timestamp=datetime.now(),
+                                caller_id=caller_id,
                             ),
-                        ),
-                    )
-                    await self.queue.enqueue(task_id=stored_task.id, event=response.error)
-                    break
+                        )
+                        await self._enqueue(task_id=stored_task.id, event=response.error, caller_id=caller_id)
+                        break
         except Exception as e:
-            await self.queue.enqueue(
-                task_id=stored_task.id,
+            # The subscriber is waiting for a final event, even if the task could not be stored.
+            await self._enqueue(
+                task_id=request.params.id,
                 event=TaskStatusUpdateEvent(
-                    id=stored_task.id,
+                    id=request.params.id,
                     status=TaskStatus(
                         state=TaskState.FAILED,
                         message=Message(role="agent", parts=[TextPart(text="Internal error")]),
@@ -261,17 +333,20 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                     ),
                     final=True,
                 ),
+                caller_id=caller_id,
             )
-            await self.store.update_task(
-                stored_task.id,
-                UpdateTaskParams(
-                    status=TaskStatus(
-                        state=TaskState.FAILED,
-                        message=Message(role="agent", parts=[TextPart(text="Internal error")]),
-                        timestamp=datetime.now(),
-                    )
-                ),
-            )
+            if stored_task is not None:
+                await self._update_task(
+                    stored_task.id,
+                    UpdateTaskParams(
+                        status=TaskStatus(
+                            state=TaskState.FAILED,
+                            message=Message(role="agent", parts=[TextPart(text="Internal error")]),
+                            timestamp=datetime.now(),
+                        ),
+                        caller_id=caller_id,
+                    ),
+                )
             raise e
 
     async def send_task_streaming(
@@ -279,20 +354,33 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
         request: SendTaskStreamingRequest,
         request_context: RequestContext | None = None,
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        reservation = self.scheduler.reserve(request_context)
+        if reservation is None:
+            return JSONRPCResponse(id=request.id, error=ResourceUnavailableError())
         subscriber_identifier = str(uuid.uuid4())
-        await self.queue.add_subscriber(
-            request.params.id,
-            subscriber_identifier,
-            is_resubscribe=False,
-            caller_id=(request_context.caller_id if request_context is not None else None),
-        )
-
-        asyncio.create_task(self._send_task_streaming(request, request_context))
+        try:
+            await self.queue.add_subscriber(
+                request.params.id,
+                subscriber_identifier,
+                is_resubscribe=False,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
+            handler = self.handlers.spawn(
+                request.params.id,
+                request_context.caller_id if request_context is not None else None,
+                self._send_task_streaming(request, reservation, request_context),
+            )
+        except BaseException:
+            reservation.discard()
+            raise
+        # A handler canceled before it starts never enters the reservation.
+        handler.add_done_callback(lambda _: reservation.discard())
         try:
             events = await self.dequeue_task_events(
                 request.id,
                 request.params.id,
                 subscriber_identifier,
+                request_context.caller_id if request_context is not None else None,
             )
             return events
         except Exception as e:
@@ -310,7 +398,9 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
         if not self.agent_card.capabilities.pushNotifications:
             return SetTaskPushNotificationResponse(result=None, error=PushNotificationNotSupportedError())
         task_id = request.params.id
-        task = await self.store.get_task(task_id)
+        caller_id = request_context.caller_id if request_context is not None else None
+        with stage("store"):
+            task = await self.store.get_task(task_id, caller_id=caller_id)
         if task is None:
             return SetTaskPushNotificationResponse(
                 result=None,
@@ -322,10 +412,11 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                 result=None,
                 error=error,
             )
-        stored_task = await self.store.update_task(
+        stored_task = await self._update_task(
             task_id,
             UpdateTaskParams(
                 push_notification=request.params.pushNotificationConfig,
+                caller_id=caller_id,
             ),
         )
         if stored_task.push_notification is None:
@@ -346,7 +437,9 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
         request_context: RequestContext | None = None,
     ) -> GetTaskPushNotificationResponse:
         task_id = request.params.id
-        task = await self.store.get_task(task_id)
+        caller_id = request_context.caller_id if request_context is not None else None
+        with stage("store"):
+            task = await self.store.get_task(task_id, caller_id=caller_id)
         if task is None:
             return GetTaskPushNotificationResponse(
                 result=None,
@@ -382,6 +475,7 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                 request.id,
                 task_id_params.id,
                 subscriber_identifier,
+                request_context.caller_id if request_context is not None else None,
             )
         except Exception as e:
             logger.error(f"Error while reconnecting to SSE stream: {e}")
@@ -390,6 +484,22 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                 error=InternalError(message=f"An error occurred while reconnecting to stream: {e}"),
             )
 
+    async def shutdown(self, timeout: float | None = None) -> None:
+        await self.handlers.shutdown(timeout)
+        if self.push_notification_sender is not None:
+            await self.push_notification_sender.close()
+
+    async def _update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
+        with span("a2a.store.update_task"), stage("store"):
+            stored_task = await self.store.update_task(task_id, params)
+        if self.push_notification_sender is not None and params.status is not None:
+            self.push_notification_sender.notify(stored_task)
+        return stored_task
+
+    async def _enqueue(self, task_id: str, event: TaskEvent, caller_id: str | None = None) -> None:
+        with span("a2a.queue.enqueue"):
+            await self.queue.enqueue(task_id, event, caller_id=caller_id)
+
     @staticmethod
     def _check_caller_id(task: StoredTask, request_context: RequestContext | None) -> TaskNotFoundError | None:
         if request_context is not None:
@@ -398,21 +508,29 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
         return None
 
     async def dequeue_task_events(
-        self, request_id: int | str | None, task_id: str, subscriber_identifier: str
+        self,
+        request_id: int | str | None,
+        task_id: str,
+        subscriber_identifier: str,
+        caller_id: str | None = None,
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
         try:
-            return self.try_dequeue_task_events(request_id, task_id, subscriber_identifier)
+            return self.try_dequeue_task_events(request_id, task_id, subscriber_identifier, caller_id)
 
         except Exception as e:
             return JSONRPCResponse(id=request_id, error=InternalError(message=str(e)))
 
     async def try_dequeue_task_events(
-        self, request_id: str | int | None, task_id: str, subscriber_identifier: str
+        self,
+        request_id: str | int | None,
+        task_id: str,
+        subscriber_identifier: str,
+        caller_id: str | None = None,
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         while True:
-            event = await self.queue.dequeue(task_id, subscriber_identifier)
+            event = await self.queue.dequeue(task_id, subscriber_identifier, caller_id)
             if isinstance(event, JSONRPCError):
-                await self.queue.remove_subscriber(task_id, subscriber_identifier)
+                await self.queue.remove_subscriber(task_id, subscriber_identifier, caller_id)
                 yield SendTaskStreamingResponse(
                     jsonrpc="2.0",
                     id=request_id,
@@ -428,7 +546,7 @@ class TaskManagerWithStore[T: TaskManagerStore, Q: TaskEventManager](TaskManager
                     error=None,
                 )
                 if event.final:
-                    await self.queue.remove_subscriber(task_id, subscriber_identifier)
+                    await self.queue.remove_subscriber(task_id, subscriber_identifier, caller_id)
                     break
             if isinstance(event, TaskArtifactUpdateEvent):
                 yield SendTaskStreamingResponse(
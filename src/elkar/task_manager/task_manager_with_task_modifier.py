@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import uuid
 from abc import abstractmethod
@@ -16,6 +15,7 @@ from elkar.a2a_errors import (
     InternalError,
     InvalidTaskStateError,
     PushNotificationNotSupportedError,
+    ResourceUnavailableError,
     TaskNotCancelableError,
     TaskNotFoundError,
 )
@@ -46,13 +46,21 @@ from elkar.a2a_types import (
     TaskStatusUpdateEvent,
     TextPart,
 )
+from elkar.blob_store.base import BlobStore
 from elkar.json_rpc import JSONRPCError
+from elkar.metrics import HANDLERS_IN_FLIGHT
+from elkar.profiling import stage
+from elkar.push_notification.sender import PushNotificationSender
 from elkar.store.base import StoredTask, TaskManagerStore, UpdateTaskParams
 from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.handler_registry import HandlerRegistry
+from elkar.task_manager.scheduler import Reservation, TaskScheduler
 from elkar.task_manager.task_manager_base import RequestContext, TaskManager
+from elkar.task_modifier.executor import ExecutorHandler
 from elkar.task_modifier.task_modifier import TaskModifier
 from elkar.task_queue.base import TaskEventManager
 from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+from elkar.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -72,17 +80,30 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         store: Optional[S] = None,
         queue: Optional[Q] = None,
         send_task_handler: Callable[..., Awaitable[None]] | None = None,
+        scheduler: TaskScheduler | None = None,
+        push_notification_sender: PushNotificationSender | None = None,
+        blob_store: BlobStore | None = None,
+        blob_min_size: int = 64 * 1024,
     ):
         self.agent_card = agent_card
         self._send_task_handler = send_task_handler
         self.store: S = store or InMemoryTaskManagerStore()  # type: ignore
         self.queue: Q = queue or InMemoryTaskEventQueue()  # type: ignore
+        self.scheduler = scheduler or TaskScheduler()
+        self.handlers = HandlerRegistry()
+        self.push_notification_sender = push_notification_sender
+        self.blob_store = blob_store
+        self.blob_min_size = blob_min_size
 
     async def get_agent_card(self) -> AgentCard:
         return self.agent_card
 
     async def get_task(self, request: GetTaskRequest, request_context: RequestContext | None = None) -> GetTaskResponse:
-        stored_task = await self.store.get_task(request.params.id)
+        with stage("store"):
+            stored_task = await self.store.get_task(
+                request.params.id,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
         if stored_task is None:
             return GetTaskResponse(
                 result=None,
@@ -98,7 +119,11 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
     async def cancel_task(
         self, request: CancelTaskRequest, request_context: RequestContext | None = None
     ) -> CancelTaskResponse:
-        stored_task = await self.store.get_task(request.params.id)
+        with stage("store"):
+            stored_task = await self.store.get_task(
+                request.params.id,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
         if stored_task is None:
             return CancelTaskResponse(result=None, error=TaskNotFoundError())
 
@@ -115,17 +140,27 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         ]:
             return CancelTaskResponse(result=None, error=TaskNotCancelableError())
         caller_id = request_context.caller_id if request_context is not None else None
-        await self.store.update_task(
+        status = TaskStatus(
+            state=TaskState.CANCELED,
+            message=None,
+            timestamp=datetime.now(),
+        )
+        await self._update_task(
             request.params.id,
             UpdateTaskParams(
-                status=TaskStatus(
-                    state=TaskState.CANCELED,
-                    message=None,
-                    timestamp=datetime.now(),
-                ),
+                status=status,
                 caller_id=caller_id,
             ),
         )
+        # Only the subscribers of a streaming handler wait for the final event.
+        streaming = self.handlers.is_streaming(request.params.id, caller_id)
+        if self.handlers.cancel(request.params.id, caller_id) and streaming:
+            with span("a2a.queue.enqueue"):
+                await self.queue.enqueue(
+                    request.params.id,
+                    TaskStatusUpdateEvent(id=request.params.id, status=status, final=True),
+                    caller_id=caller_id,
+                )
         return CancelTaskResponse()
 
     async def _prepare_task_modifier(
@@ -138,7 +173,11 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         if self._send_task_handler is None:
             raise ValueError("send_task_handler is not set")
 
-        stored_task = await self.store.get_task(params.id)
+        with stage("store"):
+            stored_task = await self.store.get_task(
+                params.id,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
 
         if stored_task is not None and self._check_caller_id(stored_task, request_context) is not None:
             return SendTaskResponse(
@@ -151,16 +190,21 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
                 error=InvalidTaskStateError(),
             )
         elif stored_task is None:
-            stored_task = await self.store.upsert_task(
-                params,
-                caller_id=(request_context.caller_id if request_context is not None else None),
-                is_streaming=is_streaming,
-            )
+            with span("a2a.store.upsert_task"), stage("store"):
+                stored_task = await self.store.upsert_task(
+                    params,
+                    caller_id=(request_context.caller_id if request_context is not None else None),
+                    is_streaming=is_streaming,
+                )
         task_modifier: TaskModifier[S, Q] = TaskModifier(
             task=stored_task.task,
+            send_params=params,
             store=self.store,
             queue=self.queue if with_queue else None,
             caller_id=(request_context.caller_id if request_context is not None else None),
+            push_notification_sender=self.push_notification_sender,
+            blob_store=self.blob_store,
+            blob_min_size=self.blob_min_size,
         )
 
         return task_modifier
@@ -171,12 +215,24 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         if self._send_task_handler is None:
             raise ValueError("send_task_handler is not set")
         params = request.params
-        task_modifier = await self._prepare_task_modifier(params, request_context, with_queue=False)
+        reservation = self.scheduler.reserve(request_context)
+        if reservation is None:
+            return SendTaskResponse(id=request.id, result=None, error=ResourceUnavailableError())
+        try:
+            task_modifier = await self._prepare_task_modifier(params, request_context, with_queue=False)
+        except BaseException:
+            reservation.discard()
+            raise
         if isinstance(task_modifier, SendTaskResponse):
+            reservation.discard()
             return task_modifier
 
         try:
-            await self._send_task_handler(task_modifier, request_context)
+            await self.handlers.run(
+                params.id,
+                request_context.caller_id if request_context is not None else None,
+                self._send_task(task_modifier, reservation, request_context),
+            )
         except Exception as e:
             await task_modifier.set_status(
                 TaskStatus(
@@ -186,8 +242,15 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
                 ),
             )
             raise e
+        finally:
+            # A handler canceled before it starts never enters the reservation.
+            reservation.discard()
 
-        stored_task = await self.store.get_task(params.id)
+        with stage("store"):
+            stored_task = await self.store.get_task(
+                params.id,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
         if stored_task is None:
             return SendTaskResponse(
                 result=None,
@@ -200,15 +263,30 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
             error=None,
         )
 
+    async def _send_task(
+        self,
+        task_modifier: TaskModifier[S, Q],
+        reservation: Reservation,
+        request_context: RequestContext | None,
+    ) -> None:
+        if self._send_task_handler is None:
+            raise ValueError("send_task_handler is not set")
+        async with reservation:
+            with span("a2a.handler"), HANDLERS_IN_FLIGHT.labels().track(), stage("handler"):
+                await self._send_task_handler(task_modifier, request_context)
+
     async def _send_task_streaming(
         self,
         task_modifier: TaskModifier[S, Q],
+        reservation: Reservation,
         request_context: RequestContext | None = None,
     ) -> None:
         if self._send_task_handler is None:
             raise ValueError("send_task_handler is not set")
         try:
-            await self._send_task_handler(task_modifier, request_context)
+            async with reservation:
+                with span("a2a.handler"), HANDLERS_IN_FLIGHT.labels().track(), stage("handler"):
+                    await self._send_task_handler(task_modifier, request_context)
         except Exception as e:
             await task_modifier.set_status(
                 TaskStatus(
@@ -230,17 +308,30 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
         subscriber_identifier = str(uuid.uuid4())
         params = request.params
-        task_modifier = await self._prepare_task_modifier(params, request_context, with_queue=True)
-
-        await self.queue.add_subscriber(
-            request.params.id,
-            subscriber_identifier,
-            is_resubscribe=False,
-            caller_id=(request_context.caller_id if request_context is not None else None),
-        )
-        if isinstance(task_modifier, SendTaskResponse):
-            return task_modifier
-        asyncio.create_task(self._send_task_streaming(task_modifier, request_context))
+        reservation = self.scheduler.reserve(request_context)
+        if reservation is None:
+            return JSONRPCResponse(id=request.id, error=ResourceUnavailableError())
+        try:
+            task_modifier = await self._prepare_task_modifier(params, request_context, with_queue=True)
+            if isinstance(task_modifier, SendTaskResponse):
+                reservation.discard()
+                return task_modifier
+            await self.queue.add_subscriber(
+                request.params.id,
+                subscriber_identifier,
+                is_resubscribe=False,
+                caller_id=(request_context.caller_id if request_context is not None else None),
+            )
+            handler = self.handlers.spawn(
+                params.id,
+                request_context.caller_id if request_context is not None else None,
+                self._send_task_streaming(task_modifier, reservation, request_context),
+            )
+        except BaseException:
+            reservation.discard()
+            raise
+        # A handler canceled before it starts never enters the reservation.
+        handler.add_done_callback(lambda _: reservation.discard())
         try:
             events = await self.dequeue_task_events(
                 request.id,
@@ -264,7 +355,9 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         if not self.agent_card.capabilities.pushNotifications:
             return SetTaskPushNotificationResponse(result=None, error=PushNotificationNotSupportedError())
         task_id = request.params.id
-        task = await self.store.get_task(task_id)
+        caller_id = request_context.caller_id if request_context is not None else None
+        with stage("store"):
+            task = await self.store.get_task(task_id, caller_id=caller_id)
         if task is None:
             return SetTaskPushNotificationResponse(
                 result=None,
@@ -274,9 +367,9 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         if error is not None:
             return SetTaskPushNotificationResponse(result=None, error=error)
 
-        stored_task = await self.store.update_task(
+        stored_task = await self._update_task(
             task_id,
-            UpdateTaskParams(push_notification=request.params.pushNotificationConfig),
+            UpdateTaskParams(push_notification=request.params.pushNotificationConfig, caller_id=caller_id),
         )
         if stored_task.push_notification is None:
             return SetTaskPushNotificationResponse(
@@ -296,7 +389,9 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
         request_context: RequestContext | None = None,
     ) -> GetTaskPushNotificationResponse:
         task_id = request.params.id
-        task = await self.store.get_task(task_id)
+        caller_id = request_context.caller_id if request_context is not None else None
+        with stage("store"):
+            task = await self.store.get_task(task_id, caller_id=caller_id)
         if task is None:
             return GetTaskPushNotificationResponse(
                 result=None,
@@ -341,6 +436,20 @@ class TaskManagerWithModifier[S: TaskManagerStore, Q: TaskEventManager](TaskMana
                 error=InternalError(message=f"An error occurred while reconnecting to stream: {e}"),
             )
 
+    async def shutdown(self, timeout: float | None = None) -> None:
+        await self.handlers.shutdown(timeout)
+        if isinstance(self._send_task_handler, ExecutorHandler):
+            await self._send_task_handler.close()
+        if self.push_notification_sender is not None:
+            await self.push_notification_sender.close()
+
+    async def _update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
+        with span("a2a.store.update_task"), stage("store"):
+            stored_task = await self.store.update_task(task_id, params)
+        if self.push_notification_sender is not None and params.status is not None:
+            self.push_notification_sender.notify(stored_task)
+        return stored_task
+
     @staticmethod
     def _check_caller_id(task: StoredTask, request_context: RequestContext | None) -> TaskNotFoundError | None:
         if request_context is not None:
@@ -1,4 +1,30 @@
-from .base import TaskModifierBase
-from .task_modifier import TaskModifier
+from typing import TYPE_CHECKING
 
-__all__ = ["TaskModifier", "TaskModifierBase"]
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .artifact_stream import ArtifactStream
+    from .base import TaskModifierBase
+    from .executor import ExecutorHandler, SyncTaskModifier, executor_handler
+    from .task_modifier import TaskModifier
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "ArtifactStream": ".artifact_stream",
+        "TaskModifierBase": ".base",
+        "ExecutorHandler": ".executor",
+        "SyncTaskModifier": ".executor",
+        "executor_handler": ".executor",
+        "TaskModifier": ".task_modifier",
+    },
+)
+
+__all__ = [
+    "ArtifactStream",
+    "ExecutorHandler",
+    "TaskModifier",
+    "TaskModifierBase",
+    "SyncTaskModifier",
+    "executor_handler",
+]
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from types import TracebackType
+from typing import Any
+
+from elkar.a2a_types import Artifact, TextPart
+from elkar.task_modifier.base import TaskModifierBase
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactStream:
+    """
+    Writes a text artifact from a stream of deltas (e.g. LLM tokens).
+
+    Deltas are coalesced into artifact chunks instead of producing one artifact per token:
+    - the first delta is sent immediately, to keep the time to first token low;
+    - a delta arriving more than `max_delay` seconds after the previous chunk is sent immediately;
+    - otherwise deltas are buffered until `max_delay` seconds have passed or `max_chars`
+      characters are buffered.
+
+    The first chunk creates the artifact, the following ones are sent with `append=True`
+    and `close` sends the remaining text with `lastChunk=True`. The text of a chunk that
+    fails to be sent is kept for the next one.
+
+    Usage:
+        async with task_modifier.artifact_stream(index=0, name="answer") as stream:
+            async for token in llm_tokens:
+                await stream.write(token)
+    """
+
+    def __init__(
+        self,
+        task_modifier: TaskModifierBase,
+        index: int = 0,
+        name: str | None = None,
+        description: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        max_delay: float = 0.05,
+        max_chars: int = 1024,
+    ) -> None:
+        self._task_modifier = task_modifier
+        self.index = index
+        self.name = name
+        self.description = description
+        self.metadata = metadata
+        self.max_delay = max_delay
+        self.max_chars = max_chars
+        self._buffer: list[str] = []
+        self._buffered_chars = 0
+        self._chunks_sent = 0
+        self._last_flush = 0.0
+        self._closed = False
+        self._lock = asyncio.Lock()
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._timed_flush: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "ArtifactStream":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def write(self, text: str) -> None:
+        if self._closed:
+            raise ValueError(f"Artifact stream {self.index} is closed")
+        if not text:
+            return
+        self._buffer.append(text)
+        self._buffered_chars += len(text)
+        since_last_flush = time.monotonic() - self._last_flush
+        if self._chunks_sent == 0 or self._buffered_chars >= self.max_chars or since_last_flush >= self.max_delay:
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                self.max_delay - since_last_flush, self._flush_later
+            )
+
+    async def flush(self) -> None:
+        """Send the buffered text as an artifact chunk."""
+        await self._send(last_chunk=False)
+
+    async def close(self) -> None:
+        """Send the remaining text and mark the artifact as complete."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._send(last_chunk=True)
+        except BaseException:
+            # The remaining text is kept: closing again sends it.
+            self._closed = False
+            raise
+
+    async def _send(self, last_chunk: bool) -> None:
+        async with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._buffer and not last_chunk:
+                return
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._buffered_chars = 0
+            artifact = Artifact(
+                name=self.name,
+                description=self.description,
+                parts=[TextPart(text=text)] if text else [],
+                metadata=self.metadata,
+                index=self.index,
+                append=self._chunks_sent > 0,
+                lastChunk=last_chunk,
+            )
+            try:
+                await self._task_modifier.upsert_artifacts([artifact])
+            except BaseException:
+                # Put the text back, before the deltas written in the meantime.
+                if text:
+                    self._buffer.insert(0, text)
+                    self._buffered_chars += len(text)
+                raise
+            self._chunks_sent += 1
+            self._last_flush = time.monotonic()
+
+    def _flush_later(self) -> None:
+        self._flush_timer = None
+        self._timed_flush = asyncio.create_task(self.flush())
+        self._timed_flush.add_done_callback(self._timed_flush_done)
+
+    def _timed_flush_done(self, flush: asyncio.Task[None]) -> None:
+        # Nobody awaits the timed flush: its error is logged, and its text is back in the
+        # buffer for the next flush.
+        if not flush.cancelled() and flush.exception() is not None:
+            logger.error(f"Error while flushing artifact stream {self.index}: {flush.exception()}")
@@ -0,0 +1,221 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing.managers import SyncManager
+from queue import Empty
+from typing import Any, Callable, Coroutine, Protocol
+
+from elkar.a2a_types import Artifact, Message, Task, TaskSendParams, TaskStatus
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_modifier.base import TaskModifierBase
+
+_QUEUE_POLL_INTERVAL = 0.1
+
+
+class _Event(Protocol):
+    def is_set(self) -> bool: ...
+    def set(self) -> None: ...
+
+
+class SyncTaskModifier(Protocol):
+    """
+    Synchronous counterpart of `TaskModifierBase`, given to handlers running in an executor.
+
+    Every call is forwarded to the task modifier living on the event loop. Once the task is
+    canceled, calls raise `asyncio.CancelledError` so that the handler stops cooperatively;
+    long computations can also poll `is_canceled`.
+    """
+
+    def get_send_params(self) -> TaskSendParams | None: ...
+    def get_task(self, from_store: bool = False) -> Task: ...
+    def set_status(self, status: TaskStatus, is_final: bool = False) -> None: ...
+    def add_messages_to_history(self, messages: list[Message]) -> None: ...
+    def upsert_artifacts(self, artifacts: list[Artifact]) -> None: ...
+    def is_canceled(self) -> bool: ...
+
+
+SyncSendTaskHandler = Callable[[SyncTaskModifier, RequestContext | None], None]
+
+
+class _LoopTaskModifier:
+    """Used from a worker thread: calls are run on the event loop and waited for."""
+
+    def __init__(
+        self,
+        task_modifier: TaskModifierBase,
+        send_params: TaskSendParams | None,
+        loop: asyncio.AbstractEventLoop,
+        cancel_event: _Event,
+    ) -> None:
+        self._task_modifier = task_modifier
+        self._send_params = send_params
+        self._loop = loop
+        self._cancel_event = cancel_event
+
+    def _call(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        if self._cancel_event.is_set():
+            coroutine.close()
+            raise asyncio.CancelledError()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get_send_params(self) -> TaskSendParams | None:
+        return self._send_params
+
+    def get_task(self, from_store: bool = False) -> Task:
+        task: Task = self._call(self._task_modifier.get_task(from_store=from_store))
+        return task
+
+    def set_status(self, status: TaskStatus, is_final: bool = False) -> None:
+        self._call(self._task_modifier.set_status(status, is_final=is_final))
+
+    def add_messages_to_history(self, messages: list[Message]) -> None:
+        self._call(self._task_modifier.add_messages_to_history(messages))
+
+    def upsert_artifacts(self, artifacts: list[Artifact]) -> None:
+        self._call(self._task_modifier.upsert_artifacts(artifacts))
+
+    def is_canceled(self) -> bool:
+        return self._cancel_event.is_set()
+
+
+class _QueuedTaskModifier:
+    """
+    Used from a worker process: calls are sent over a queue and applied in order by the
+    event loop. The task returned by `get_task` is the snapshot taken when the handler started.
+    """
+
+    def __init__(self, queue: Any, task: Task, send_params: TaskSendParams | None, cancel_event: _Event) -> None:
+        self._queue = queue
+        self._task = task
+        self._send_params = send_params
+        self._cancel_event = cancel_event
+
+    def _send(self, method: str, *args: Any) -> None:
+        if self._cancel_event.is_set():
+            raise asyncio.CancelledError()
+        self._queue.put((method, args))
+
+    def get_send_params(self) -> TaskSendParams | None:
+        return self._send_params
+
+    def get_task(self, from_store: bool = False) -> Task:
+        return self._task
+
+    def set_status(self, status: TaskStatus, is_final: bool = False) -> None:
+        self._send("set_status", status, is_final)
+
+    def add_messages_to_history(self, messages: list[Message]) -> None:
+        self._send("add_messages_to_history", messages)
+
+    def upsert_artifacts(self, artifacts: list[Artifact]) -> None:
+        self._send("upsert_artifacts", artifacts)
+
+    def is_canceled(self) -> bool:
+        return self._cancel_event.is_set()
+
+
+def _run_in_process(
+    handler: SyncSendTaskHandler,
+    queue: Any,
+    cancel_event: _Event,
+    task: Task,
+    send_params: TaskSendParams | None,
+    request_context: RequestContext | None,
+) -> None:
+    try:
+        handler(_QueuedTaskModifier(queue, task, send_params, cancel_event), request_context)
+    finally:
+        queue.put(None)
+
+
+def _get(queue: Any, stopped: threading.Event) -> Any:
+    """Wait for the next call of a worker process until `stopped` is set, so that no thread stays blocked."""
+    while not stopped.is_set():
+        try:
+            return queue.get(timeout=_QUEUE_POLL_INTERVAL)
+        except Empty:
+            continue
+    return None
+
+
+class ExecutorHandler:
+    """
+    Send task handler running a synchronous handler in an executor, see `executor_handler`.
+
+    With a `ProcessPoolExecutor`, the calls of the handler go through a `multiprocessing`
+    manager started on first use. `close` shuts it down; `TaskManagerWithModifier` calls it
+    once its handlers are done at shutdown.
+    """
+
+    def __init__(self, handler: SyncSendTaskHandler, executor: Executor | None = None) -> None:
+        self.handler = handler
+        self.executor = executor
+        self._manager: SyncManager | None = None
+
+    async def __call__(self, task_modifier: TaskModifierBase, request_context: RequestContext | None) -> None:
+        loop = asyncio.get_running_loop()
+        send_params = await task_modifier.get_send_params()
+
+        if not isinstance(self.executor, ProcessPoolExecutor):
+            cancel_event = threading.Event()
+            proxy = _LoopTaskModifier(task_modifier, send_params, loop, cancel_event)
+            try:
+                await loop.run_in_executor(self.executor, self.handler, proxy, request_context)
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+            return
+
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        queue = self._manager.Queue()
+        process_cancel_event = self._manager.Event()
+        stopped = threading.Event()
+        task = await task_modifier.get_task()
+        result = loop.run_in_executor(
+            self.executor,
+            _run_in_process,
+            self.handler,
+            queue,
+            process_cancel_event,
+            task,
+            send_params,
+            request_context,
+        )
+        try:
+            while True:
+                call = await loop.run_in_executor(None, _get, queue, stopped)
+                if call is None:
+                    break
+                method, args = call
+                await getattr(task_modifier, method)(*args)
+            await result
+        finally:
+            # Whether the handler returned, failed, was canceled or one of its calls failed here,
+            # the polling thread stops and the worker process is told to stop.
+            stopped.set()
+            process_cancel_event.set()
+
+    async def close(self) -> None:
+        """Shut down the manager of the worker processes, if it was started."""
+        manager, self._manager = self._manager, None
+        if manager is not None:
+            await asyncio.to_thread(manager.shutdown)
+
+
+def executor_handler(
+    handler: SyncSendTaskHandler,
+    executor: Executor | None = None,
+) -> ExecutorHandler:
+    """
+    Wrap a synchronous, CPU-bound send task handler so that it runs in an executor instead of
+    blocking the event loop. The returned coroutine function can be passed as
+    `send_task_handler` to `TaskManagerWithModifier`.
+
+    With a thread pool (or the loop's default executor when `executor` is None), every call
+    made by the handler on its `SyncTaskModifier` is run on the event loop and waited for.
+    With a `ProcessPoolExecutor`, the handler must be picklable (a module-level function);
+    its calls are sent back to the event loop over a queue and applied in order.
+    """
+    return ExecutorHandler(handler, executor)
@@ -1,19 +1,58 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from elkar.a2a_types import (
     Artifact,
     Message,
     Task,
     TaskArtifactUpdateEvent,
+    TaskEvent,
     TaskSendParams,
     TaskStatus,
     TaskStatusUpdateEvent,
 )
-from elkar.store.base import TaskManagerStore, UpdateTaskParams
-from elkar.store.in_memory import upsert_artifact
+from elkar.blob_store.base import BlobStore, externalize_artifact, externalize_message
+from elkar.profiling import stage
+from elkar.push_notification.sender import PushNotificationSender
+from elkar.store.background_writer import coalesce_updates
+from elkar.store.base import StoredTask, TaskManagerStore, UpdateTaskParams
+from elkar.store.task_version import TaskVersion
+from elkar.task_modifier.artifact_stream import ArtifactStream
 from elkar.task_modifier.base import TaskModifierBase
 from elkar.task_queue.base import TaskEventManager
+from elkar.tracing import span
+
+logger = logging.getLogger(__name__)
 
 
 class TaskModifier[S: TaskManagerStore, Q: TaskEventManager](TaskModifierBase):
+    """
+    Lets a handler update its task. Every change is written to the store and sent to the
+    queue subscribers.
+
+    The store is the only writer of the task: the modifier does not change its own copy but
+    keeps the stored task returned by the store after each update (with the in-memory store,
+    this is the stored version itself, whose task is only built when `get_task` reads it).
+    Without a store, the modifier applies the changes to its own `TaskVersion`.
+
+    By default each call is written immediately. Inside `async with modifier.batch():`
+    changes are buffered and written as one combined store update and one multi-event
+    enqueue when the block exits, when `max_batch_size` events or changes (statuses,
+    messages and artifact chunks) are pending, or `max_batch_delay` seconds after the first
+    pending change. A final status is always flushed immediately.
+    Buffered changes show up in `get_task` once they are flushed. When a flush fails, the
+    changes it did not write go back to the buffer for the next flush; the error is raised
+    by `flush`, or logged when the flush was the one run after `max_batch_delay`.
+
+    With a `push_notification_sender`, every status change written to the store is notified
+    to the push notification endpoint of the task, if it has one.
+
+    With a `blob_store`, file parts whose base64 content is at least `blob_min_size` characters
+    long are stored in it for the caller and replaced by their uri before being written or sent.
+    """
+
     def __init__(
         self,
         task: Task,
@@ -21,67 +60,171 @@ class TaskModifier[S: TaskManagerStore, Q: TaskEventManager](TaskModifierBase):
         store: S | None = None,
         queue: Q | None = None,
         caller_id: str | None = None,
+        max_batch_size: int = 64,
+        max_batch_delay: float | None = 0.05,
+        push_notification_sender: PushNotificationSender | None = None,
+        blob_store: BlobStore | None = None,
+        blob_min_size: int = 64 * 1024,
     ) -> None:
-        self._task = task
+        self._task_id = task.id
+        self._version = TaskVersion.of(task)
+        self._stored_task: StoredTask | None = None
         self._send_params = send_params
         self._store = store
         self._queue = queue
         self._caller_id = caller_id
+        self._max_batch_size = max_batch_size
+        self._max_batch_delay = max_batch_delay
+        self._push_notification_sender = push_notification_sender
+        self._blob_store = blob_store
+        self._blob_min_size = blob_min_size
+        self._batch_depth = 0
+        self._pending_updates: list[UpdateTaskParams] = []
+        self._pending_events: list[TaskEvent] = []
+        self._pending_changes = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._timed_flush: asyncio.Task[None] | None = None
 
     async def get_send_params(self) -> TaskSendParams | None:
         return self._send_params
 
     async def get_task(self, from_store: bool = False) -> Task:
         if from_store and self._store:
-            stored_task = await self._store.get_task(task_id=self._task.id, caller_id=self._caller_id)
+            await self.flush()
+            stored_task = await self._store.get_task(task_id=self._task_id, caller_id=self._caller_id)
             if stored_task is None:
                 raise ValueError("Task not found")
             return stored_task.task
-        return self._task
+        if self._stored_task is not None:
+            return self._stored_task.task
+        return self._version.task
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        """Buffer the changes made inside the block and write them together."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                await self.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered changes to the store and the queue."""
+        async with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            updates, self._pending_updates = coalesce_updates(self._pending_updates), []
+            events, self._pending_events = self._pending_events, []
+            self._pending_changes = 0
+            written = 0
+            try:
+                if self._store:
+                    for params in updates:
+                        await self._write(self._store, params)
+                        written += 1
+                if self._queue and events:
+                    with span("a2a.queue.enqueue"):
+                        await self._queue.enqueue_many(self._task_id, events, caller_id=self._caller_id)
+            except BaseException:
+                # Put back what was not written, before the changes buffered in the meantime.
+                self._pending_updates[:0] = updates[written:]
+                self._pending_events[:0] = events
+                self._pending_changes += sum(_change_count(params) for params in updates[written:])
+                raise
 
     async def set_status(self, status: TaskStatus, is_final: bool = False) -> None:
-        self._task.status = status
-        if self._store:
-            await self._store.update_task(
-                self._task.id,
-                params=UpdateTaskParams(status=status, caller_id=self._caller_id),
-            )
-        if self._queue:
-            await self._queue.enqueue(
-                self._task.id,
-                TaskStatusUpdateEvent(
-                    id=self._task.id,
-                    status=status,
-                    final=is_final,
-                ),
-                caller_id=self._caller_id,
-            )
+        if self._blob_store is not None and status.message is not None:
+            message = await externalize_message(status.message, self._blob_store, self._blob_min_size, self._caller_id)
+            status = status.model_copy(update={"message": message})
+        await self._apply(
+            UpdateTaskParams(status=status, caller_id=self._caller_id),
+            [TaskStatusUpdateEvent(id=self._task_id, status=status, final=is_final)],
+            force_flush=is_final,
+        )
 
     async def add_messages_to_history(self, messages: list[Message]) -> None:
-        if self._task.history is None:
-            self._task.history = []
-        self._task.history.extend(messages)
-        if self._store:
-            await self._store.update_task(
-                self._task.id,
-                params=UpdateTaskParams(new_messages=messages),
-            )
+        if self._blob_store is not None:
+            messages = [
+                await externalize_message(m, self._blob_store, self._blob_min_size, self._caller_id) for m in messages
+            ]
+        await self._apply(UpdateTaskParams(new_messages=messages, caller_id=self._caller_id), [])
 
     async def upsert_artifacts(self, artifacts: list[Artifact]) -> None:
-        for artifact in artifacts:
-            await upsert_artifact(self._task, artifact)
+        if self._blob_store is not None:
+            artifacts = [
+                await externalize_artifact(a, self._blob_store, self._blob_min_size, self._caller_id) for a in artifacts
+            ]
+        await self._apply(
+            UpdateTaskParams(artifacts_updates=artifacts, caller_id=self._caller_id),
+            [TaskArtifactUpdateEvent(id=self._task_id, artifact=artifact) for artifact in artifacts],
+        )
+
+    def artifact_stream(
+        self,
+        index: int = 0,
+        name: str | None = None,
+        description: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        max_delay: float = 0.05,
+        max_chars: int = 1024,
+    ) -> ArtifactStream:
+        """Stream a text artifact from deltas, coalescing them into chunks. See `ArtifactStream`."""
+        return ArtifactStream(
+            self,
+            index=index,
+            name=name,
+            description=description,
+            metadata=metadata,
+            max_delay=max_delay,
+            max_chars=max_chars,
+        )
+
+    async def _apply(self, params: UpdateTaskParams, events: list[TaskEvent], force_flush: bool = False) -> None:
+        if self._store is None:
+            self._version = self._version.apply(params)
+        if self._batch_depth == 0:
+            if self._store:
+                await self._write(self._store, params)
+            if self._queue:
+                with span("a2a.queue.enqueue"):
+                    for event in events:
+                        await self._queue.enqueue(self._task_id, event, caller_id=self._caller_id)
+            return
+
         if self._store:
-            await self._store.update_task(
-                self._task.id,
-                params=UpdateTaskParams(artifacts_updates=artifacts),
-            )
-        if self._queue:
-            for artifact in artifacts:
-                await self._queue.enqueue(
-                    self._task.id,
-                    TaskArtifactUpdateEvent(
-                        id=self._task.id,
-                        artifact=artifact,
-                    ),
-                    caller_id=self._caller_id,
-                )
+            self._pending_updates.append(params)
+            self._pending_changes += _change_count(params)
+        self._pending_events.extend(events)
+        if force_flush or max(len(self._pending_events), self._pending_changes) >= self._max_batch_size:
+            await self.flush()
+        elif self._flush_timer is None and self._max_batch_delay is not None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self._max_batch_delay, self._flush_later)
+
+    async def _write(self, store: S, params: UpdateTaskParams) -> None:
+        with span("a2a.store.update_task"), stage("store"):
+            stored_task = await store.update_task(self._task_id, params=params)
+        self._stored_task = stored_task
+        if self._push_notification_sender is not None and params.status is not None:
+            self._push_notification_sender.notify(stored_task)
+
+    def _flush_later(self) -> None:
+        self._flush_timer = None
+        self._timed_flush = asyncio.create_task(self.flush())
+        self._timed_flush.add_done_callback(self._timed_flush_done)
+
+    def _timed_flush_done(self, flush: asyncio.Task[None]) -> None:
+        # Nobody awaits the timed flush: its error is logged, and what it did not write is
+        # back in the buffer for the next flush.
+        if not flush.cancelled() and flush.exception() is not None:
+            logger.error(f"Error while flushing the updates of task {self._task_id}: {flush.exception()}")
+
+
+def _change_count(params: UpdateTaskParams) -> int:
+    count = len(params.new_messages or []) + len(params.artifacts_updates or [])
+    if params.status is not None:
+        count += 1
+    return max(count, 1)
@@ -1,5 +1,21 @@
-from .base import TaskEvent, TaskEventManager
-from .elkar_client_queue import ElkarClientTaskQueue
-from .in_memory import InMemoryTaskEventQueue
+from typing import TYPE_CHECKING
+
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import TaskEvent, TaskEventManager
+    from .elkar_client_queue import ElkarClientTaskQueue
+    from .in_memory import InMemoryTaskEventQueue
+
+# `ElkarClientTaskQueue` (and httpx) is only imported when first used.
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "TaskEvent": ".base",
+        "TaskEventManager": ".base",
+        "ElkarClientTaskQueue": ".elkar_client_queue",
+        "InMemoryTaskEventQueue": ".in_memory",
+    },
+)
 
 __all__ = ["TaskEvent", "TaskEventManager", "InMemoryTaskEventQueue", "ElkarClientTaskQueue"]
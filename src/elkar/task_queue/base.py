@@ -35,6 +35,16 @@ class TaskEventManager(Protocol):
         caller_id: str | None = None,
     ) -> None: ...
 
+    async def enqueue_many(
+        self,
+        task_id: str,
+        events: list[TaskEvent],
+        caller_id: str | None = None,
+    ) -> None:
+        """Enqueue several events at once, in order. Implementations should override this when they can batch."""
+        for event in events:
+            await self.enqueue(task_id, event, caller_id=caller_id)
+
     @abstractmethod
     async def dequeue(
         self,
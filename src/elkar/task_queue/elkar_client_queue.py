@@ -49,6 +49,15 @@ class ElkarClientTaskQueue:
         )
         return None
 
+    async def enqueue_many(
+        self,
+        task_id: str,
+        events: list[TaskEvent],
+        caller_id: str | None = None,
+    ) -> None:
+        for event in events:
+            await self.enqueue(task_id, event, caller_id=caller_id)
+
     async def dequeue(
         self,
         task_id: str,
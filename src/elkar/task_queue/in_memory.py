@@ -1,7 +1,9 @@
 import asyncio
 import logging
 from datetime import datetime
+from typing import Iterator
 
+from elkar.metrics import QUEUE_DEPTH, QUEUE_SUBSCRIBERS
 from elkar.task_queue.base import TaskEvent, TaskEventManager
 
 logger = logging.getLogger(__name__)
@@ -11,6 +13,19 @@ class InMemoryTaskEventQueue(TaskEventManager):
     def __init__(self) -> None:
         self.task_subscribers: dict[tuple[str, str | None], dict[str, asyncio.Queue[TaskEvent]]] = {}
         self.lock = asyncio.Lock()
+        QUEUE_DEPTH.add_source(self._queue_depth)
+        QUEUE_SUBSCRIBERS.add_source(self._queue_subscribers)
+
+    def _queue_depth(self) -> Iterator[tuple[tuple[()], float]]:
+        yield (
+            (),
+            sum(
+                queue.qsize() for subscribers in list(self.task_subscribers.values()) for queue in subscribers.values()
+            ),
+        )
+
+    def _queue_subscribers(self) -> Iterator[tuple[tuple[()], float]]:
+        yield (), sum(len(subscribers) for subscribers in list(self.task_subscribers.values()))
 
     async def add_subscriber(
         self,
@@ -23,7 +38,7 @@ class InMemoryTaskEventQueue(TaskEventManager):
             if is_resubscribe:
                 raise ValueError("Cannot resubscribe to a task that is not subscribed to")
             self.task_subscribers[(task_id, caller_id)] = {}
-            self.task_subscribers[(task_id, caller_id)][subscriber_identifier] = asyncio.Queue()
+        self.task_subscribers[(task_id, caller_id)][subscriber_identifier] = asyncio.Queue()
 
     async def remove_subscriber(self, task_id: str, subscriber_identifier: str, caller_id: str | None = None) -> None:
         if (task_id, caller_id) not in self.task_subscribers:
@@ -38,6 +53,13 @@ class InMemoryTaskEventQueue(TaskEventManager):
         for subscriber in self.task_subscribers[(task_id, caller_id)]:
             await self.task_subscribers[(task_id, caller_id)][subscriber].put(event)
 
+    async def enqueue_many(self, task_id: str, events: list[TaskEvent], caller_id: str | None = None) -> None:
+        if (task_id, caller_id) not in self.task_subscribers:
+            raise ValueError("Task not subscribed to")
+        for queue in self.task_subscribers[(task_id, caller_id)].values():
+            for event in events:
+                queue.put_nowait(event)
+
     async def dequeue(
         self,
         task_id: str,
@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING
+
+from elkar._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .conformance import (
+        CLIENT_SIDE_STORE_CHECKS,
+        QUEUE_CHECKS,
+        STORE_CHECKS,
+        CheckResult,
+        ConformanceError,
+        next_event,
+        run_checks,
+    )
+    from .performance import PerformanceResult, measure, measure_queue, measure_store
+    from .stub_server import ElkarStubServer
+
+# `ElkarStubServer` (and starlette) is only imported when first used.
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "STORE_CHECKS": ".conformance",
+        "CLIENT_SIDE_STORE_CHECKS": ".conformance",
+        "QUEUE_CHECKS": ".conformance",
+        "CheckResult": ".conformance",
+        "ConformanceError": ".conformance",
+        "next_event": ".conformance",
+        "run_checks": ".conformance",
+        "PerformanceResult": ".performance",
+        "measure": ".performance",
+        "measure_store": ".performance",
+        "measure_queue": ".performance",
+        "ElkarStubServer": ".stub_server",
+    },
+)
+
+__all__ = [
+    "STORE_CHECKS",
+    "CLIENT_SIDE_STORE_CHECKS",
+    "QUEUE_CHECKS",
+    "CheckResult",
+    "ConformanceError",
+    "next_event",
+    "run_checks",
+    "PerformanceResult",
+    "measure",
+    "measure_store",
+    "measure_queue",
+    "ElkarStubServer",
+]
@@ -0,0 +1,87 @@
+"""
+Run the conformance checks and performance measurements on the built-in backends, with the
+Elkar API backends talking to a local `ElkarStubServer`.
+
+Usage:
+    python -m elkar.testing [--operations 1000] [--concurrency 16] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from elkar.store.elkar_client_store import ElkarClientStore
+from elkar.store.in_memory import InMemoryClientSideTaskManagerStore, InMemoryTaskManagerStore
+from elkar.task_queue.elkar_client_queue import ElkarClientTaskQueue
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+from elkar.testing.conformance import CLIENT_SIDE_STORE_CHECKS, QUEUE_CHECKS, STORE_CHECKS, run_checks
+from elkar.testing.performance import PerformanceResult, measure_queue, measure_store
+from elkar.testing.stub_server import ElkarStubServer
+
+
+async def _backend(
+    name: str,
+    checks: tuple[Callable[[Any], Awaitable[None]], ...],
+    factory: Callable[[], Any],
+    performance: Callable[[Any], Awaitable[list[PerformanceResult]]] | None,
+) -> dict[str, Any]:
+    results = await run_checks(checks, factory)
+    print(f"{name}: {sum(result.passed for result in results)}/{len(results)} checks passed")
+    for result in results:
+        if not result.passed:
+            print(f"  FAILED {result.name}: {result.error}")
+    measurements = await performance(factory()) if performance is not None else []
+    for measurement in measurements:
+        print(
+            f"  {measurement.name}: {measurement.operations_per_second:.0f} ops/s, "
+            f"p50 {measurement.p50_ms:.2f} ms, p99 {measurement.p99_ms:.2f} ms"
+            + (f", {measurement.errors} errors" if measurement.errors else "")
+        )
+    return {
+        "backend": name,
+        "checks": [asdict(result) for result in results],
+        "performance": [asdict(measurement) for measurement in measurements],
+    }
+
+
+async def main(operations: int, concurrency: int) -> list[dict[str, Any]]:
+    def store_performance(store: Any) -> Awaitable[list[PerformanceResult]]:
+        return measure_store(store, operations, concurrency)
+
+    def queue_performance(queue: Any) -> Awaitable[list[PerformanceResult]]:
+        return measure_queue(queue, operations, concurrency)
+
+    reports = [
+        await _backend("InMemoryTaskManagerStore", STORE_CHECKS, InMemoryTaskManagerStore, store_performance),
+        await _backend(
+            "InMemoryClientSideTaskManagerStore", CLIENT_SIDE_STORE_CHECKS, InMemoryClientSideTaskManagerStore, None
+        ),
+        await _backend("InMemoryTaskEventQueue", QUEUE_CHECKS, InMemoryTaskEventQueue, queue_performance),
+    ]
+    async with ElkarStubServer() as stub:
+        reports += [
+            await _backend(
+                "ElkarClientStore", STORE_CHECKS, lambda: ElkarClientStore(stub.url, api_key="stub"), store_performance
+            ),
+            await _backend(
+                "ElkarClientTaskQueue",
+                QUEUE_CHECKS,
+                lambda: ElkarClientTaskQueue(stub.url, api_key="stub"),
+                queue_performance,
+            ),
+        ]
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+    reports = asyncio.run(main(args.operations, args.concurrency))
+    if args.output is not None:
+        args.output.write_text(json.dumps(reports, indent=2))
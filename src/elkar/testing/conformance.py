@@ -0,0 +1,396 @@
+"""
+Conformance checks of the `TaskManagerStore`, `ClientSideTaskManagerStore` and `TaskEventManager`
+implementations.
+
+Each check is an async function taking a fresh backend and raising `ConformanceError` when the
+backend does not behave as the protocol requires. Checks use their own task ids, so backends
+sharing state (e.g. a database) can be reused between checks.
+
+Usage, with pytest:
+    @pytest.mark.parametrize("check", STORE_CHECKS, ids=lambda check: check.__name__)
+    async def test_store(check):
+        await check(MyStore())
+
+or without it:
+    results = await run_checks(STORE_CHECKS, MyStore)
+"""
+
+import asyncio
+import inspect
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from elkar.a2a_types import (
+    Artifact,
+    Message,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskEvent,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from elkar.store.base import ClientSideTaskManagerStore, TaskManagerStore, UpdateTaskParams
+from elkar.task_queue.base import TaskEventManager
+
+
+class ConformanceError(AssertionError):
+    pass
+
+
+@dataclass
+class CheckResult:
+    name: str
+    passed: bool
+    seconds: float
+    error: str | None = None
+
+
+def _expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise ConformanceError(message)
+
+
+async def _expect_error(operation: Awaitable[Any], message: str) -> None:
+    try:
+        await operation
+    except ConformanceError:
+        raise
+    except Exception:
+        return
+    raise ConformanceError(message)
+
+
+def _task_id(name: str) -> str:
+    return f"conformance-{name}-{uuid.uuid4().hex}"
+
+
+def _message(text: str, role: str = "user") -> Message:
+    return Message(role=role, parts=[TextPart(text=text)])  # type: ignore[arg-type]
+
+
+def _texts(messages: list[Message] | None) -> list[str]:
+    return [part.text for message in messages or [] for part in message.parts if isinstance(part, TextPart)]
+
+
+def _chunk(index: int, text: str, append: bool = True, last_chunk: bool | None = None) -> Artifact:
+    return Artifact(index=index, append=append, lastChunk=last_chunk, parts=[TextPart(text=text)])
+
+
+def _artifact_texts(task: Task, index: int) -> list[str]:
+    for artifact in task.artifacts or []:
+        if artifact.index == index:
+            return [part.text for part in artifact.parts if isinstance(part, TextPart)]
+    raise ConformanceError(f"Artifact {index} is missing")
+
+
+# TaskManagerStore
+
+
+async def _create(store: TaskManagerStore, name: str, caller_id: str | None = None) -> str:
+    task_id = _task_id(name)
+    await store.upsert_task(TaskSendParams(id=task_id, message=_message("first")), caller_id=caller_id)
+    return task_id
+
+
+async def _get(store: TaskManagerStore, task_id: str, caller_id: str | None = None, **kwargs: Any) -> Task:
+    stored_task = await store.get_task(task_id, caller_id=caller_id, **kwargs)
+    _expect(stored_task is not None, f"Task {task_id} was not found")
+    assert stored_task is not None
+    return stored_task.task
+
+
+async def check_upsert_creates_task(store: TaskManagerStore) -> None:
+    task_id = _task_id("create")
+    stored_task = await store.upsert_task(TaskSendParams(id=task_id, message=_message("first")), caller_id="alice")
+    _expect(stored_task.id == task_id, "upsert_task returned another task")
+    _expect(stored_task.caller_id == "alice", "upsert_task did not keep the caller id")
+    task = await _get(store, task_id, "alice")
+    _expect(task.status.state == TaskState.SUBMITTED, f"A new task is {task.status.state}, not submitted")
+    _expect(_texts(task.history) == ["first"], "A new task does not have its message in its history")
+
+
+async def check_upsert_appends_message(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "append-message", "alice")
+    await store.upsert_task(TaskSendParams(id=task_id, message=_message("second")), caller_id="alice")
+    task = await _get(store, task_id, "alice")
+    _expect(_texts(task.history) == ["first", "second"], f"Unexpected history {_texts(task.history)}")
+
+
+async def check_caller_isolation(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "isolation", "alice")
+    _expect(await store.get_task(task_id, caller_id="bob") is None, "Another caller can read the task")
+    _expect(await store.get_task(task_id, caller_id=None) is None, "An anonymous caller can read the task")
+    await _expect_error(
+        store.update_task(task_id, UpdateTaskParams(new_messages=[_message("bob")], caller_id="bob")),
+        "Another caller can update the task",
+    )
+    try:
+        await store.upsert_task(TaskSendParams(id=task_id, message=_message("bob")), caller_id="bob")
+    except Exception:
+        # Rejecting the upsert, or creating a separate task for the other caller, are both isolated.
+        pass
+    task = await _get(store, task_id, "alice")
+    _expect(_texts(task.history) == ["first"], "Another caller changed the task")
+
+
+async def check_status_update(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "status")
+    status = TaskStatus(state=TaskState.WORKING, message=_message("working", "agent"))
+    updated = await store.update_task(task_id, UpdateTaskParams(status=status))
+    _expect(updated.task.status.state == TaskState.WORKING, "update_task did not return the new status")
+    task = await _get(store, task_id)
+    _expect(task.status.state == TaskState.WORKING, "The new status was not stored")
+    _expect(_texts(task.history) == ["first", "working"], "The status message was not added to the history")
+
+
+async def check_artifact_append(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "artifact-append")
+    await store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "a", append=False)]))
+    await store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "b"), _chunk(1, "other")]))
+    await store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "c", last_chunk=True)]))
+    task = await _get(store, task_id)
+    _expect(_artifact_texts(task, 0) == ["a", "b", "c"], f"Chunks were not appended: {_artifact_texts(task, 0)}")
+    _expect(_artifact_texts(task, 1) == ["other"], "An artifact with a new index was not added")
+    _expect(len(task.artifacts or []) == 2, f"Expected 2 artifacts, got {len(task.artifacts or [])}")
+
+
+async def check_last_chunk_error(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "last-chunk")
+    await store.update_task(
+        task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "a", append=False, last_chunk=True)])
+    )
+    await _expect_error(
+        store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "b")])),
+        "A chunk was appended to an artifact after its last chunk",
+    )
+    task = await _get(store, task_id)
+    _expect(_artifact_texts(task, 0) == ["a"], "The rejected chunk changed the artifact")
+
+
+async def check_history_slicing(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "history")
+    await store.update_task(
+        task_id, UpdateTaskParams(new_messages=[_message(str(index), "agent") for index in range(5)])
+    )
+    full = _texts((await _get(store, task_id)).history)
+    _expect(full == ["first", "0", "1", "2", "3", "4"], f"Unexpected history {full}")
+    last_two = _texts((await _get(store, task_id, history_length=2)).history)
+    _expect(last_two == ["3", "4"], f"history_length=2 returned {last_two}")
+    _expect(_texts((await _get(store, task_id, history_length=0)).history) == [], "history_length=0 is not empty")
+    _expect(_texts((await _get(store, task_id)).history) == full, "Slicing the history changed the stored task")
+
+
+async def check_metadata_update(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "metadata")
+    await store.update_task(task_id, UpdateTaskParams(metadata={"key": "value"}))
+    _expect((await _get(store, task_id)).metadata == {"key": "value"}, "The metadata was not stored")
+
+
+async def check_update_missing_task(store: TaskManagerStore) -> None:
+    await _expect_error(
+        store.update_task(_task_id("missing"), UpdateTaskParams(new_messages=[_message("x")])),
+        "Updating a task that does not exist did not fail",
+    )
+
+
+async def check_concurrent_appends(store: TaskManagerStore) -> None:
+    task_id = await _create(store, "concurrent")
+    await store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "start", append=False)]))
+    await asyncio.gather(
+        *(store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, str(i))])) for i in range(50))
+    )
+    texts = _artifact_texts(await _get(store, task_id), 0)
+    _expect(len(texts) == 51, f"Concurrent appends were lost: {len(texts)} parts instead of 51")
+
+
+STORE_CHECKS: tuple[Callable[[TaskManagerStore], Awaitable[None]], ...] = (
+    check_upsert_creates_task,
+    check_upsert_appends_message,
+    check_caller_isolation,
+    check_status_update,
+    check_artifact_append,
+    check_last_chunk_error,
+    check_history_slicing,
+    check_metadata_update,
+    check_update_missing_task,
+    check_concurrent_appends,
+)
+
+
+# ClientSideTaskManagerStore
+
+
+def _client_task(task_id: str) -> Task:
+    return Task(id=task_id, status=TaskStatus(state=TaskState.SUBMITTED), history=[_message("first")])
+
+
+async def check_client_upsert_and_isolation(store: ClientSideTaskManagerStore) -> None:
+    task_id = _task_id("client")
+    stored_task = await store.upsert_task_for_client(_client_task(task_id), "http://agent", caller_id="alice")
+    _expect(stored_task.agent_url == "http://agent", "The agent url was not stored")
+    _expect(await store.get_task_for_client(task_id, "alice") is not None, "The task was not found")
+    _expect(await store.get_task_for_client(task_id, "bob") is None, "Another caller can read the task")
+    await _expect_error(
+        store.update_task(task_id, UpdateTaskParams(new_messages=[_message("bob")], caller_id="bob")),
+        "Another caller can update the task",
+    )
+
+
+async def check_client_upsert_replaces_task(store: ClientSideTaskManagerStore) -> None:
+    task_id = _task_id("client-replace")
+    await store.upsert_task_for_client(_client_task(task_id), "http://agent")
+    working = _client_task(task_id).model_copy(update={"status": TaskStatus(state=TaskState.WORKING)})
+    await store.upsert_task_for_client(working, "http://agent")
+    stored_task = await store.get_task_for_client(task_id, None)
+    _expect(stored_task is not None and stored_task.task.status.state == TaskState.WORKING, "The task was not replaced")
+
+
+async def check_client_artifact_rules(store: ClientSideTaskManagerStore) -> None:
+    task_id = _task_id("client-artifacts")
+    await store.upsert_task_for_client(_client_task(task_id), "http://agent")
+    await store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "a", append=False)]))
+    await store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "b", last_chunk=True)]))
+    await _expect_error(
+        store.update_task(task_id, UpdateTaskParams(artifacts_updates=[_chunk(0, "c")])),
+        "A chunk was appended to an artifact after its last chunk",
+    )
+    stored_task = await store.get_task_for_client(task_id, None)
+    _expect(stored_task is not None, "The task was not found")
+    assert stored_task is not None
+    _expect(_artifact_texts(stored_task.task, 0) == ["a", "b"], "Chunks were not appended")
+
+
+CLIENT_SIDE_STORE_CHECKS: tuple[Callable[[ClientSideTaskManagerStore], Awaitable[None]], ...] = (
+    check_client_upsert_and_isolation,
+    check_client_upsert_replaces_task,
+    check_client_artifact_rules,
+)
+
+
+# TaskEventManager
+
+
+async def next_event(
+    queue: TaskEventManager,
+    task_id: str,
+    subscriber_identifier: str,
+    caller_id: str | None = None,
+    timeout: float = 1.0,
+) -> TaskEvent:
+    """
+    Dequeue the next event of a subscriber, waiting up to `timeout` seconds. Works with queues
+    whose `dequeue` waits for an event and with queues returning None when there is none.
+    """
+
+    async def poll() -> TaskEvent:
+        while True:
+            event = await queue.dequeue(task_id, subscriber_identifier, caller_id)
+            if event is not None:
+                return event
+            await asyncio.sleep(0.001)
+
+    return await asyncio.wait_for(poll(), timeout)
+
+
+def _event(task_id: str, text: str, final: bool = False) -> TaskStatusUpdateEvent:
+    return TaskStatusUpdateEvent(
+        id=task_id, status=TaskStatus(state=TaskState.WORKING, message=_message(text, "agent")), final=final
+    )
+
+
+def _event_text(event: TaskEvent) -> str | None:
+    if isinstance(event, TaskStatusUpdateEvent) and event.status.message is not None:
+        return _texts([event.status.message])[0]
+    if isinstance(event, TaskArtifactUpdateEvent):
+        return next(part.text for part in event.artifact.parts if isinstance(part, TextPart))
+    return None
+
+
+async def _dequeue_texts(
+    queue: TaskEventManager, task_id: str, subscriber: str, count: int, caller_id: str | None = None
+) -> list[str | None]:
+    return [_event_text(await next_event(queue, task_id, subscriber, caller_id)) for _ in range(count)]
+
+
+async def check_queue_fan_out(queue: TaskEventManager) -> None:
+    task_id = _task_id("fan-out")
+    await queue.add_subscriber(task_id, "first")
+    await queue.add_subscriber(task_id, "second", is_resubscribe=True)
+    for text in ("a", "b", "c"):
+        await queue.enqueue(task_id, _event(task_id, text))
+    for subscriber in ("first", "second"):
+        texts = await _dequeue_texts(queue, task_id, subscriber, 3)
+        _expect(texts == ["a", "b", "c"], f"Subscriber {subscriber} received {texts}")
+
+
+async def check_queue_enqueue_many(queue: TaskEventManager) -> None:
+    task_id = _task_id("enqueue-many")
+    await queue.add_subscriber(task_id, "subscriber")
+    await queue.enqueue_many(task_id, [_event(task_id, str(index)) for index in range(5)])
+    texts = await _dequeue_texts(queue, task_id, "subscriber", 5)
+    _expect(texts == ["0", "1", "2", "3", "4"], f"enqueue_many delivered {texts}")
+
+
+async def check_queue_caller_isolation(queue: TaskEventManager) -> None:
+    task_id = _task_id("queue-isolation")
+    await queue.add_subscriber(task_id, "alice-subscriber", caller_id="alice")
+    await queue.add_subscriber(task_id, "bob-subscriber", caller_id="bob")
+    await queue.enqueue(task_id, _event(task_id, "for alice"), caller_id="alice")
+    _expect(
+        await _dequeue_texts(queue, task_id, "alice-subscriber", 1, "alice") == ["for alice"],
+        "The subscriber did not receive the event",
+    )
+    try:
+        event = await next_event(queue, task_id, "bob-subscriber", "bob", timeout=0.1)
+    except asyncio.TimeoutError:
+        return
+    raise ConformanceError(f"Another caller received the event: {event}")
+
+
+async def check_queue_resubscribe(queue: TaskEventManager) -> None:
+    task_id = _task_id("resubscribe")
+    await queue.add_subscriber(task_id, "first")
+    await queue.enqueue(task_id, _event(task_id, "before"))
+    await queue.add_subscriber(task_id, "second", is_resubscribe=True)
+    await queue.enqueue(task_id, _event(task_id, "after", final=True))
+    _expect(await _dequeue_texts(queue, task_id, "first", 2) == ["before", "after"], "The first subscriber lost events")
+    _expect(
+        await _dequeue_texts(queue, task_id, "second", 1) == ["after"],
+        "A resubscribed subscriber did not receive the next event",
+    )
+
+
+QUEUE_CHECKS: tuple[Callable[[TaskEventManager], Awaitable[None]], ...] = (
+    check_queue_fan_out,
+    check_queue_enqueue_many,
+    check_queue_caller_isolation,
+    check_queue_resubscribe,
+)
+
+
+async def run_checks[B](
+    checks: Iterable[Callable[[B], Awaitable[None]]],
+    backend_factory: Callable[[], B | Awaitable[B]],
+    timeout: float = 10.0,
+) -> list[CheckResult]:
+    """Run each check on a new backend. Failures and errors are reported, not raised."""
+    results = []
+    for check in checks:
+        start = time.perf_counter()
+        error: str | None = None
+        try:
+            backend = backend_factory()
+            if inspect.isawaitable(backend):
+                backend = await backend
+            await asyncio.wait_for(check(backend), timeout)  # type: ignore[arg-type]
+        except ConformanceError as e:
+            error = str(e)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append(CheckResult(check.__name__, error is None, time.perf_counter() - start, error))
+    return results
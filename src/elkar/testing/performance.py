@@ -0,0 +1,126 @@
+"""
+Throughput and tail latency of store and queue backends under concurrency.
+"""
+
+import asyncio
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from elkar.a2a_types import Artifact, Message, TaskSendParams, TaskState, TaskStatus, TaskStatusUpdateEvent, TextPart
+from elkar.store.base import TaskManagerStore, UpdateTaskParams
+from elkar.task_queue.base import TaskEventManager
+from elkar.testing.conformance import next_event
+
+
+@dataclass
+class PerformanceResult:
+    name: str
+    operations: int
+    concurrency: int
+    seconds: float
+    operations_per_second: float
+    p50_ms: float
+    p99_ms: float
+    errors: int = 0
+
+
+async def measure(
+    name: str,
+    operation: Callable[[int], Awaitable[None]],
+    operations: int,
+    concurrency: int,
+) -> PerformanceResult:
+    """Run `operation(index)` `operations` times with `concurrency` concurrent workers."""
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(operations))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            start = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p99 = quantiles[49], quantiles[98]
+    else:
+        p50 = p99 = latencies[0] if latencies else 0.0
+    return PerformanceResult(
+        name=name,
+        operations=len(latencies),
+        concurrency=concurrency,
+        seconds=seconds,
+        operations_per_second=len(latencies) / seconds if seconds > 0 else 0.0,
+        p50_ms=p50 * 1000,
+        p99_ms=p99 * 1000,
+        errors=errors,
+    )
+
+
+async def measure_store(
+    store: TaskManagerStore, operations: int = 1000, concurrency: int = 16
+) -> list[PerformanceResult]:
+    """Measure `upsert_task` of new tasks, `get_task` and artifact appends with `update_task`."""
+    prefix = f"performance-{uuid.uuid4().hex}"
+    message = Message(role="user", parts=[TextPart(text="performance")])
+    task_ids = [f"{prefix}-{index}" for index in range(operations)]
+
+    async def upsert(index: int) -> None:
+        await store.upsert_task(TaskSendParams(id=task_ids[index], message=message))
+
+    async def get(index: int) -> None:
+        if await store.get_task(task_ids[index]) is None:
+            raise LookupError(task_ids[index])
+
+    async def append(index: int) -> None:
+        # Concurrent appends to a few tasks, as when handlers stream artifacts.
+        chunk = Artifact(index=0, append=True, parts=[TextPart(text=str(index))])
+        await store.update_task(task_ids[index % concurrency], UpdateTaskParams(artifacts_updates=[chunk]))
+
+    return [
+        await measure("upsert_task", upsert, operations, concurrency),
+        await measure("get_task", get, operations, concurrency),
+        await measure("update_task", append, operations, concurrency),
+    ]
+
+
+async def measure_queue(
+    queue: TaskEventManager, operations: int = 1000, concurrency: int = 16
+) -> list[PerformanceResult]:
+    """
+    Measure `enqueue`, and the round trip of an event from `enqueue` to `dequeue`, with
+    `concurrency` tasks having one subscriber each.
+    """
+    prefix = f"performance-{uuid.uuid4().hex}"
+    task_ids = [f"{prefix}-{index}" for index in range(concurrency)]
+    for task_id in task_ids:
+        await queue.add_subscriber(task_id, "subscriber")
+    status = TaskStatus(state=TaskState.WORKING)
+
+    async def enqueue(index: int) -> None:
+        task_id = task_ids[index % concurrency]
+        await queue.enqueue(task_id, TaskStatusUpdateEvent(id=task_id, status=status))
+
+    async def drain(index: int) -> None:
+        await next_event(queue, task_ids[index % concurrency], "subscriber", timeout=5.0)
+
+    async def round_trip(index: int) -> None:
+        await enqueue(index)
+        await drain(index)
+
+    enqueue_result = await measure("enqueue", enqueue, operations, concurrency)
+    # Empty the queues before measuring round trips.
+    await measure("dequeue", drain, enqueue_result.operations, concurrency)
+    return [enqueue_result, await measure("enqueue_dequeue", round_trip, operations, concurrency)]
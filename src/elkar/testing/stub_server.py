@@ -0,0 +1,165 @@
+import asyncio
+import uuid
+from collections import deque
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from elkar.a2a_types import TaskEvent, TaskPushNotificationConfig
+from elkar.api_client.models import (
+    CreateTaskInput,
+    CreateTaskSubscriberRequest,
+    DequeueTaskEventInput,
+    EnqueueTaskEventInput,
+    TaskEventResponse,
+    TaskResponse,
+    UnpaginatedOutput,
+    UpdateTaskInput,
+)
+from elkar.common import TaskType
+from elkar.store.base import StoredTask, UpdateTaskParams
+from elkar.store.in_memory import InMemoryTaskManagerStore
+
+
+def _json(model: BaseModel, status_code: int = 200) -> JSONResponse:
+    return JSONResponse(model.model_dump(mode="json", exclude_none=True), status_code=status_code)
+
+
+def _task_response(stored_task: StoredTask) -> TaskResponse:
+    push_notification = None
+    if stored_task.push_notification is not None:
+        push_notification = TaskPushNotificationConfig(
+            id=stored_task.id, pushNotificationConfig=stored_task.push_notification
+        )
+    return TaskResponse(
+        a2a_task=stored_task.task,
+        created_at=stored_task.created_at,
+        updated_at=stored_task.updated_at,
+        id=uuid.uuid5(uuid.NAMESPACE_URL, f"{stored_task.caller_id}/{stored_task.id}"),
+        push_notification=push_notification,
+        state=stored_task.task.status.state,
+        task_type=TaskType.INCOMING,
+        counterparty_identifier=stored_task.caller_id,
+    )
+
+
+class ElkarStubServer:
+    """
+    Local stand-in for the Elkar API, serving the task and task event endpoints used by
+    `ElkarClientStore` and `ElkarClientTaskQueue` from memory, on a loopback port.
+    Tasks follow the rules of `InMemoryTaskManagerStore`.
+
+    Usage:
+        async with ElkarStubServer() as stub:
+            store = ElkarClientStore(base_url=stub.url, api_key="stub")
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.url = ""
+        self.store = InMemoryTaskManagerStore()
+        # Task id -> subscriber id -> (caller id, events)
+        self.subscribers: dict[str, dict[str, tuple[str | None, deque[TaskEvent]]]] = {}
+        self.app = Starlette()
+        self.app.add_route("/tasks", self._upsert_task, methods=["POST"])
+        self.app.add_route("/tasks/{task_id}", self._get_task, methods=["GET"])
+        self.app.add_route("/tasks/{task_id}", self._update_task, methods=["PUT"])
+        self.app.add_route("/task-events/subscribers", self._add_subscriber, methods=["POST"])
+        self.app.add_route("/task-events/enqueue", self._enqueue, methods=["POST"])
+        self.app.add_route("/task-events/dequeue", self._dequeue, methods=["POST"])
+        self._server: Any = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        import uvicorn
+
+        config = uvicorn.Config(
+            self.app, host=self.host, port=self.port, log_level="warning", access_log=False, lifespan="off"
+        )
+        self._server = uvicorn.Server(config)
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{port}"
+
+    async def stop(self) -> None:
+        if self._server is not None and self._task is not None:
+            self._server.should_exit = True
+            await self._task
+            self._server = self._task = None
+
+    async def __aenter__(self) -> "ElkarStubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    async def _upsert_task(self, request: Request) -> Response:
+        params = CreateTaskInput.model_validate_json(await request.body())
+        try:
+            stored_task = await self.store.upsert_task(
+                params.send_task_params, caller_id=params.counterparty_identifier
+            )
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=409)
+        return _json(_task_response(stored_task))
+
+    async def _get_task(self, request: Request) -> Response:
+        history_length = request.query_params.get("history_length")
+        stored_task = await self.store.get_task(
+            request.path_params["task_id"],
+            history_length=int(history_length) if history_length is not None else None,
+            caller_id=request.query_params.get("caller_id"),
+        )
+        if stored_task is None:
+            return JSONResponse({"error": "Task not found"}, status_code=404)
+        return _json(_task_response(stored_task))
+
+    async def _update_task(self, request: Request) -> Response:
+        params = UpdateTaskInput.model_validate_json(await request.body())
+        try:
+            stored_task = await self.store.update_task(
+                request.path_params["task_id"],
+                UpdateTaskParams(
+                    status=params.status,
+                    artifacts_updates=params.artifacts_updates,
+                    new_messages=params.new_messages,
+                    metadata=params.metadata,
+                    push_notification=params.push_notification,
+                    caller_id=params.caller_id,
+                ),
+            )
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return _json(_task_response(stored_task))
+
+    async def _add_subscriber(self, request: Request) -> Response:
+        params = CreateTaskSubscriberRequest.model_validate_json(await request.body())
+        subscribers = self.subscribers.setdefault(params.task_id, {})
+        subscribers.setdefault(params.subscriber_id, (params.caller_id, deque()))
+        return JSONResponse({})
+
+    async def _enqueue(self, request: Request) -> Response:
+        params = EnqueueTaskEventInput.model_validate_json(await request.body())
+        for caller_id, events in self.subscribers.get(params.task_id, {}).values():
+            if caller_id == params.caller_id:
+                events.append(params.event)
+        return JSONResponse({})
+
+    async def _dequeue(self, request: Request) -> Response:
+        params = DequeueTaskEventInput.model_validate_json(await request.body())
+        subscriber = self.subscribers.get(params.task_id, {}).get(params.subscriber_id)
+        records: list[TaskEventResponse] = []
+        if subscriber is not None:
+            events = subscriber[1]
+            while events and (params.limit is None or len(records) < params.limit):
+                records.append(TaskEventResponse(id=uuid.uuid4(), task_id=params.task_id, event_data=events.popleft()))
+        return _json(UnpaginatedOutput(records=records))
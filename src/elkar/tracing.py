@@ -0,0 +1,64 @@
+"""
+Optional OpenTelemetry tracing.
+
+Tracing is disabled until `enable_tracing` is called, and `span` then returns a shared no-op
+context manager, so instrumented code pays a function call and nothing else. It requires the
+`opentelemetry-api` package (and an SDK to export the spans).
+"""
+
+import contextlib
+from typing import Any, ContextManager, Mapping, MutableMapping
+
+try:
+    from opentelemetry import propagate, trace  # type: ignore[import-not-found]
+except ImportError:
+    propagate = None
+    trace = None
+
+_NO_SPAN = contextlib.nullcontext()
+_tracer: Any = None
+
+
+def enable_tracing(tracer_provider: Any = None) -> None:
+    """Start recording spans, with the global tracer provider unless one is given."""
+    global _tracer
+    if trace is None:
+        raise ImportError("Tracing requires the opentelemetry-api package")
+    _tracer = trace.get_tracer("elkar", tracer_provider=tracer_provider)
+
+
+def disable_tracing() -> None:
+    global _tracer
+    _tracer = None
+
+
+def is_tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def span(
+    name: str,
+    attributes: dict[str, Any] | None = None,
+    trace_headers: Mapping[str, str] | None = None,
+) -> ContextManager[Any]:
+    """
+    Record a span around a block. The span is a child of the current span, or of the trace
+    context of `trace_headers` when given (e.g. `RequestContext.trace_headers`).
+    """
+    if _tracer is None:
+        return _NO_SPAN
+    context = propagate.extract(trace_headers) if trace_headers else None
+    return _tracer.start_as_current_span(name, context=context, attributes=attributes)
+
+
+def extract_trace_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    """Return the trace context headers (e.g. `traceparent`) of an incoming request."""
+    if _tracer is None:
+        return {}
+    return {name: headers[name] for name in propagate.get_global_textmap().fields if name in headers}
+
+
+def inject_trace_headers(headers: MutableMapping[str, str]) -> None:
+    """Add the trace context of the current span to the headers of an outgoing request."""
+    if _tracer is not None:
+        propagate.inject(headers)
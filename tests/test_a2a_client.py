@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, AsyncIterable
+
+import uvicorn
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from elkar.client.a2a_client import A2AClient, A2AClientConfig, _sse_data
+from elkar.server.server import A2AServer
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+async def handler(task_modifier: TaskModifierBase, request_context: Any) -> None:
+    await task_modifier.set_status(TaskStatus(state=TaskState.WORKING))
+    await task_modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+async def serve(server: A2AServer[Any]) -> tuple[uvicorn.Server, asyncio.Task[None], str]:
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=0, log_level="warning", lifespan="off")
+    uvicorn_server = uvicorn.Server(config)
+    task = asyncio.create_task(uvicorn_server.serve())
+    async with asyncio.timeout(5):
+        while not uvicorn_server.started:
+            await asyncio.sleep(0.01)
+    port = uvicorn_server.servers[0].sockets[0].getsockname()[1]
+    return uvicorn_server, task, f"http://127.0.0.1:{port}"
+
+
+def test_send_task_streaming_yields_the_events_of_the_stream() -> None:
+    async def scenario() -> list[tuple[TaskState, bool]]:
+        task_manager: TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = (
+            TaskManagerWithModifier(AGENT_CARD, send_task_handler=handler)
+        )
+        uvicorn_server, server_task, url = await serve(A2AServer(task_manager))
+        try:
+            async with A2AClient(A2AClientConfig(base_url=url)) as client:
+                params = TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hello")]))
+                stream = await client.send_task_streaming(params)
+                states = []
+                async with asyncio.timeout(5):
+                    async for response in stream:
+                        assert isinstance(response.result, TaskStatusUpdateEvent)
+                        states.append((response.result.status.state, response.result.final))
+                return states
+        finally:
+            uvicorn_server.should_exit = True
+            await server_task
+
+    states = asyncio.run(scenario())
+    assert states[-1] == (TaskState.COMPLETED, True)
+    assert (TaskState.WORKING, False) in states
+
+
+def test_sse_data_joins_the_data_lines_of_each_event() -> None:
+    async def lines() -> AsyncIterable[bytes]:
+        for line in (b": ping\r\n", b"\r\n", b"event: message\r\n", b'data: {"a":\r\n', b"data:1}\r\n", b"\r\n"):
+            yield line
+        # An event not ended by a blank line is not dispatched.
+        yield b"data: {}\r\n"
+
+    async def collect() -> list[bytes]:
+        return [data async for data in _sse_data(lines())]
+
+    assert asyncio.run(collect()) == [b'{"a":\n1}']
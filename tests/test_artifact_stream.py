@@ -0,0 +1,115 @@
+import asyncio
+import logging
+
+import pytest
+
+from elkar.a2a_types import Artifact, TextPart
+from elkar.task_modifier.artifact_stream import ArtifactStream
+
+
+class RecordingModifier:
+    """Records the artifact chunks it receives; fails the first `failures` ones."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.chunks: list[Artifact] = []
+
+    async def upsert_artifacts(self, artifacts: list[Artifact]) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("store unavailable")
+        self.chunks.extend(artifacts)
+
+
+def new_stream(modifier: RecordingModifier, max_delay: float = 10.0, max_chars: int = 1024) -> ArtifactStream:
+    return ArtifactStream(modifier, index=0, name="answer", max_delay=max_delay, max_chars=max_chars)  # type: ignore[arg-type]
+
+
+def chunk_texts(modifier: RecordingModifier) -> list[str]:
+    return ["".join(part.text for part in chunk.parts if isinstance(part, TextPart)) for chunk in modifier.chunks]
+
+
+def test_deltas_are_flushed_once_max_chars_are_buffered() -> None:
+    modifier = RecordingModifier()
+
+    async def scenario() -> list[str]:
+        stream = new_stream(modifier, max_chars=5)
+        for token in ("a", "bc", "de", "f", "ghijk"):
+            await stream.write(token)
+        # The first delta is sent right away, the next ones once 5 characters are buffered.
+        sent = chunk_texts(modifier)
+        await stream.close()
+        return sent
+
+    assert asyncio.run(scenario()) == ["a", "bcdef", "ghijk"]
+
+
+def test_deltas_are_flushed_after_max_delay() -> None:
+    modifier = RecordingModifier()
+
+    async def scenario() -> tuple[list[str], list[str]]:
+        stream = new_stream(modifier, max_delay=0.05)
+        await stream.write("a")
+        await stream.write("b")
+        await stream.write("c")
+        before_delay = chunk_texts(modifier)
+        await asyncio.sleep(0.1)
+        after_delay = chunk_texts(modifier)
+        await stream.close()
+        return before_delay, after_delay
+
+    assert asyncio.run(scenario()) == (["a"], ["a", "bc"])
+
+
+def test_chunks_are_appended_and_the_last_one_is_marked() -> None:
+    modifier = RecordingModifier()
+
+    async def scenario() -> None:
+        async with new_stream(modifier, max_chars=2) as stream:
+            for token in ("a", "bc", "d"):
+                await stream.write(token)
+        with pytest.raises(ValueError, match="closed"):
+            await stream.write("e")
+
+    asyncio.run(scenario())
+    assert chunk_texts(modifier) == ["a", "bc", "d"]
+    assert [chunk.append for chunk in modifier.chunks] == [False, True, True]
+    assert [chunk.lastChunk for chunk in modifier.chunks] == [False, False, True]
+    assert {chunk.name for chunk in modifier.chunks} == {"answer"}
+
+
+def test_a_failed_timed_flush_is_logged_and_keeps_its_text(caplog: pytest.LogCaptureFixture) -> None:
+    modifier = RecordingModifier()
+
+    async def scenario() -> None:
+        stream = new_stream(modifier, max_delay=0.05)
+        await stream.write("a")
+        modifier.failures = 1
+        await stream.write("b")
+        await asyncio.sleep(0.1)
+        await stream.write("c")
+        await stream.close()
+
+    with caplog.at_level(logging.ERROR, logger="elkar.task_modifier.artifact_stream"):
+        asyncio.run(scenario())
+    assert "store unavailable" in caplog.text
+    assert "".join(chunk_texts(modifier)) == "abc"
+    assert [chunk.append for chunk in modifier.chunks] == [False] + [True] * (len(modifier.chunks) - 1)
+    assert modifier.chunks[-1].lastChunk is True
+
+
+def test_a_failed_close_can_be_retried() -> None:
+    modifier = RecordingModifier()
+
+    async def scenario() -> None:
+        stream = new_stream(modifier)
+        await stream.write("a")
+        await stream.write("b")
+        modifier.failures = 1
+        with pytest.raises(RuntimeError):
+            await stream.close()
+        await stream.close()
+
+    asyncio.run(scenario())
+    assert chunk_texts(modifier) == ["a", "b"]
+    assert modifier.chunks[-1].lastChunk is True
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+import httpx
+import jwt
+from jwt.algorithms import HMACAlgorithm
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    SendTaskRequest,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from elkar.push_notification.keys import RemoteJWKS
+from elkar.server.authentication import BearerTokenAuthenticator
+from elkar.server.server import A2AServer
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+SECRET = "secret" * 8
+JWKS_URL = "http://idp/.well-known/jwks.json"
+
+
+class JWKSEndpoint:
+    """Serves a key set until `error` is set, then raises it."""
+
+    def __init__(self) -> None:
+        self.error: Exception | None = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.error is not None:
+            raise self.error
+        jwk = json.loads(HMACAlgorithm.to_jwk(SECRET))
+        jwk.update({"kid": "key", "alg": "HS256"})
+        return httpx.Response(200, json={"keys": [jwk]}, headers={"Cache-Control": "max-age=0"})
+
+
+async def handler(modifier: TaskModifierBase, request_context: RequestContext | None) -> None:
+    await modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+def new_server(endpoint: JWKSEndpoint) -> A2AServer[Any]:
+    key_set = RemoteJWKS(
+        JWKS_URL,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(endpoint)),
+        min_refresh_interval=0,
+    )
+    task_manager: TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = TaskManagerWithModifier(
+        AGENT_CARD, send_task_handler=handler
+    )
+    return A2AServer(task_manager, context_extractor=BearerTokenAuthenticator(key_set, max_cache_ttl=0))
+
+
+def bearer() -> str:
+    token: str | bytes = jwt.encode(
+        {"sub": "alice", "exp": int(time.time()) + 60}, SECRET, algorithm="HS256", headers={"kid": "key"}
+    )
+    return f"Bearer {token if isinstance(token, str) else token.decode()}"
+
+
+async def send(server: A2AServer[Any], task_id: str) -> httpx.Response:
+    request = SendTaskRequest(
+        id=task_id, params=TaskSendParams(id=task_id, message=Message(role="user", parts=[TextPart(text="hi")]))
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+        return await client.post("/", content=request.model_dump_json(), headers={"Authorization": bearer()})
+
+
+def test_an_unreachable_key_set_answers_503() -> None:
+    async def scenario() -> list[httpx.Response]:
+        responses = []
+        for error in (httpx.ConnectError("refused"), httpx.ReadTimeout("timed out")):
+            endpoint = JWKSEndpoint()
+            endpoint.error = error
+            responses.append(await send(new_server(endpoint), "task"))
+        return responses
+
+    for response in asyncio.run(scenario()):
+        assert response.status_code == 503
+        assert "www-authenticate" not in response.headers
+        assert response.json()["error"]["code"] == -32011
+
+
+def test_a_failed_refresh_keeps_the_cached_keys() -> None:
+    async def scenario() -> tuple[httpx.Response, httpx.Response]:
+        endpoint = JWKSEndpoint()
+        server = new_server(endpoint)
+        first = await send(server, "first")
+        endpoint.error = httpx.ReadTimeout("timed out")
+        return first, await send(server, "second")
+
+    first, second = asyncio.run(scenario())
+    for response in (first, second):
+        assert response.status_code == 200
+        assert response.json()["result"]["status"]["state"] == "completed"
+
+
+def test_an_invalid_token_answers_401() -> None:
+    async def scenario() -> httpx.Response:
+        server = new_server(JWKSEndpoint())
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+            return await client.post("/", content=b"{}", headers={"Authorization": "Bearer not-a-token"})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
@@ -0,0 +1,166 @@
+import asyncio
+
+from elkar.a2a_types import Artifact, Message, Task, TaskState, TaskStatus, TextPart
+from elkar.store.background_writer import BackgroundTaskWriter, coalesce_updates
+from elkar.store.base import StoredTask, UpdateTaskParams
+from elkar.store.in_memory import InMemoryClientSideTaskManagerStore
+
+
+def message(text: str) -> Message:
+    return Message(role="agent", parts=[TextPart(text=text)])
+
+
+def artifact(text: str) -> Artifact:
+    return Artifact(index=0, parts=[TextPart(text=text)])
+
+
+async def apply(updates: list[UpdateTaskParams]) -> Task:
+    store = InMemoryClientSideTaskManagerStore()
+    await store.upsert_task_for_client(Task(id="task", status=TaskStatus(state=TaskState.SUBMITTED)), "http://agent")
+    for update in updates:
+        await store.update_task("task", update)
+    stored_task = await store.get_task_for_client("task", None)
+    assert stored_task is not None
+    return stored_task.task
+
+
+def assert_same_task(updates: list[UpdateTaskParams], merged: list[UpdateTaskParams]) -> None:
+    def without_timestamps(task: Task) -> dict[str, object]:
+        return task.model_dump(exclude={"status": {"timestamp"}})
+
+    assert without_timestamps(asyncio.run(apply(merged))) == without_timestamps(asyncio.run(apply(updates)))
+
+
+def test_a_later_status_overwrites_an_earlier_one() -> None:
+    updates = [
+        UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING)),
+        UpdateTaskParams(status=TaskStatus(state=TaskState.COMPLETED)),
+    ]
+    merged = coalesce_updates(updates)
+    assert len(merged) == 1
+    assert merged[0].status is not None
+    assert merged[0].status.state == TaskState.COMPLETED
+    assert_same_task(updates, merged)
+
+
+def test_a_status_with_a_message_is_not_overwritten() -> None:
+    updates = [
+        UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING, message=message("thinking"))),
+        UpdateTaskParams(status=TaskStatus(state=TaskState.COMPLETED)),
+    ]
+    assert coalesce_updates(updates) == updates
+    assert_same_task(updates, coalesce_updates(updates))
+
+
+def test_new_messages_are_concatenated_in_order() -> None:
+    updates = [
+        UpdateTaskParams(new_messages=[message("first")]),
+        UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING)),
+        UpdateTaskParams(new_messages=[message("second"), message("third")]),
+    ]
+    merged = coalesce_updates(updates)
+    assert len(merged) == 1
+    assert merged[0].new_messages == [message("first"), message("second"), message("third")]
+    assert_same_task(updates, merged)
+
+
+def test_a_status_message_after_new_messages_is_not_merged() -> None:
+    updates = [
+        UpdateTaskParams(new_messages=[message("first")]),
+        UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING, message=message("second"))),
+    ]
+    assert len(coalesce_updates(updates)) == 2
+    assert_same_task(updates, coalesce_updates(updates))
+
+
+def test_artifact_updates_are_appended_in_order() -> None:
+    updates = [
+        UpdateTaskParams(artifacts_updates=[artifact("a")]),
+        UpdateTaskParams(artifacts_updates=[artifact("b")]),
+    ]
+    merged = coalesce_updates(updates)
+    assert len(merged) == 1
+    assert merged[0].artifacts_updates == [artifact("a"), artifact("b")]
+    assert_same_task(updates, merged)
+
+
+def test_the_latest_metadata_is_kept() -> None:
+    updates = [
+        UpdateTaskParams(metadata={"step": 1}),
+        UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING)),
+        UpdateTaskParams(metadata={"step": 2}),
+    ]
+    merged = coalesce_updates(updates)
+    assert len(merged) == 1
+    assert merged[0].metadata == {"step": 2}
+    assert_same_task(updates, merged)
+
+
+def test_updates_of_different_callers_are_not_merged() -> None:
+    updates = [
+        UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING), caller_id="alice"),
+        UpdateTaskParams(status=TaskStatus(state=TaskState.COMPLETED), caller_id="bob"),
+    ]
+    assert coalesce_updates(updates) == updates
+
+
+def test_coalescing_does_not_modify_the_updates() -> None:
+    first = UpdateTaskParams(new_messages=[message("first")])
+    coalesce_updates([first, UpdateTaskParams(new_messages=[message("second")])])
+    assert first.new_messages == [message("first")]
+
+
+class SlowStore:
+    """Records the updates it applies, taking `delay` seconds each; fails the first `failures` ones."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0) -> None:
+        self.delay = delay
+        self.failures = failures
+        self.updates: list[UpdateTaskParams] = []
+
+    async def update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
+        await asyncio.sleep(self.delay)
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("store unavailable")
+        self.updates.append(params)
+        return None  # type: ignore[return-value]
+
+
+def states(store: SlowStore) -> list[TaskState]:
+    return [update.status.state for update in store.updates if update.status is not None]
+
+
+def test_flush_waits_for_the_final_status() -> None:
+    store = SlowStore(delay=0.05)
+
+    async def scenario() -> list[TaskState]:
+        writer = BackgroundTaskWriter(store, "task")
+        writer.submit(UpdateTaskParams(status=TaskStatus(state=TaskState.SUBMITTED)))
+        await asyncio.sleep(0.01)
+        # Submitted while the first write is in progress: written as one batch.
+        writer.submit(UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING)))
+        writer.submit(UpdateTaskParams(status=TaskStatus(state=TaskState.COMPLETED)))
+        await writer.flush()
+        written = states(store)
+        await writer.close()
+        return written
+
+    assert asyncio.run(scenario()) == [TaskState.SUBMITTED, TaskState.COMPLETED]
+
+
+def test_close_writes_the_pending_updates_after_a_failed_write() -> None:
+    store = SlowStore(delay=0.01, failures=1)
+
+    async def scenario() -> None:
+        writer = BackgroundTaskWriter(store, "task")
+        writer.submit(UpdateTaskParams(status=TaskStatus(state=TaskState.WORKING, message=message("lost"))))
+        await asyncio.sleep(0)
+        writer.submit(UpdateTaskParams(artifacts_updates=[artifact("a")]))
+        writer.submit(UpdateTaskParams(status=TaskStatus(state=TaskState.COMPLETED)))
+        async with asyncio.timeout(5):
+            await writer.close()
+
+    asyncio.run(scenario())
+    assert states(store) == [TaskState.COMPLETED]
+    assert store.updates[0].artifacts_updates == [artifact("a")]
@@ -0,0 +1,94 @@
+import asyncio
+import base64
+import os
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    FileContent,
+    FilePart,
+    Message,
+    SendTaskRequest,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from elkar.blob_store.file_system import FileSystemBlobStore, MemoryMappedBlobStore
+from elkar.server.authentication import AuthenticationError
+from elkar.server.server import A2AServer
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+CONTENT = os.urandom(100_000)
+
+
+async def handler(modifier: TaskModifierBase, request_context: RequestContext | None) -> None:
+    file = FileContent(name="file.bin", bytes=base64.b64encode(CONTENT).decode())
+    await modifier.upsert_artifacts([Artifact(parts=[FilePart(file=file)])])
+    await modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+def caller_from_header(request: Request) -> RequestContext:
+    caller_id = request.headers.get("x-caller")
+    if caller_id is None:
+        raise AuthenticationError()
+    return RequestContext(caller_id=caller_id, metadata={})
+
+
+def new_server(blob_store: FileSystemBlobStore) -> A2AServer[Any]:
+    task_manager: TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = TaskManagerWithModifier(
+        AGENT_CARD, send_task_handler=handler, blob_store=blob_store, blob_min_size=1024
+    )
+    return A2AServer(task_manager, blob_store=blob_store, context_extractor=caller_from_header)
+
+
+@pytest.mark.parametrize("store_type", [FileSystemBlobStore, MemoryMappedBlobStore])
+def test_blobs_are_only_served_to_their_caller(tmp_path: Path, store_type: type[FileSystemBlobStore]) -> None:
+    async def scenario() -> tuple[httpx.Response, ...]:
+        server = new_server(store_type(tmp_path, base_url="/blobs/"))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+            request = SendTaskRequest(
+                params=TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="go")]))
+            )
+            response = await client.post("/", content=request.model_dump_json(), headers={"x-caller": "alice"})
+            uri = response.json()["result"]["artifacts"][0]["parts"][0]["file"]["uri"]
+            return (
+                await client.get(uri, headers={"x-caller": "alice"}),
+                await client.get(uri, headers={"x-caller": "bob"}),
+                await client.get(uri),
+            )
+
+    alice, bob, anonymous = asyncio.run(scenario())
+    assert alice.status_code == 200 and alice.content == CONTENT
+    assert alice.headers["cache-control"].startswith("private")
+    assert bob.status_code == 404
+    assert anonymous.status_code == 401
+
+
+def test_memory_mapped_chunks_are_not_copied(tmp_path: Path) -> None:
+    async def scenario() -> list[bytes | memoryview]:
+        blob_store = MemoryMappedBlobStore(tmp_path)
+        blob_id = await blob_store.put(CONTENT, caller_id="alice")
+        return [chunk async for chunk in A2AServer._blob_chunks(blob_store, blob_id, "alice", 0, len(CONTENT))]
+
+    chunks = asyncio.run(scenario())
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert b"".join(chunks) == CONTENT
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, AsyncIterable
+
+from elkar.a2a_errors import TaskNotFoundError
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    CancelTaskRequest,
+    GetTaskRequest,
+    JSONRPCResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    TaskIdParams,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_manager.task_manager_with_store import TaskManagerWithStore, TaskSendOutput
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+ALICE = RequestContext(caller_id="alice", metadata={})
+BOB = RequestContext(caller_id="bob", metadata={})
+
+
+def send_params(task_id: str) -> TaskSendParams:
+    return TaskSendParams(id=task_id, message=Message(role="user", parts=[TextPart(text="hello")]))
+
+
+async def modifier_handler(task_modifier: TaskModifierBase, request_context: Any) -> None:
+    await task_modifier.set_status(TaskStatus(state=TaskState.WORKING))
+
+
+async def store_handler(task: Any, request_context: Any, store: Any) -> TaskSendOutput:
+    return TaskSendOutput(status=TaskStatus(state=TaskState.WORKING))
+
+
+async def failing_streaming_handler(
+    task: Any, request_context: Any, store: Any
+) -> AsyncIterable[SendTaskStreamingResponse]:
+    yield SendTaskStreamingResponse(
+        result=TaskStatusUpdateEvent(id=task.id, status=TaskStatus(state=TaskState.WORKING))
+    )
+    raise RuntimeError("handler failed")
+
+
+def modifier_task_manager() -> TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue]:
+    return TaskManagerWithModifier(AGENT_CARD, store=InMemoryTaskManagerStore(), send_task_handler=modifier_handler)
+
+
+def store_task_manager() -> TaskManagerWithStore[InMemoryTaskManagerStore, InMemoryTaskEventQueue]:
+    return TaskManagerWithStore(
+        AGENT_CARD,
+        store=InMemoryTaskManagerStore(),
+        send_task_handler=store_handler,
+        send_task_streaming_handler=failing_streaming_handler,
+    )
+
+
+def test_tasks_are_only_visible_to_their_caller() -> None:
+    async def scenario() -> None:
+        for task_manager in (modifier_task_manager(), store_task_manager()):
+            await task_manager.send_task(SendTaskRequest(params=send_params("task")), ALICE)
+
+            own = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task")), ALICE)
+            assert own.result is not None and own.result.status.state == TaskState.WORKING
+            other = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task")), BOB)
+            assert other.result is None and isinstance(other.error, TaskNotFoundError)
+
+            canceled = await task_manager.cancel_task(CancelTaskRequest(params=TaskIdParams(id="task")), BOB)
+            assert isinstance(canceled.error, TaskNotFoundError)
+            own = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task")), ALICE)
+            assert own.result is not None and own.result.status.state == TaskState.WORKING
+
+    asyncio.run(scenario())
+
+
+def test_a_failed_streaming_task_is_updated_for_its_caller() -> None:
+    async def scenario() -> None:
+        task_manager = store_task_manager()
+        events = await task_manager.send_task_streaming(SendTaskStreamingRequest(params=send_params("task")), ALICE)
+        assert not isinstance(events, JSONRPCResponse)
+        states = []
+        async with asyncio.timeout(5):
+            async for event in events:
+                if isinstance(event.result, TaskStatusUpdateEvent):
+                    states.append(event.result.status.state)
+        assert states[-1] == TaskState.FAILED
+
+        stored_task = await task_manager.store.get_task("task", caller_id="alice")
+        assert stored_task is not None and stored_task.task.status.state == TaskState.FAILED
+
+    asyncio.run(scenario())
@@ -0,0 +1,99 @@
+import asyncio
+
+from elkar.a2a_types import (
+    GetTaskRequest,
+    GetTaskResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from elkar.client.client_task_manager import ClientSideTaskManager, TaskManagerConfig
+
+
+class FakeA2AClient:
+    """Serves one task, applying `historyLength` like an A2A server."""
+
+    def __init__(self, task: Task) -> None:
+        self.task = task
+        self.get_task_calls = 0
+
+    async def get_url(self) -> str:
+        return "http://agent"
+
+    async def get_task(self, params: TaskQueryParams) -> GetTaskResponse:
+        self.get_task_calls += 1
+        return GetTaskResponse(result=self._sliced(params.historyLength))
+
+    async def send_task(self, params: TaskSendParams) -> SendTaskResponse:
+        return SendTaskResponse(result=self._sliced(params.historyLength))
+
+    def _sliced(self, history_length: int | None) -> Task:
+        if history_length is None or self.task.history is None:
+            return self.task
+        return self.task.model_copy(update={"history": self.task.history[-history_length:]})
+
+
+def build_task(state: TaskState, history: int) -> Task:
+    return Task(
+        id="task",
+        status=TaskStatus(state=state),
+        history=[Message(role="user", parts=[TextPart(text=f"message {index}")]) for index in range(history)],
+    )
+
+
+def client_task_manager(client: FakeA2AClient) -> ClientSideTaskManager:
+    task_manager = ClientSideTaskManager(TaskManagerConfig(), caller_id=None)
+    task_manager._client = client  # type: ignore[assignment]
+    return task_manager
+
+
+def history_length(response: GetTaskResponse | SendTaskResponse) -> int:
+    assert response.result is not None
+    return len(response.result.history or [])
+
+
+def test_get_task_with_history_length_does_not_truncate_the_stored_history() -> None:
+    async def run() -> None:
+        client = FakeA2AClient(build_task(TaskState.WORKING, history=5))
+        task_manager = client_task_manager(client)
+
+        response = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task", historyLength=1)))
+        assert history_length(response) == 1
+
+        client.task = build_task(TaskState.COMPLETED, history=5)
+        response = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task", historyLength=1)))
+        assert history_length(response) == 1
+
+        # The task is terminal: it is served from the store, with its full history.
+        calls = client.get_task_calls
+        response = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task")))
+        assert client.get_task_calls == calls
+        assert history_length(response) == 5
+        response = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task", historyLength=2)))
+        assert history_length(response) == 2
+
+    asyncio.run(run())
+
+
+def test_send_task_with_history_length_does_not_truncate_the_stored_history() -> None:
+    async def run() -> None:
+        client = FakeA2AClient(build_task(TaskState.COMPLETED, history=5))
+        task_manager = client_task_manager(client)
+        message = Message(role="user", parts=[TextPart(text="hello")])
+
+        send_response = await task_manager.send_task(
+            SendTaskRequest(params=TaskSendParams(id="task", message=message, historyLength=1))
+        )
+        assert history_length(send_response) == 1
+
+        response = await task_manager.get_task(GetTaskRequest(params=TaskQueryParams(id="task")))
+        assert client.get_task_calls == 0
+        assert history_length(response) == 5
+
+    asyncio.run(run())
@@ -0,0 +1,25 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable
+
+import pytest
+
+from elkar.store.in_memory import InMemoryClientSideTaskManagerStore, InMemoryTaskManagerStore
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+from elkar.testing.conformance import CLIENT_SIDE_STORE_CHECKS, QUEUE_CHECKS, STORE_CHECKS, run_checks
+
+
+@pytest.mark.parametrize(
+    ("checks", "backend_factory"),
+    [
+        (STORE_CHECKS, InMemoryTaskManagerStore),
+        (CLIENT_SIDE_STORE_CHECKS, InMemoryClientSideTaskManagerStore),
+        (QUEUE_CHECKS, InMemoryTaskEventQueue),
+    ],
+    ids=["store", "client_side_store", "queue"],
+)
+def test_in_memory_backends_pass_every_check(
+    checks: Iterable[Callable[[Any], Awaitable[None]]], backend_factory: Callable[[], Any]
+) -> None:
+    results = asyncio.run(run_checks(checks, backend_factory))
+    assert results
+    assert [(result.name, result.error) for result in results if not result.passed] == []
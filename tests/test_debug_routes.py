@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from elkar.a2a_types import AgentCapabilities, AgentCard
+from elkar.profiling import RequestProfiler
+from elkar.server.server import A2AServer
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+async def handler(modifier: TaskModifierBase, request_context: RequestContext | None) -> None:
+    pass
+
+
+def is_admin(request: Request) -> bool:
+    return request.headers.get("x-admin-token") == "admin"
+
+
+def new_server(**kwargs: Any) -> A2AServer[Any]:
+    task_manager: TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = TaskManagerWithModifier(
+        AGENT_CARD, send_task_handler=handler
+    )
+    return A2AServer(
+        task_manager,
+        context_extractor=lambda request: RequestContext(caller_id="tenant", metadata={}),
+        request_profiler=RequestProfiler(sample_rate=1.0),
+        **kwargs,
+    )
+
+
+async def get(server: A2AServer[Any], path: str, headers: dict[str, str] | None = None) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def test_debug_routes_are_off_by_default() -> None:
+    server = new_server()
+    assert asyncio.run(get(server, "/debug/requests")).status_code == 404
+    assert asyncio.run(get(server, "/debug/profile?seconds=0.01")).status_code == 404
+
+
+def test_debug_routes_require_an_authorizer() -> None:
+    with pytest.raises(ValueError, match="debug_authorizer"):
+        new_server(debug_path="/debug")
+
+
+def test_authenticated_callers_are_not_admins() -> None:
+    server = new_server(debug_path="/debug", debug_authorizer=is_admin)
+    assert asyncio.run(get(server, "/debug/requests")).status_code == 403
+    assert asyncio.run(get(server, "/debug/requests", {"x-admin-token": "admin"})).status_code == 200
+
+
+def test_profile_seconds_must_be_in_range() -> None:
+    server = new_server(debug_path="/debug", debug_authorizer=is_admin)
+    admin = {"x-admin-token": "admin"}
+    for seconds in ("nan", "inf", "-1", "0", "61", "ten"):
+        response = asyncio.run(get(server, f"/debug/profile?seconds={seconds}", admin))
+        assert response.status_code == 400, seconds
+    assert asyncio.run(get(server, "/debug/profile?seconds=0.01", admin)).status_code == 200
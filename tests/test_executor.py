@@ -0,0 +1,126 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    CancelTaskRequest,
+    Message,
+    SendTaskRequest,
+    Task,
+    TaskIdParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.executor import ExecutorHandler, SyncSendTaskHandler, SyncTaskModifier, executor_handler
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+def complete(task_modifier: SyncTaskModifier, request_context: Any) -> None:
+    task_modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+def compute(task_modifier: SyncTaskModifier, request_context: Any) -> None:
+    task_modifier.set_status(TaskStatus(state=TaskState.WORKING))
+    time.sleep(2)
+
+
+def work_until_canceled(task_modifier: SyncTaskModifier, request_context: Any) -> None:
+    deadline = time.monotonic() + 10
+    while not task_modifier.is_canceled() and time.monotonic() < deadline:
+        task_modifier.set_status(TaskStatus(state=TaskState.WORKING))
+        time.sleep(0.01)
+
+
+class FailingTaskModifier:
+    """Fails to apply the calls forwarded from the worker process."""
+
+    async def get_send_params(self) -> None:
+        return None
+
+    async def get_task(self) -> Task:
+        return Task(id="task", status=TaskStatus(state=TaskState.SUBMITTED))
+
+    async def set_status(self, status: TaskStatus, is_final: bool = False) -> None:
+        raise RuntimeError("store unavailable")
+
+
+def send_request(task_id: str) -> SendTaskRequest:
+    return SendTaskRequest(
+        id=task_id, params=TaskSendParams(id=task_id, message=Message(role="user", parts=[TextPart(text="hello")]))
+    )
+
+
+def new_task_manager(
+    handler: SyncSendTaskHandler, executor: ProcessPoolExecutor
+) -> TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue]:
+    return TaskManagerWithModifier(AGENT_CARD, send_task_handler=executor_handler(handler, executor))
+
+
+def test_shutdown_stops_the_manager_process() -> None:
+    def managers() -> list[str]:
+        return [child.name for child in multiprocessing.active_children() if child.name.startswith("SyncManager")]
+
+    async def scenario(executor: ProcessPoolExecutor) -> tuple[TaskState | None, list[str], list[str]]:
+        task_manager = new_task_manager(complete, executor)
+        response = await task_manager.send_task(send_request("task"))
+        running = managers()
+        await task_manager.shutdown()
+        return response.result.status.state if response.result is not None else None, running, managers()
+
+    with ProcessPoolExecutor(1) as executor:
+        state, running, after_shutdown = asyncio.run(scenario(executor))
+    assert state == TaskState.COMPLETED
+    assert len(running) == 1
+    assert after_shutdown == []
+
+
+def test_a_canceled_handler_releases_its_thread() -> None:
+    async def scenario(executor: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(1))
+        task_manager = new_task_manager(compute, executor)
+        request = asyncio.create_task(task_manager.send_task(send_request("task")))
+        async with asyncio.timeout(5):
+            while (stored_task := await task_manager.store.get_task("task")) is None or (
+                stored_task.task.status.state != TaskState.WORKING
+            ):
+                await asyncio.sleep(0.01)
+        await task_manager.cancel_task(CancelTaskRequest(params=TaskIdParams(id="task")))
+        await request
+        # The only thread of the default executor waited for the calls of the handler.
+        await asyncio.wait_for(loop.run_in_executor(None, int), 1)
+        await task_manager.shutdown()
+
+    with ProcessPoolExecutor(1) as executor:
+        asyncio.run(scenario(executor))
+
+
+def test_a_failed_call_stops_the_worker_process() -> None:
+    async def scenario(executor: ProcessPoolExecutor) -> None:
+        handler = ExecutorHandler(work_until_canceled, executor)
+        with pytest.raises(RuntimeError, match="store unavailable"):
+            await handler(FailingTaskModifier(), None)  # type: ignore[arg-type]
+        # The only worker is free again once the handler saw the cancellation, well before its deadline.
+        await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(executor, int), 5)
+        await handler.close()
+
+    with ProcessPoolExecutor(1) as executor:
+        asyncio.run(scenario(executor))
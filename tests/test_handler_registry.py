@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any
+
+import httpx
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    CancelTaskRequest,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskIdParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from elkar.server.server import A2AServer
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.handler_registry import HandlerRegistry
+from elkar.task_manager.task_manager_with_store import TaskManagerWithStore, TaskSendOutput
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+def send_request(task_id: str) -> SendTaskRequest:
+    return SendTaskRequest(
+        id=task_id, params=TaskSendParams(id=task_id, message=Message(role="user", parts=[TextPart(text="hello")]))
+    )
+
+
+async def hanging_modifier_handler(task_modifier: TaskModifierBase, request_context: Any) -> None:
+    await task_modifier.set_status(TaskStatus(state=TaskState.WORKING))
+    await asyncio.sleep(100)
+
+
+async def hanging_store_handler(task: Task, request_context: Any, store: Any) -> TaskSendOutput:
+    await asyncio.sleep(100)
+    return TaskSendOutput(status=TaskStatus(state=TaskState.COMPLETED))
+
+
+def task_managers() -> list[Any]:
+    modifier_task_manager: TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = (
+        TaskManagerWithModifier(AGENT_CARD, send_task_handler=hanging_modifier_handler)
+    )
+    store_task_manager: TaskManagerWithStore[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = TaskManagerWithStore(
+        AGENT_CARD, send_task_handler=hanging_store_handler
+    )
+    return [modifier_task_manager, store_task_manager]
+
+
+async def wait_until_running(handlers: HandlerRegistry, task_id: str) -> None:
+    async with asyncio.timeout(5):
+        while not handlers.is_running(task_id):
+            await asyncio.sleep(0.01)
+
+
+def test_cancel_task_stops_a_non_streaming_handler() -> None:
+    async def scenario(task_manager: Any) -> tuple[SendTaskResponse, int]:
+        request = asyncio.create_task(task_manager.send_task(send_request("task")))
+        await wait_until_running(task_manager.handlers, "task")
+        await task_manager.cancel_task(CancelTaskRequest(params=TaskIdParams(id="task")))
+        async with asyncio.timeout(5):
+            response = await request
+        return response, task_manager.handlers.in_flight
+
+    for task_manager in task_managers():
+        response, in_flight = asyncio.run(scenario(task_manager))
+        assert response.result is not None
+        assert response.result.status.state == TaskState.CANCELED
+        assert in_flight == 0
+
+
+def test_shutdown_cancels_non_streaming_handlers_after_the_timeout() -> None:
+    async def scenario(task_manager: Any) -> tuple[SendTaskResponse, int]:
+        request = asyncio.create_task(task_manager.send_task(send_request("task")))
+        await wait_until_running(task_manager.handlers, "task")
+        async with asyncio.timeout(5):
+            await task_manager.shutdown(0.01)
+            response = await request
+        return response, task_manager.handlers.in_flight
+
+    for task_manager in task_managers():
+        response, in_flight = asyncio.run(scenario(task_manager))
+        assert response.result is not None
+        assert response.result.status.state != TaskState.COMPLETED
+        assert in_flight == 0
+
+
+def test_the_server_bounds_the_shutdown_wait() -> None:
+    async def post(server: A2AServer[Any], request: SendTaskRequest) -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+            return await client.post("/", content=request.model_dump_json())
+
+    async def scenario() -> tuple[httpx.Response, int]:
+        task_manager = task_managers()[0]
+        server: A2AServer[Any] = A2AServer(task_manager, shutdown_timeout=0.01)
+        async with server.app.router.lifespan_context(server.app):
+            request = asyncio.create_task(post(server, send_request("task")))
+            await wait_until_running(task_manager.handlers, "task")
+        async with asyncio.timeout(5):
+            response = await request
+        return response, task_manager.handlers.in_flight
+
+    response, in_flight = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert in_flight == 0
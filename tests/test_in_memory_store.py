@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from elkar.a2a_types import Artifact, Message, TaskSendParams, TaskState, TaskStatus, TextPart
+from elkar.store.base import StoredTask, UpdateTaskParams
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.store.task_version import StoredTaskVersion
+
+
+def message(text: str) -> Message:
+    return Message(role="agent", parts=[TextPart(text=text)])
+
+
+def chunk(text: str, last_chunk: bool | None = None) -> Artifact:
+    return Artifact(index=0, parts=[TextPart(text=text)], append=True, lastChunk=last_chunk)
+
+
+def texts(messages: list[Message] | None) -> list[str]:
+    return [part.text for message in messages or [] for part in message.parts if isinstance(part, TextPart)]
+
+
+async def new_store() -> InMemoryTaskManagerStore:
+    store = InMemoryTaskManagerStore()
+    await store.upsert_task(TaskSendParams(id="task", message=message("0")))
+    return store
+
+
+def test_snapshots_do_not_change_after_later_updates() -> None:
+    async def scenario() -> tuple[StoredTask, StoredTask]:
+        store = await new_store()
+        first = await store.update_task(
+            "task", UpdateTaskParams(new_messages=[message("1")], artifacts_updates=[chunk("a")])
+        )
+        assert first.task.artifacts is not None
+        await store.update_task("task", UpdateTaskParams(new_messages=[message("2")], artifacts_updates=[chunk("b")]))
+        latest = await store.get_task("task")
+        assert latest is not None
+        return first, latest
+
+    first, latest = asyncio.run(scenario())
+    assert texts(first.task.history) == ["0", "1"]
+    assert first.task.artifacts is not None and len(first.task.artifacts[0].parts) == 1
+    assert texts(latest.task.history) == ["0", "1", "2"]
+    assert latest.task.artifacts is not None and len(latest.task.artifacts[0].parts) == 2
+
+
+def test_updates_share_the_history_of_the_previous_version() -> None:
+    async def scenario() -> tuple[StoredTask, StoredTask]:
+        store = await new_store()
+        first = await store.update_task("task", UpdateTaskParams(new_messages=[message("1")]))
+        second = await store.update_task("task", UpdateTaskParams(new_messages=[message("2")]))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, StoredTaskVersion) and isinstance(second, StoredTaskVersion)
+    assert first.version._history is second.version._history
+
+
+def test_updating_an_old_version_does_not_change_the_newer_ones() -> None:
+    async def scenario() -> None:
+        store = await new_store()
+        first = await store.update_task("task", UpdateTaskParams(new_messages=[message("1")]))
+        second = await store.update_task("task", UpdateTaskParams(new_messages=[message("2")]))
+        assert isinstance(first, StoredTaskVersion) and isinstance(second, StoredTaskVersion)
+        fork = first.version.apply(UpdateTaskParams(new_messages=[message("fork")]))
+        assert texts(fork.task.history) == ["0", "1", "fork"]
+        assert texts(second.task.history) == ["0", "1", "2"]
+
+    asyncio.run(scenario())
+
+
+def test_handlers_changing_a_read_task_do_not_change_the_store() -> None:
+    async def scenario() -> StoredTask | None:
+        store = await new_store()
+        stored_task = await store.update_task("task", UpdateTaskParams(artifacts_updates=[chunk("a")]))
+        assert stored_task.task.history is not None and stored_task.task.artifacts is not None
+        stored_task.task.history.append(message("rogue"))
+        stored_task.task.artifacts[0].parts.append(TextPart(text="rogue"))
+        await store.update_task("task", UpdateTaskParams(new_messages=[message("1")], artifacts_updates=[chunk("b")]))
+        return await store.get_task("task")
+
+    stored_task = asyncio.run(scenario())
+    assert stored_task is not None
+    assert texts(stored_task.task.history) == ["0", "1"]
+    assert stored_task.task.artifacts is not None
+    assert [part.text for part in stored_task.task.artifacts[0].parts if isinstance(part, TextPart)] == ["a", "b"]
+
+
+def test_changing_a_task_returned_by_get_task_does_not_change_the_store() -> None:
+    async def scenario() -> tuple[StoredTask | None, StoredTask | None]:
+        store = await new_store()
+        await store.update_task("task", UpdateTaskParams(artifacts_updates=[chunk("a")], metadata={"step": 1}))
+        read = await store.get_task("task")
+        assert read is not None
+        task = read.task
+        assert task.history is not None and task.artifacts is not None and task.metadata is not None
+        task.status.state = TaskState.FAILED
+        task.history.append(message("rogue"))
+        task.artifacts[0].parts.append(TextPart(text="rogue"))
+        task.metadata["step"] = 2
+        task.sessionId = "rogue"
+        return read, await store.get_task("task")
+
+    read, reread = asyncio.run(scenario())
+    for stored_task in (read, reread):
+        assert stored_task is not None
+        assert stored_task.task.status.state == TaskState.SUBMITTED
+        assert texts(stored_task.task.history) == ["0"]
+        assert stored_task.task.artifacts is not None
+        assert [part.text for part in stored_task.task.artifacts[0].parts if isinstance(part, TextPart)] == ["a"]
+        assert stored_task.task.metadata == {"step": 1}
+        assert stored_task.task.sessionId != "rogue"
+
+
+def test_appending_to_a_last_chunk_raises() -> None:
+    async def scenario() -> None:
+        store = await new_store()
+        await store.update_task("task", UpdateTaskParams(artifacts_updates=[chunk("a", last_chunk=True)]))
+        with pytest.raises(ValueError, match="already a last chunk"):
+            await store.update_task("task", UpdateTaskParams(artifacts_updates=[chunk("b")]))
+
+    asyncio.run(scenario())
+
+
+def test_get_task_slices_the_history() -> None:
+    async def scenario() -> list[StoredTask | None]:
+        store = await new_store()
+        status = TaskStatus(state=TaskState.WORKING, message=message("1"))
+        await store.update_task("task", UpdateTaskParams(status=status, new_messages=[message("2")]))
+        return [await store.get_task("task", history_length=length) for length in (0, 2, 10)]
+
+    none, last_two, all_ = asyncio.run(scenario())
+    assert none is not None and texts(none.task.history) == []
+    assert last_two is not None and texts(last_two.task.history) == ["1", "2"]
+    assert all_ is not None and texts(all_.task.history) == ["0", "1", "2"]
+    assert all_.task.status.state == TaskState.WORKING
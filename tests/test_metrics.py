@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any
+
+import httpx
+
+from elkar.a2a_types import AgentCapabilities, AgentCard, TaskState, TaskStatus, TaskStatusUpdateEvent
+from elkar.metrics import REGISTRY
+from elkar.server.server import A2AServer
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(name="agent", url="http://localhost", version="1", capabilities=AgentCapabilities(), skills=[])
+
+
+def metric_lines(name: str) -> list[str]:
+    return [
+        line for line in REGISTRY.render().splitlines() if line.startswith(f"{name} ") or line.startswith(name + "{")
+    ]
+
+
+def test_queue_depth_is_exported_in_aggregate_without_task_ids() -> None:
+    async def run() -> list[InMemoryTaskEventQueue]:
+        queues = [InMemoryTaskEventQueue(), InMemoryTaskEventQueue()]
+        event = TaskStatusUpdateEvent(id="secret-task", status=TaskStatus(state=TaskState.WORKING))
+        for queue in queues:
+            # The same task and subscriber ids for two callers, in two queues.
+            for caller_id in ("caller-a", "caller-b"):
+                await queue.add_subscriber("secret-task", "subscriber", caller_id=caller_id)
+                await queue.enqueue("secret-task", event, caller_id=caller_id)
+        return queues
+
+    queues = asyncio.run(run())
+    rendered = REGISTRY.render()
+    assert "secret-task" not in rendered
+    assert "subscriber=" not in rendered
+    assert len(metric_lines("a2a_queue_depth")) == 1
+    assert float(metric_lines("a2a_queue_depth")[0].split()[1]) >= 4
+    assert float(metric_lines("a2a_queue_subscribers")[0].split()[1]) >= 4
+    del queues
+
+
+def test_the_metrics_route_is_opt_in() -> None:
+    async def get_metrics(server: A2AServer[Any]) -> int:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get("/metrics")).status_code
+
+    assert asyncio.run(get_metrics(A2AServer(TaskManagerWithModifier(AGENT_CARD)))) != 200
+    assert asyncio.run(get_metrics(A2AServer(TaskManagerWithModifier(AGENT_CARD), metrics_path="/metrics"))) == 200
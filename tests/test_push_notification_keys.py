@@ -0,0 +1,106 @@
+import asyncio
+from typing import Any
+
+import httpx
+import jwt
+import pytest
+
+import elkar.push_notification
+from elkar.a2a_types import AgentCapabilities, AgentCard
+from elkar.push_notification import KeySetUnavailableError, PushNotificationSigningKeys, RemoteJWKS
+from elkar.server.server import A2AServer
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True, pushNotifications=True),
+    skills=[],
+)
+JWKS_URL = "http://agent/.well-known/jwks.json"
+PAYLOAD = '{"id":"task","status":{"state":"completed"}}'
+
+
+def private_key() -> Any:
+    # RS256 keys require the cryptography package, an optional dependency of pyjwt.
+    rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def new_server(keys: PushNotificationSigningKeys) -> A2AServer[Any]:
+    task_manager: TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue] = TaskManagerWithModifier(
+        AGENT_CARD
+    )
+    return A2AServer(task_manager, push_notification_keys=keys)
+
+
+def http_client(server: A2AServer[Any]) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://agent")
+
+
+def test_the_key_set_is_served_with_caching_headers() -> None:
+    keys = PushNotificationSigningKeys(private_key(), key_id="key-1", jwks_max_age=600)
+
+    async def scenario() -> tuple[httpx.Response, httpx.Response, httpx.Response]:
+        async with http_client(new_server(keys)) as client:
+            response = await client.get("/.well-known/jwks.json")
+            not_modified = await client.get(
+                "/.well-known/jwks.json", headers={"If-None-Match": response.headers["etag"]}
+            )
+            modified = await client.get("/.well-known/jwks.json", headers={"If-None-Match": '"other"'})
+            return response, not_modified, modified
+
+    response, not_modified, modified = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=600"
+    assert [(jwk["kid"], jwk["alg"], jwk["use"]) for jwk in response.json()["keys"]] == [("key-1", "RS256", "sig")]
+    assert "d" not in response.json()["keys"][0]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == response.headers["etag"]
+    assert modified.status_code == 200
+
+
+def test_a_signed_payload_is_verified_with_the_published_keys() -> None:
+    keys = PushNotificationSigningKeys(
+        private_key(), key_id="key-1", issuer="agent", audience_per_destination=True, jwks_max_age=600
+    )
+    token = keys.sign(PAYLOAD, "https://receiver.example.com/notify")
+
+    async def scenario() -> dict[str, Any]:
+        async with http_client(new_server(keys)) as client:
+            key_set = RemoteJWKS(JWKS_URL, http_client=client)
+            claims = await key_set.verify(
+                token, PAYLOAD.encode(), audience="https://receiver.example.com", issuer="agent"
+            )
+            with pytest.raises(jwt.InvalidTokenError, match="request body"):
+                await key_set.verify(
+                    token, b'{"tampered":true}', audience="https://receiver.example.com", issuer="agent"
+                )
+            return claims
+
+    claims = asyncio.run(scenario())
+    assert claims["iss"] == "agent"
+    assert claims["aud"] == "https://receiver.example.com"
+
+
+def test_tokens_of_a_previous_key_are_verified_after_a_rotation() -> None:
+    previous_key = private_key()
+    token = PushNotificationSigningKeys(previous_key, key_id="key-1").sign(PAYLOAD, "https://receiver.example.com")
+    keys = PushNotificationSigningKeys(
+        private_key(), key_id="key-2", previous_public_keys={"key-1": previous_key.public_key()}
+    )
+
+    async def scenario() -> dict[str, Any]:
+        async with http_client(new_server(keys)) as client:
+            return await RemoteJWKS(JWKS_URL, http_client=client).verify(token, PAYLOAD.encode())
+
+    assert "request_body_sha256" in asyncio.run(scenario())
+
+
+def test_key_set_unavailable_error_is_exported() -> None:
+    assert "KeySetUnavailableError" in elkar.push_notification.__all__
+    assert elkar.push_notification.KeySetUnavailableError is KeySetUnavailableError
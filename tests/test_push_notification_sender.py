@@ -0,0 +1,205 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+from elkar.a2a_types import PushNotificationConfig, Task, TaskState, TaskStatus
+from elkar.common import TaskType
+from elkar.push_notification.retry_queue import FileRetryQueue, InMemoryRetryQueue, PendingNotification
+from elkar.push_notification.sender import PushNotificationSender
+from elkar.store.base import StoredTask
+
+
+class Receiver:
+    """Records the states it receives; answers 503 to the first `failures` requests."""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0) -> None:
+        self.failures = failures
+        self.delay = delay
+        self.received: list[tuple[str, str]] = []
+        self.attempted_at: list[float] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.attempted_at.append(time.monotonic())
+        await asyncio.sleep(self.delay)
+        if self.failures > 0:
+            self.failures -= 1
+            return httpx.Response(503)
+        task = json.loads(request.content)
+        self.received.append((task["id"], task["status"]["state"]))
+        return httpx.Response(200)
+
+
+def stored_task(task_id: str, state: TaskState, url: str = "http://receiver/notify") -> StoredTask:
+    return StoredTask(
+        id=task_id,
+        caller_id=None,
+        task_type=TaskType.INCOMING,
+        is_streaming=False,
+        task=Task(id=task_id, status=TaskStatus(state=state)),
+        push_notification=PushNotificationConfig(url=url),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+def new_sender(receiver: Receiver, **kwargs: float) -> PushNotificationSender:
+    return PushNotificationSender(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(receiver)),
+        retry_poll_interval=0.01,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+async def wait_for(condition: Callable[[], object]) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_intermediate_states_are_coalesced() -> None:
+    receiver = Receiver(delay=0.05)
+
+    async def scenario() -> PushNotificationSender:
+        sender = new_sender(receiver)
+        sender.notify(stored_task("task", TaskState.SUBMITTED))
+        await wait_for(lambda: receiver.attempted_at)
+        for state in (TaskState.WORKING, TaskState.INPUT_REQUIRED, TaskState.COMPLETED):
+            sender.notify(stored_task("task", state))
+        await wait_for(lambda: ("task", "completed") in receiver.received)
+        await sender.close()
+        return sender
+
+    sender = asyncio.run(scenario())
+    # The first state is sent right away; the ones notified while it is in flight collapse into the last.
+    assert receiver.received == [("task", "submitted"), ("task", "completed")]
+    assert sender.stats.delivered == 2
+    assert sender.stats.coalesced == 2
+
+
+def test_failed_deliveries_are_retried_with_backoff() -> None:
+    receiver = Receiver(failures=2)
+
+    async def scenario() -> PushNotificationSender:
+        sender = new_sender(receiver, base_retry_delay=0.1)
+        sender.notify(stored_task("task", TaskState.COMPLETED))
+        await wait_for(lambda: receiver.received)
+        await sender.close()
+        return sender
+
+    sender = asyncio.run(scenario())
+    assert receiver.received == [("task", "completed")]
+    assert sender.stats.retried == 2
+    first, second, third = receiver.attempted_at
+    assert second - first >= 0.1
+    assert third - second >= 0.2
+
+
+def test_delivery_is_given_up_after_max_attempts() -> None:
+    receiver = Receiver(failures=10)
+
+    async def scenario() -> tuple[PushNotificationSender, int]:
+        sender = new_sender(receiver, base_retry_delay=0.01, max_attempts=3)
+        sender.notify(stored_task("task", TaskState.WORKING))
+        await wait_for(lambda: sender.stats.failed == 1)
+        size = await sender.retry_queue.size()
+        await sender.close()
+        return sender, size
+
+    sender, size = asyncio.run(scenario())
+    assert len(receiver.attempted_at) == 3
+    assert receiver.received == []
+    assert size == 0
+    assert sender._last_sequence == {}
+
+
+def test_a_retry_is_dropped_when_a_newer_state_is_delivered() -> None:
+    receiver = Receiver(failures=1)
+
+    async def scenario() -> int:
+        sender = new_sender(receiver, base_retry_delay=0.2)
+        sender.notify(stored_task("task", TaskState.WORKING))
+        await wait_for(lambda: receiver.attempted_at)
+        await asyncio.sleep(0.01)
+        sender.notify(stored_task("task", TaskState.COMPLETED))
+        await wait_for(lambda: receiver.received)
+        await asyncio.sleep(0.3)
+        size = await sender.retry_queue.size()
+        await sender.close()
+        return size
+
+    assert asyncio.run(scenario()) == 0
+    assert receiver.received == [("task", "completed")]
+
+
+def test_tasks_and_destinations_are_not_tracked_once_delivered() -> None:
+    receiver = Receiver()
+
+    async def scenario() -> PushNotificationSender:
+        sender = new_sender(receiver)
+        for index in range(50):
+            # Tasks that never reach a final state, each with its own receiver.
+            sender.notify(stored_task(f"task-{index}", TaskState.WORKING, url=f"http://receiver-{index}/notify"))
+        await wait_for(lambda: len(receiver.received) == 50)
+        await sender.close()
+        return sender
+
+    sender = asyncio.run(scenario())
+    assert sender._last_sequence == {}
+    assert sender._destinations == {}
+    assert sender._latest == {}
+
+
+def test_in_memory_retry_queue_keeps_the_latest_notification_per_task() -> None:
+    def pending(sequence: int, next_attempt_at: float, task_id: str = "task") -> PendingNotification:
+        return PendingNotification(
+            task_id=task_id,
+            caller_id=None,
+            url="http://receiver",
+            token=None,
+            payload="{}",
+            sequence=sequence,
+            next_attempt_at=next_attempt_at,
+        )
+
+    async def scenario() -> tuple[list[int], list[int], int]:
+        queue = InMemoryRetryQueue()
+        await queue.put(pending(1, 10))
+        await queue.put(pending(2, 20))
+        await queue.put(pending(3, 5, task_id="other"))
+        early = [notification.sequence for notification in await queue.pop_due(15)]
+        await queue.discard("task", None)
+        return early, [notification.sequence for notification in await queue.pop_due(100)], await queue.size()
+
+    assert asyncio.run(scenario()) == ([3], [], 0)
+
+
+def test_file_retry_queue_survives_a_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "retries.json")
+    notification = PendingNotification(
+        task_id="task", caller_id="alice", url="http://receiver", token="token", payload="{}", sequence=1, attempts=2
+    )
+
+    async def write() -> None:
+        queue = FileRetryQueue(path)
+        await queue.put(notification)
+        await queue.put(
+            PendingNotification(
+                task_id="other", caller_id=None, url="http://receiver", token=None, payload="{}", sequence=2
+            )
+        )
+        await queue.discard("other", None)
+
+    async def read() -> tuple[list[PendingNotification], int]:
+        queue = FileRetryQueue(path)
+        due = await queue.pop_due(time.time())
+        return due, await FileRetryQueue(path).size()
+
+    asyncio.run(write())
+    due, size_after_pop = asyncio.run(read())
+    assert due == [notification]
+    assert size_after_pop == 0
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import pytest
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    GetTaskRequest,
+    Message,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from elkar.server.rate_limit import RateLimit, RateLimiter
+from elkar.server.server import A2AServer
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+async def handler(task_modifier: TaskModifierBase, request_context: Any) -> None:
+    await task_modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+def build_server(rate_limiter: RateLimiter) -> A2AServer[Any]:
+    return A2AServer(TaskManagerWithModifier(AGENT_CARD, send_task_handler=handler), rate_limiter=rate_limiter)
+
+
+def send_task_body(task_id: str, decoy: bool) -> str:
+    request = SendTaskRequest(
+        params=TaskSendParams(id=task_id, message=Message(role="user", parts=[TextPart(text="hello")]))
+    ).model_dump(mode="json", exclude_none=True)
+    if decoy:
+        # A "method" key in the params, placed before the method of the request.
+        request["params"]["metadata"] = {"method": "tasks/get"}
+        request = {"params": request.pop("params"), **request}
+    return json.dumps(request)
+
+
+def test_a_nested_method_does_not_bypass_the_method_limit() -> None:
+    for decoy in (False, True):
+        server = build_server(RateLimiter(per_method={"tasks/send": RateLimit(rate=0.001, burst=1)}))
+
+        async def run() -> list[int]:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return [
+                    (await client.post("/", content=send_task_body(f"task-{index}", decoy))).status_code
+                    for index in range(2)
+                ]
+
+        assert asyncio.run(run()) == [200, 429]
+
+
+def test_a_nested_method_does_not_use_the_limit_of_its_method() -> None:
+    limit = RateLimit(rate=0.001, burst=1)
+    server = build_server(RateLimiter(per_method={"tasks/send": limit, "tasks/get": limit}))
+    get_request = GetTaskRequest(params=TaskQueryParams(id="task-0"))
+
+    async def run() -> list[int]:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            send = await client.post("/", content=send_task_body("task-0", decoy=True))
+            get = await client.post("/", content=get_request.model_dump_json())
+            return [send.status_code, get.status_code]
+
+    # Only the "tasks/send" token is taken by the first request.
+    assert asyncio.run(run()) == [200, 200]
+
+
+def test_a_rate_limit_must_refill() -> None:
+    with pytest.raises(ValueError, match="rate"):
+        RateLimit(rate=0, burst=1)
+    with pytest.raises(ValueError, match="burst"):
+        RateLimit(rate=1, burst=0)
+
+
+def test_the_stream_is_closed_when_the_response_is_never_iterated() -> None:
+    rate_limiter = RateLimiter(max_streams_per_caller=1)
+    server = build_server(rate_limiter)
+    request = SendTaskStreamingRequest(
+        params=TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hello")]))
+    )
+
+    async def run() -> None:
+        response = await server._process_stream_request(
+            request, RequestContext(caller_id="caller", metadata={}), "caller"
+        )
+        assert not await rate_limiter.open_stream("caller")
+        # The server runs the background of a response once it is done, even if its stream was never started.
+        assert response.background is not None
+        await response.background()
+        assert await rate_limiter.open_stream("caller")
+
+    asyncio.run(run())
+
+
+def test_the_stream_is_closed_once_when_it_ends() -> None:
+    rate_limiter = RateLimiter(max_streams_per_caller=2)
+    server = build_server(rate_limiter)
+    server.context_extractor = lambda request: RequestContext(caller_id="caller", metadata={})
+    request = SendTaskStreamingRequest(
+        params=TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hello")]))
+    )
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with client.stream("POST", "/", content=request.model_dump_json()) as stream:
+                async for _ in stream.aiter_lines():
+                    pass
+        assert rate_limiter.backend._streams == {}  # type: ignore[attr-defined]
+
+    asyncio.run(run())
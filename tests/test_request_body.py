@@ -0,0 +1,141 @@
+import asyncio
+import base64
+import os
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    FileContent,
+    FilePart,
+    GetTaskRequest,
+    GetTaskResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+)
+from elkar.blob_store.base import load_file_content
+from elkar.blob_store.file_system import FileSystemBlobStore
+from elkar.server.server import A2AServer
+from elkar.task_manager.task_manager_base import RequestContext
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+def file_message(content: bytes) -> Message:
+    return Message(
+        role="user",
+        parts=[FilePart(file=FileContent(name="file.bin", bytes=base64.b64encode(content).decode()))],
+    )
+
+
+async def first_file(task_modifier: TaskModifierBase) -> FileContent:
+    send_params = await task_modifier.get_send_params()
+    assert send_params is not None
+    part = send_params.message.parts[0]
+    assert isinstance(part, FilePart)
+    return part.file
+
+
+def caller(request: Any) -> RequestContext:
+    return RequestContext(caller_id=request.headers.get("x-caller"), metadata={})
+
+
+def spilling_server(blob_store: FileSystemBlobStore, loaded: list[bytes]) -> A2AServer[Any]:
+    async def handler(task_modifier: TaskModifierBase, request_context: RequestContext | None) -> None:
+        caller_id = request_context.caller_id if request_context is not None else None
+        loaded.append(bytes(await load_file_content(await first_file(task_modifier), blob_store, caller_id)))
+        await task_modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+    return A2AServer(
+        TaskManagerWithModifier(AGENT_CARD, send_task_handler=handler),
+        context_extractor=caller,
+        blob_store=blob_store,
+        spill_file_parts_over=1024,
+    )
+
+
+def test_spilled_file_parts_can_still_be_read_after_the_request(tmp_path: Path) -> None:
+    blob_store = FileSystemBlobStore(tmp_path)
+    loaded: list[bytes] = []
+    server = spilling_server(blob_store, loaded)
+    content = os.urandom(64 * 1024)
+    headers = {"x-caller": "alice"}
+
+    async def run() -> tuple[FileContent, bytes, bytes]:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = SendTaskRequest(params=TaskSendParams(id="task-1", message=file_message(content)))
+            response = await client.post("/", content=request.model_dump_json(), headers=headers)
+            assert response.status_code == 200
+
+            streaming_request = SendTaskStreamingRequest(
+                params=TaskSendParams(id="task-2", message=file_message(content))
+            )
+            async with client.stream(
+                "POST", "/", content=streaming_request.model_dump_json(), headers=headers
+            ) as stream:
+                async for _ in stream.aiter_lines():
+                    pass
+
+            get_request = GetTaskRequest(params=TaskQueryParams(id="task-1"))
+            response = await client.post("/", content=get_request.model_dump_json(), headers=headers)
+            task = GetTaskResponse.model_validate_json(response.content).result
+            assert task is not None and task.history is not None
+            part = task.history[0].parts[0]
+            assert isinstance(part, FilePart)
+            assert part.file.uri is not None
+            served = await client.get(part.file.uri, headers=headers)
+            return part.file, bytes(await load_file_content(part.file, blob_store, "alice")), served.content
+
+    file, stored, served = asyncio.run(run())
+    assert loaded == [content, content]
+    assert file.bytes is None
+    assert file.uri is not None and file.uri.startswith("/blobs/")
+    assert stored == content
+    assert served == content
+
+
+def test_spilled_file_parts_belong_to_the_caller(tmp_path: Path) -> None:
+    blob_store = FileSystemBlobStore(tmp_path)
+    content = os.urandom(4096)
+
+    async def run() -> FileContent:
+        transport = httpx.ASGITransport(app=spilling_server(blob_store, []).app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = SendTaskRequest(params=TaskSendParams(id="task", message=file_message(content)))
+            response = await client.post("/", content=request.model_dump_json(), headers={"x-caller": "alice"})
+        task = response.json()["result"]
+        return FileContent.model_validate(task["history"][0]["parts"][0]["file"])
+
+    file = asyncio.run(run())
+    assert bytes(asyncio.run(load_file_content(file, blob_store, "alice"))) == content
+    with pytest.raises(ValueError):
+        asyncio.run(load_file_content(file, blob_store, "mallory"))
+
+
+@pytest.mark.parametrize("uri", ["file:///etc/passwd", "/blobs/../etc/passwd", "https://example.com/file"])
+def test_uris_outside_the_blob_store_are_rejected(tmp_path: Path, uri: str) -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(load_file_content(FileContent(uri=uri), FileSystemBlobStore(tmp_path)))
+
+
+def test_spilling_requires_a_blob_store() -> None:
+    with pytest.raises(ValueError, match="blob_store"):
+        A2AServer(TaskManagerWithModifier(AGENT_CARD), spill_file_parts_over=1024)
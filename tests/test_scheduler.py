@@ -0,0 +1,156 @@
+import asyncio
+from typing import Any, AsyncIterable
+
+import pytest
+
+from elkar.a2a_types import (
+    AgentCapabilities,
+    AgentCard,
+    JSONRPCResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from elkar.store.base import StoredTask
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_manager.scheduler import TaskScheduler
+from elkar.task_manager.task_manager_with_store import TaskManagerWithStore, TaskSendOutput
+from elkar.task_manager.task_manager_with_task_modifier import TaskManagerWithModifier
+from elkar.task_modifier.base import TaskModifierBase
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+AGENT_CARD = AgentCard(
+    name="agent",
+    url="http://localhost",
+    version="1",
+    capabilities=AgentCapabilities(streaming=True),
+    skills=[],
+)
+
+
+class FailingOnceStore(InMemoryTaskManagerStore):
+    """Fails the first `upsert_task`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failed = False
+
+    async def upsert_task(self, *args: Any, **kwargs: Any) -> StoredTask:
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("store unavailable")
+        return await super().upsert_task(*args, **kwargs)
+
+
+def send_params(task_id: str) -> TaskSendParams:
+    return TaskSendParams(id=task_id, message=Message(role="user", parts=[TextPart(text="hello")]))
+
+
+async def modifier_handler(task_modifier: TaskModifierBase, request_context: Any) -> None:
+    await task_modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+
+
+async def store_handler(task: Any, request_context: Any, store: Any) -> TaskSendOutput:
+    return TaskSendOutput(status=TaskStatus(state=TaskState.COMPLETED))
+
+
+async def store_streaming_handler(
+    task: Any, request_context: Any, store: Any
+) -> AsyncIterable[SendTaskStreamingResponse]:
+    yield SendTaskStreamingResponse(
+        result=TaskStatusUpdateEvent(id=task.id, status=TaskStatus(state=TaskState.COMPLETED), final=True)
+    )
+
+
+def modifier_task_manager(
+    store: InMemoryTaskManagerStore | None = None,
+) -> TaskManagerWithModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue]:
+    return TaskManagerWithModifier(
+        AGENT_CARD,
+        store=store,
+        send_task_handler=modifier_handler,
+        scheduler=TaskScheduler(max_concurrency=1),
+    )
+
+
+def store_task_manager(
+    store: InMemoryTaskManagerStore | None = None,
+) -> TaskManagerWithStore[InMemoryTaskManagerStore, InMemoryTaskEventQueue]:
+    return TaskManagerWithStore(
+        AGENT_CARD,
+        store=store,
+        send_task_handler=store_handler,
+        send_task_streaming_handler=store_streaming_handler,
+        scheduler=TaskScheduler(max_concurrency=1),
+    )
+
+
+async def drain(events: Any) -> None:
+    async with asyncio.timeout(5):
+        async for _ in events:
+            pass
+
+
+def test_reservation_is_released_when_send_task_preparation_fails() -> None:
+    async def run() -> None:
+        for task_manager in (modifier_task_manager(FailingOnceStore()), store_task_manager(FailingOnceStore())):
+            with pytest.raises(RuntimeError):
+                await task_manager.send_task(SendTaskRequest(params=send_params("task-1")))
+            assert task_manager.scheduler.running == 0
+
+            response = await task_manager.send_task(SendTaskRequest(params=send_params("task-2")))
+            assert isinstance(response, SendTaskResponse)
+            assert response.error is None
+            assert task_manager.scheduler.running == 0
+
+    asyncio.run(run())
+
+
+def test_reservation_is_released_when_send_task_streaming_preparation_fails() -> None:
+    async def run() -> None:
+        task_manager = modifier_task_manager(FailingOnceStore())
+        with pytest.raises(RuntimeError):
+            await task_manager.send_task_streaming(SendTaskStreamingRequest(params=send_params("task-1")))
+        assert task_manager.scheduler.running == 0
+
+        events = await task_manager.send_task_streaming(SendTaskStreamingRequest(params=send_params("task-2")))
+        assert not isinstance(events, JSONRPCResponse)
+        await drain(events)
+        await task_manager.shutdown()
+        assert task_manager.scheduler.running == 0
+
+    asyncio.run(run())
+
+
+def test_reservation_is_released_when_the_streaming_handler_fails_to_prepare() -> None:
+    async def run() -> None:
+        task_manager = store_task_manager(FailingOnceStore())
+        # The upsert of the streaming task manager runs in the spawned handler.
+        events = await task_manager.send_task_streaming(SendTaskStreamingRequest(params=send_params("task-1")))
+        await drain(events)
+        assert task_manager.scheduler.running == 0
+
+        events = await task_manager.send_task_streaming(SendTaskStreamingRequest(params=send_params("task-2")))
+        await drain(events)
+        await task_manager.shutdown()
+        assert task_manager.scheduler.running == 0
+
+    asyncio.run(run())
+
+
+def test_reservation_is_released_when_the_handler_is_canceled_before_it_starts() -> None:
+    async def run() -> None:
+        task_manager = modifier_task_manager()
+        await task_manager.send_task_streaming(SendTaskStreamingRequest(params=send_params("task-1")))
+        assert task_manager.handlers.cancel("task-1")
+        await task_manager.shutdown()
+        assert task_manager.scheduler.running == 0
+
+    asyncio.run(run())
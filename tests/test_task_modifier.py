@@ -0,0 +1,173 @@
+import asyncio
+import logging
+
+import pytest
+
+from elkar.a2a_types import Artifact, Message, Task, TaskSendParams, TaskState, TaskStatus, TextPart
+from elkar.store.base import StoredTask, UpdateTaskParams
+from elkar.store.in_memory import InMemoryTaskManagerStore
+from elkar.task_modifier.task_modifier import TaskModifier
+from elkar.task_queue.in_memory import InMemoryTaskEventQueue
+
+type Modifier = TaskModifier[InMemoryTaskManagerStore, InMemoryTaskEventQueue]
+
+
+def message(text: str) -> Message:
+    return Message(role="agent", parts=[TextPart(text=text)])
+
+
+def texts(messages: list[Message] | None) -> list[str]:
+    return [part.text for message in messages or [] for part in message.parts if isinstance(part, TextPart)]
+
+
+async def new_modifier(store: InMemoryTaskManagerStore, caller_id: str | None = None) -> Modifier:
+    stored_task = await store.upsert_task(TaskSendParams(id="task", message=message("0")), caller_id=caller_id)
+    return TaskModifier(stored_task.task, store=store, caller_id=caller_id, max_batch_delay=None)
+
+
+async def stored(store: InMemoryTaskManagerStore, caller_id: str | None = None) -> Task:
+    stored_task = await store.get_task("task", caller_id=caller_id)
+    assert stored_task is not None
+    return stored_task.task
+
+
+def test_the_view_matches_the_store_after_updates() -> None:
+    async def scenario() -> tuple[Task, Task]:
+        store = InMemoryTaskManagerStore()
+        modifier = await new_modifier(store, caller_id="caller")
+        await modifier.set_status(TaskStatus(state=TaskState.WORKING, message=message("1")))
+        await modifier.add_messages_to_history([message("2"), message("3")])
+        await modifier.set_status(TaskStatus(state=TaskState.COMPLETED), is_final=True)
+        return await modifier.get_task(), await stored(store, caller_id="caller")
+
+    view, task = asyncio.run(scenario())
+    assert view == task
+    assert view.status.state == TaskState.COMPLETED
+    assert texts(view.history) == ["0", "1", "2", "3"]
+
+
+def test_the_view_matches_the_store_after_artifact_appends() -> None:
+    async def scenario() -> tuple[Task, Task]:
+        store = InMemoryTaskManagerStore()
+        modifier = await new_modifier(store)
+        for index in range(5):
+            chunk = Artifact(index=0, parts=[TextPart(text=str(index))], append=index > 0, lastChunk=index == 4)
+            await modifier.upsert_artifacts([chunk])
+        await modifier.upsert_artifacts([Artifact(index=1, parts=[TextPart(text="other")])])
+        return await modifier.get_task(), await stored(store)
+
+    view, task = asyncio.run(scenario())
+    assert view == task
+    assert view.artifacts is not None
+    assert [part.text for part in view.artifacts[0].parts if isinstance(part, TextPart)] == ["0", "1", "2", "3", "4"]
+    assert view.artifacts[0].lastChunk is True
+    assert len(view.artifacts) == 2
+
+
+def test_the_view_matches_the_store_after_a_batch() -> None:
+    async def scenario() -> tuple[Task, Task, Task]:
+        store = InMemoryTaskManagerStore()
+        modifier = await new_modifier(store)
+        async with modifier.batch():
+            await modifier.add_messages_to_history([message("1")])
+            await modifier.upsert_artifacts([Artifact(index=0, parts=[TextPart(text="a")])])
+            before_flush = await modifier.get_task()
+        return before_flush, await modifier.get_task(), await stored(store)
+
+    before_flush, view, task = asyncio.run(scenario())
+    assert texts(before_flush.history) == ["0"]
+    assert view == task
+    assert texts(view.history) == ["0", "1"]
+
+
+def test_concurrent_writers_see_the_writes_of_each_other() -> None:
+    async def write(modifier: Modifier, name: str) -> list[Task]:
+        views = []
+        for index in range(20):
+            await modifier.add_messages_to_history([message(f"{name}{index}")])
+            views.append(await modifier.get_task())
+            await asyncio.sleep(0)
+        return views
+
+    async def scenario() -> tuple[list[Task], list[Task], Task, Task, Task]:
+        store = InMemoryTaskManagerStore()
+        first, second = await new_modifier(store), await new_modifier(store)
+        first_views, second_views = await asyncio.gather(write(first, "a"), write(second, "b"))
+        return first_views, second_views, await first.get_task(), await second.get_task(), await stored(store)
+
+    first_views, second_views, first, second, task = asyncio.run(scenario())
+    history = texts(task.history)
+    assert len(history) == 42
+    assert sorted(history[2:]) == sorted([f"a{index}" for index in range(20)] + [f"b{index}" for index in range(20)])
+    # Each view is a version of the store: a prefix of the final history ending with the write that returned it.
+    for name, views in (("a", first_views), ("b", second_views)):
+        for index, view in enumerate(views):
+            view_history = texts(view.history)
+            assert view_history == history[: len(view_history)]
+            assert view_history[-1] == f"{name}{index}"
+    assert task in (first, second)
+
+
+class FailingOnceStore(InMemoryTaskManagerStore):
+    """Fails the first `update_task`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failed = False
+
+    async def update_task(self, task_id: str, params: UpdateTaskParams) -> StoredTask:
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("store unavailable")
+        return await super().update_task(task_id, params)
+
+
+def test_a_failed_timed_flush_keeps_the_changes(caplog: pytest.LogCaptureFixture) -> None:
+    async def scenario() -> tuple[Task, Task]:
+        store = FailingOnceStore()
+        stored_task = await store.upsert_task(TaskSendParams(id="task", message=message("0")))
+        modifier: Modifier = TaskModifier(stored_task.task, store=store, max_batch_delay=0.01)
+        async with modifier.batch():
+            await modifier.add_messages_to_history([message("1")])
+            await asyncio.sleep(0.05)
+            before_retry = await stored(store)
+            await modifier.add_messages_to_history([message("2")])
+        return before_retry, await stored(store)
+
+    with caplog.at_level(logging.ERROR, logger="elkar.task_modifier.task_modifier"):
+        before_retry, task = asyncio.run(scenario())
+    assert "store unavailable" in caplog.text
+    assert texts(before_retry.history) == ["0"]
+    assert texts(task.history) == ["0", "1", "2"]
+
+
+def test_a_failed_flush_raises_and_keeps_the_changes() -> None:
+    async def scenario() -> Task:
+        store = FailingOnceStore()
+        stored_task = await store.upsert_task(TaskSendParams(id="task", message=message("0")))
+        modifier: Modifier = TaskModifier(stored_task.task, store=store, max_batch_delay=None)
+        with pytest.raises(RuntimeError, match="store unavailable"):
+            async with modifier.batch():
+                await modifier.add_messages_to_history([message("1")])
+        await modifier.flush()
+        return await stored(store)
+
+    assert texts(asyncio.run(scenario()).history) == ["0", "1"]
+
+
+def test_buffered_messages_are_bounded_by_max_batch_size() -> None:
+    async def scenario() -> list[list[str]]:
+        store = InMemoryTaskManagerStore()
+        stored_task = await store.upsert_task(TaskSendParams(id="task", message=message("0")))
+        modifier: Modifier = TaskModifier(stored_task.task, store=store, max_batch_size=3, max_batch_delay=None)
+        histories = []
+        async with modifier.batch():
+            for index in range(1, 7):
+                await modifier.add_messages_to_history([message(str(index))])
+                histories.append(texts((await stored(store)).history))
+        return histories
+
+    histories = asyncio.run(scenario())
+    assert histories[1] == ["0"]
+    assert histories[2] == ["0", "1", "2", "3"]
+    assert histories[5] == ["0", "1", "2", "3", "4", "5", "6"]